@@ -1,12 +1,13 @@
 import os
 import ctypes
+import logging
 from python import my_display
 from python import station_observation
-from zoneinfo import ZoneInfo
-import tzlocal
-from datetime import datetime
+from python import profiling
 
 if __name__ == "__main__":
+    logging.basicConfig(level=os.environ.get("MAD_ANGLER_LOG_LEVEL", "INFO"), format="[%(levelname)s] %(name)s: %(message)s")
+
     # Get the script's actual directory
     script_dir = os.path.dirname(os.path.abspath(__file__))
     plots_dir = os.path.join(script_dir, "AI", "targetFile", "plots")    
@@ -14,17 +15,20 @@ if __name__ == "__main__":
     # Construct the correct DLL path
     dll_path = os.path.join(script_dir, "bin", "OmniBase.dll")
     
-    # Setup paths & timestamps
-    local_tz = ZoneInfo(tzlocal.get_localzone_name())
-    local_now = datetime.now(local_tz)
-    date_str = local_now.strftime('%Y-%m-%d')
-    time_str = local_now.strftime('%H-%M')
+    # Setup paths & timestamps: the run folder is named in the station's zone, like its rows
+    station_id, time_zone = station_observation.session_station()
+    date_str, time_str = station_observation.run_folder_name(time_zone)
     output_dir = os.path.join('AI', 'targetFile', 'plots', date_str, time_str)
     os.makedirs(output_dir, exist_ok=True)
     csv_filename = os.path.join(output_dir, 'weather_data.csv')
     
     #Gather Data
-    station_observation.gather_data(dll_path, plots_dir, csv_filename, output_dir)
+    station_observation.gather_data(dll_path, plots_dir, csv_filename, output_dir, station_id)
 
     #Gather Data
-    my_display.deploy(script_dir, plots_dir, dll_path, output_dir, date_str, time_str, csv_filename)
+    my_display.deploy(script_dir, dll_path, plots_dir, output_dir, date_str, time_str, csv_filename)
+
+    # Trace of this session when MAD_ANGLER_TRACE=1
+    if profiling.is_enabled():
+        profiling.export_json(os.path.join(output_dir, "trace.json"))
+        profiling.export_csv(os.path.join(output_dir, "trace.csv"))
@@ -0,0 +1,72 @@
+import time
+import asyncio
+import argparse
+import statistics
+
+
+# Keep-alive client: sends GETs back to back on one connection and records latencies
+async def _client(host, port, paths, deadline, latencies, statuses, etag_revalidate):
+    reader, writer = await asyncio.open_connection(host, port)
+    etags = {}
+    i = 0
+    try:
+        while time.perf_counter() < deadline:
+            path = paths[i % len(paths)]
+            i += 1
+            extra = f"If-None-Match: {etags[path]}\r\n" if etag_revalidate and path in etags else ""
+            start = time.perf_counter()
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\n{extra}\r\n".encode('latin-1'))
+            await writer.drain()
+            head = await reader.readuntil(b'\r\n\r\n')
+            headers = {}
+            for line in head.decode('latin-1').split('\r\n')[1:]:
+                name, _, value = line.partition(':')
+                headers[name.strip().lower()] = value.strip()
+            length = int(headers.get('content-length', 0))
+            if length:
+                await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+            status = int(head.split(b' ', 2)[1])
+            statuses[status] = statuses.get(status, 0) + 1
+            if 'etag' in headers:
+                etags[path] = headers['etag']
+    finally:
+        writer.close()
+
+async def run_load(host, port, paths, connections, duration, etag_revalidate=False):
+    latencies, statuses = [], {}
+    deadline = time.perf_counter() + duration
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        _client(host, port, paths, deadline, latencies, statuses, etag_revalidate) for _ in range(connections)
+    ))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    pick = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000 if latencies else 0.0
+    return {
+        'requests': len(latencies),
+        'seconds': elapsed,
+        'requests_per_s': len(latencies) / elapsed if elapsed > 0 else 0.0,
+        'p50_ms': pick(0.50),
+        'p95_ms': pick(0.95),
+        'p99_ms': pick(0.99),
+        'mean_ms': statistics.fmean(latencies) * 1000 if latencies else 0.0,
+        'statuses': statuses,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test for the local conditions API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--connections", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--paths", default="/conditions,/observations/latest,/history/range,/zones")
+    parser.add_argument("--revalidate", action="store_true", help="send If-None-Match after the first response")
+    args = parser.parse_args()
+
+    stats = asyncio.run(run_load(args.host, args.port, args.paths.split(","), args.connections,
+                                 args.duration, args.revalidate))
+    print(f"{stats['requests']} requests in {stats['seconds']:.2f}s -> {stats['requests_per_s']:.0f} req/s")
+    print(f"latency p50 {stats['p50_ms']:.2f} ms | p95 {stats['p95_ms']:.2f} ms | p99 {stats['p99_ms']:.2f} ms")
+    print(f"statuses: {stats['statuses']}")
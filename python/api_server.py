@@ -0,0 +1,256 @@
+import os
+import csv
+import json
+import time
+import asyncio
+import hashlib
+import argparse
+import logging
+from email.utils import formatdate
+from urllib.parse import urlsplit, parse_qs
+
+import pandas as pd
+
+from python import weather
+from python import compaction
+from python import file_handler
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PLOTS_DIR = os.path.join('AI', 'targetFile', 'plots')
+CHART_FILES = ('chaos_chart.png', 'spiral_chart.gif', 'temperature_plot.png', 'pressure_plot.png',
+               'humidity_plot.png', 'wind_speed_plot.png', 'trajectory.png')
+CONTENT_TYPES = {'.png': 'image/png', '.gif': 'image/gif', '.json': 'application/json'}
+HISTORY_CACHE_SIZE = 256
+
+STATUS_TEXT = {200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed'}
+
+
+class Resource:
+    __slots__ = ('body', 'etag', 'last_modified', 'content_type')
+
+    def __init__(self, body, content_type='application/json', mtime=None):
+        self.body = body
+        self.etag = '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+        self.last_modified = formatdate(mtime or time.time(), usegmt=True)
+        self.content_type = content_type
+
+def _json_resource(payload, mtime=None):
+    return Resource(json.dumps(payload, default=str).encode('utf-8'), mtime=mtime)
+
+def _float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def conditions_for_row(row):
+    temp, humidity = _float(row.get('temperature (F)')), _float(row.get('humidity (%)'))
+    pressure, wind = _float(row.get('barometric_pressure (hPa)')), _float(row.get('wind_speed (m/s)'))
+    zone = weather.classify_conditions_array(
+        *(float('nan') if v is None else v for v in (temp, humidity, pressure, wind))
+    ).item()
+    return {
+        'date': row.get('date'),
+        'time': row.get('time'),
+        'station': row.get('station_name'),
+        'zone': zone,
+        'zone_label': weather.base_tags[zone]['label'],
+        'estimated_water_temp (F)': _float(row.get('estimated_water_temp (F)')),
+        'species_target': row.get('species_target'),
+        'fishing_note': row.get('fishing_note'),
+        'pressure_trend': row.get('pressure_trend'),
+    }
+
+
+# Warm in-memory view of the latest run: every response body is built once per refresh
+class ConditionsCache:
+
+    def __init__(self, plots_dir=DEFAULT_PLOTS_DIR, archive_dir=compaction.ARCHIVE_DIR):
+        self.plots_dir = plots_dir
+        self.archive_dir = archive_dir
+        self.resources = {}
+        self.history = pd.DataFrame()
+        self._history_responses = {}
+        self._run_folder = None
+        self._signature = None
+
+    def _load_history(self):
+        return file_handler.load_history_frame(self.plots_dir, self.archive_dir)
+
+    def refresh(self, force=False):
+        run_folder = file_handler.latest_run_folder(self.plots_dir)
+        if run_folder is None:
+            return False
+        csv_path = os.path.join(run_folder, 'weather_data.csv')
+        try:
+            mtime = os.path.getmtime(csv_path)
+        except OSError:
+            return False
+        # Charts rendered after the CSV also count as a change
+        signature = (run_folder, mtime) + tuple(
+            os.path.getmtime(p) if os.path.isfile(p) else None
+            for p in (os.path.join(run_folder, name) for name in CHART_FILES)
+        )
+        if not force and signature == self._signature:
+            return False
+
+        with open(csv_path, 'r', encoding='utf-8-sig') as f:
+            rows = list(csv.DictReader(f))
+        if force or signature[:2] != (self._signature or (None, None))[:2]:
+            self.history = self._load_history()
+        self._run_folder, self._signature = run_folder, signature
+        self._build(rows, run_folder, mtime)
+        logger.info(f"API cache refreshed from {run_folder} ({len(rows)} rows, {len(self.history)} history rows)")
+        return True
+
+    def _build(self, rows, run_folder, mtime):
+        ordered = sorted(rows, key=lambda r: f"{r.get('date')} {r.get('time')}", reverse=True)
+        latest = ordered[0] if ordered else {}
+        resources = {
+            '/health': _json_resource({'status': 'ok', 'run_folder': run_folder, 'rows': len(rows)}, mtime),
+            '/observations/latest': _json_resource(latest, mtime),
+            '/observations': _json_resource(ordered, mtime),
+            '/conditions': _json_resource(conditions_for_row(latest) if latest else {}, mtime),
+            '/zones': _json_resource([conditions_for_row(r) for r in ordered], mtime),
+            '/history/range': _json_resource(self._history_range(), mtime),
+        }
+        if run_folder:
+            for name in CHART_FILES:
+                path = os.path.join(run_folder, name)
+                if os.path.isfile(path):
+                    with open(path, 'rb') as f:
+                        body = f.read()
+                    content_type = CONTENT_TYPES[os.path.splitext(name)[1]]
+                    resources[f'/charts/{name}'] = Resource(body, content_type, os.path.getmtime(path))
+        resources['/charts'] = _json_resource(sorted(k.split('/')[-1] for k in resources if k.startswith('/charts/')), mtime)
+        # Swap in one assignment so readers never see a half-built set
+        self.resources = resources
+        self._history_responses = {}
+
+    def _history_range(self):
+        if self.history.empty:
+            return {'rows': 0, 'first': None, 'last': None, 'stations': []}
+        first, last = self.history.iloc[0], self.history.iloc[-1]
+        return {
+            'rows': len(self.history),
+            'first': f"{first['date']} {first['time']}",
+            'last': f"{last['date']} {last['time']}",
+            'stations': sorted(s for s in self.history['station_name'].unique() if s),
+        }
+
+    # /history?start=YYYY-MM-DD&end=YYYY-MM-DD&station=ID, memoized per query until the next refresh
+    def history_query(self, query):
+        cached = self._history_responses.get(query)
+        if cached is not None:
+            return cached
+        params = {k: v[-1] for k, v in parse_qs(query).items()}
+        frame = self.history
+        if not frame.empty:
+            if 'start' in params:
+                frame = frame[frame['date'] >= params['start']]
+            if 'end' in params:
+                frame = frame[frame['date'] <= params['end']]
+            if 'station' in params:
+                frame = frame[frame['station_name'] == params['station']]
+        resource = _json_resource(frame.to_dict(orient='records'))
+        if len(self._history_responses) >= HISTORY_CACHE_SIZE:
+            self._history_responses.pop(next(iter(self._history_responses)))
+        self._history_responses[query] = resource
+        return resource
+
+    def lookup(self, target):
+        parts = urlsplit(target)
+        if parts.path == '/history':
+            return self.history_query(parts.query)
+        return self.resources.get(parts.path.rstrip('/') or '/health')
+
+
+def _response(status, resource=None, keep_alive=True, head=False):
+    headers = [f"HTTP/1.1 {status} {STATUS_TEXT[status]}"]
+    body = b''
+    if resource is not None:
+        headers.append(f"ETag: {resource.etag}")
+        headers.append(f"Last-Modified: {resource.last_modified}")
+        headers.append("Cache-Control: no-cache")
+        if status == 200:
+            headers.append(f"Content-Type: {resource.content_type}")
+            body = resource.body
+    headers.append(f"Content-Length: {len(body)}")
+    headers.append("Connection: keep-alive" if keep_alive else "Connection: close")
+    head_bytes = ("\r\n".join(headers) + "\r\n\r\n").encode('latin-1')
+    return head_bytes if head else head_bytes + body
+
+_NOT_FOUND = _json_resource({'error': 'not found'})
+
+async def handle_connection(cache, reader, writer):
+    try:
+        while True:
+            try:
+                request = await reader.readuntil(b'\r\n\r\n')
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                break
+            lines = request.decode('latin-1').split('\r\n')
+            try:
+                method, target, version = lines[0].split(' ', 2)
+            except ValueError:
+                writer.write(_response(400, keep_alive=False))
+                break
+            headers = {}
+            for line in lines[1:]:
+                if ':' in line:
+                    name, _, value = line.partition(':')
+                    headers[name.strip().lower()] = value.strip()
+            keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+
+            if method not in ('GET', 'HEAD'):
+                writer.write(_response(405, keep_alive=keep_alive))
+            else:
+                resource = cache.lookup(target)
+                if resource is None:
+                    writer.write(_response(404, _NOT_FOUND, keep_alive, method == 'HEAD'))
+                elif headers.get('if-none-match') == resource.etag or (
+                        'if-none-match' not in headers and headers.get('if-modified-since') == resource.last_modified):
+                    writer.write(_response(304, resource, keep_alive))
+                else:
+                    writer.write(_response(200, resource, keep_alive, method == 'HEAD'))
+            await writer.drain()
+            if not keep_alive:
+                break
+    finally:
+        writer.close()
+
+# Re-read the latest run only when its CSV changes
+async def poll_loop(cache, interval):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(cache.refresh)
+        except Exception as e:
+            logger.error(f"API cache refresh failed: {e}")
+
+async def serve(host='127.0.0.1', port=8765, plots_dir=DEFAULT_PLOTS_DIR, poll_interval=30.0, cache=None):
+    cache = cache or ConditionsCache(plots_dir)
+    cache.refresh(force=True)
+    server = await asyncio.start_server(lambda r, w: handle_connection(cache, r, w), host, port)
+    poller = asyncio.create_task(poll_loop(cache, poll_interval))
+    logger.info(f"Serving conditions API on http://{host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        poller.cancel()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local JSON API for the latest fishing conditions.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--plots-dir", default=DEFAULT_PLOTS_DIR)
+    parser.add_argument("--poll", type=float, default=30.0, help="seconds between cache refresh checks")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(name)s: %(message)s")
+    try:
+        asyncio.run(serve(args.host, args.port, args.plots_dir, args.poll))
+    except KeyboardInterrupt:
+        pass
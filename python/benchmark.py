@@ -0,0 +1,254 @@
+import os
+import io
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import contextlib
+from datetime import datetime, timedelta, timezone
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+
+from python import chart
+from python import render_cache
+from python import weather
+from python import my_math
+from python import file_handler
+from python import fishing_score
+from python import bite_patterns
+from python import http_client
+from python import station_observation
+
+
+SIZES = {
+    "small": {"rows": 50, "points": 1_000, "dates": 5, "times": 4},
+    "medium": {"rows": 500, "points": 10_000, "dates": 30, "times": 12},
+    "large": {"rows": 5_000, "points": 100_000, "dates": 120, "times": 24},
+}
+RESULTS_DIR = os.path.join("AI", "Reports", "benchmarks")
+REGRESSION_THRESHOLD = 0.20
+
+
+# ---- Synthetic fixtures ----
+
+def make_observation_geojson(count, seed=0, station="KTST"):
+    rng = np.random.default_rng(seed)
+    start = datetime(2025, 6, 1, tzinfo=timezone.utc)
+    features = []
+    for i in range(count):
+        temp_c = float(rng.uniform(-5, 35))
+        features.append({"properties": {
+            "timestamp": (start - timedelta(hours=i)).isoformat(),
+            "station": f"https://api.weather.gov/stations/{station}",
+            "textDescription": "Clear",
+            "temperature": {"value": temp_c},
+            "dewpoint": {"value": temp_c - float(rng.uniform(0, 15))},
+            "barometricPressure": {"value": float(rng.uniform(99_000, 103_000))},
+            "windSpeed": {"value": float(rng.uniform(0, 30))},
+            "windDirection": {"value": float(rng.uniform(0, 360))},
+            "visibility": {"value": 16_090},
+            "cloudLayers": [{"amount": str(rng.choice(["CLR", "FEW", "SCT", "BKN", "OVC"]))}],
+            "ceiling": {"value": None},
+            "heatIndex": {"value": None},
+            "windChill": {"value": None},
+            "precipitationLastHour": {"value": float(rng.choice([0.0, 0.0, 2.5]))},
+            "elevation": {"value": 874.0},
+        }})
+    return {"type": "FeatureCollection", "features": features}
+
+class _StubResponse:
+    status_code = 200
+
+    def __init__(self, payload):
+        self._payload = payload
+        self.content = json.dumps(payload).encode("utf-8")
+        self.headers = {}
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._payload
+
+@contextlib.contextmanager
+def offline_requests(payload):
+    original = http_client.transport
+    http_client.transport = lambda *args, **kwargs: _StubResponse(payload)
+    try:
+        yield
+    finally:
+        http_client.transport = original
+
+def make_history(rows, seed=0):
+    with offline_requests(make_observation_geojson(rows, seed)), contextlib.redirect_stdout(io.StringIO()):
+        return station_observation.retrieve_observations("KTST", max_results=rows)
+
+# plots/<date>/<time>/weather_data.csv, the layout initGUI.py produces
+def make_plots_tree(root, dates, times, data_list):
+    start = datetime(2025, 1, 1)
+    for d in range(dates):
+        date_str = (start + timedelta(days=d)).strftime("%Y-%m-%d")
+        for t in range(times):
+            folder = os.path.join(root, date_str, f"{t:02d}-00")
+            os.makedirs(folder, exist_ok=True)
+            with contextlib.redirect_stdout(io.StringIO()):
+                file_handler.save_to_csv(data_list[:5], os.path.join(folder, "weather_data.csv"))
+    return root
+
+
+# ---- Timing ----
+
+def time_call(func, repeat=5, number=1):
+    timings = []
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            for _ in range(number):
+                func()
+            timings.append((time.perf_counter() - start) / number)
+    return {"best_s": min(timings), "mean_s": sum(timings) / len(timings), "repeat": repeat, "number": number}
+
+def _scalar_trail(temp, humidity, pressure, wind, steps=100):
+    zone = weather.classify_conditions(temp, humidity, pressure, wind)
+    center = weather.base_tags[zone]["point"]
+    return [my_math.spiral_position_within_quadrant(temp, humidity, pressure, center, wind, t=t / 10.0)
+            for t in range(steps)]
+
+
+def run_suite(sizes=("small", "medium"), include_charts=True, repeat=5):
+    results = {}
+    workspace = tempfile.mkdtemp(prefix="mad_angler_bench_")
+    cwd = os.getcwd()
+    # load_latest_data and the water-temp state use paths relative to the working directory
+    os.chdir(workspace)
+    try:
+        for size in sizes:
+            spec = SIZES[size]
+            rows, points = spec["rows"], spec["points"]
+            bench = {}
+
+            payload = make_observation_geojson(rows)
+            with offline_requests(payload):
+                bench["retrieve_observations"] = time_call(
+                    lambda: station_observation.retrieve_observations("KTST", max_results=rows), repeat)
+            data_list = make_history(rows)
+
+            plots_dir = os.path.join("AI", "targetFile", "plots")
+            shutil.rmtree(plots_dir, ignore_errors=True)
+            csv_path = os.path.join(plots_dir, "2025-06-01", "12-00", "weather_data.csv")
+            bench["save_to_csv"] = time_call(lambda: file_handler.save_to_csv(data_list, csv_path), repeat)
+            bench["load_latest_data"] = time_call(file_handler.load_latest_data, repeat)
+
+            tree_root = os.path.join(workspace, f"tree_{size}")
+            make_plots_tree(tree_root, spec["dates"], spec["times"], data_list)
+            bench["get_latest_weather_data_folder"] = time_call(
+                lambda: file_handler.get_latest_weather_data_folder(tree_root), repeat)
+
+            records = fishing_score.make_synthetic_trajectory(points)
+            sequence = [int(q) for q in records["quadrant"]]
+            pattern = [ord("e"), ord("f"), ord("b")]
+            bench["count_pattern_occurrences"] = time_call(
+                lambda: bite_patterns.count_pattern_occurrences(sequence, pattern), repeat)
+            bench["pattern_probabilities"] = time_call(
+                lambda: fishing_score.pattern_probabilities(records["quadrant"]), repeat)
+
+            rng = np.random.default_rng(1)
+            temps = rng.uniform(30, 95, rows)
+            hums = rng.uniform(10, 100, rows)
+            press = rng.uniform(995, 1030, rows)
+            winds = rng.uniform(0, 25, rows)
+            bench["classify_conditions"] = time_call(
+                lambda: [weather.classify_conditions(*v) for v in zip(temps, hums, press, winds)], repeat)
+            bench["classify_conditions_array"] = time_call(
+                lambda: weather.classify_conditions_array(temps, hums, press, winds), repeat)
+            bench["spiral_trails"] = time_call(
+                lambda: [_scalar_trail(*v) for v in zip(temps, hums, press, winds)], repeat)
+            bench["spiral_positions"] = time_call(
+                lambda: my_math.spiral_positions(
+                    temps, hums, press,
+                    weather.zone_points(weather.classify_conditions_array(temps, hums, press, winds)),
+                    winds, t=np.arange(100)[None, :] / 10.0),
+                repeat)
+
+            if include_charts:
+                output_dir = os.path.dirname(csv_path)
+                # Charts include the GUI's plt.pause(0.1) per figure; Agg keeps them off-screen.
+                # The render cache is off so every repeat draws instead of copying a cached PNG.
+                with render_cache.disabled():
+                    for name, func in (
+                        ("chart.plot_weather_data", lambda: chart.plot_weather_data(output_dir, csv_path)),
+                        ("chart.chart_run", lambda: chart.chart_run(output_dir, "2025-06-01", "12-00")),
+                        ("chart.chart_gif", lambda: chart.chart_gif(output_dir)),
+                    ):
+                        bench[name] = time_call(lambda f=func: (f(), plt.close("all")), repeat=1 if "gif" in name else min(repeat, 3))
+
+            for entry in bench.values():
+                entry["rows"] = rows
+                entry["points"] = points
+            results[size] = bench
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workspace, ignore_errors=True)
+    return results
+
+def environment_info():
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "matplotlib": matplotlib.__version__,
+    }
+
+def save_results(results, path=None):
+    path = path or os.path.join(RESULTS_DIR, f"bench_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.json")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"meta": environment_info(), "results": results}, f, indent=2)
+    return path
+
+# Best-time ratio per benchmark; anything slower than the threshold is a regression
+def compare_results(old_path, new_path, threshold=REGRESSION_THRESHOLD):
+    with open(old_path, "r", encoding="utf-8") as f:
+        old = json.load(f)["results"]
+    with open(new_path, "r", encoding="utf-8") as f:
+        new = json.load(f)["results"]
+    rows = []
+    for size, benches in new.items():
+        for name, entry in benches.items():
+            base = old.get(size, {}).get(name)
+            if not base:
+                continue
+            ratio = entry["best_s"] / base["best_s"] if base["best_s"] > 0 else float("inf")
+            rows.append({"size": size, "name": name, "old_s": base["best_s"], "new_s": entry["best_s"],
+                         "ratio": ratio, "regression": ratio > 1 + threshold})
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline benchmarks for ingest, analysis and rendering.")
+    parser.add_argument("--sizes", default="small,medium", help="comma separated: " + ",".join(SIZES))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--no-charts", action="store_true")
+    parser.add_argument("--output", help="result JSON path")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two result files")
+    args = parser.parse_args()
+
+    if args.compare:
+        rows = compare_results(*args.compare)
+        for row in rows:
+            flag = "REGRESSION" if row["regression"] else ""
+            print(f"{row['size']:7} {row['name']:32} {row['old_s'] * 1000:10.3f} ms -> {row['new_s'] * 1000:10.3f} ms  x{row['ratio']:.2f} {flag}")
+        sys.exit(1 if any(row["regression"] for row in rows) else 0)
+
+    results = run_suite(args.sizes.split(","), include_charts=not args.no_charts, repeat=args.repeat)
+    for size, benches in results.items():
+        for name, entry in benches.items():
+            print(f"{size:7} {name:32} best {entry['best_s'] * 1000:10.3f} ms")
+    print(f"Results saved to: {save_results(results, args.output)}")
@@ -0,0 +1,155 @@
+import os
+import sys
+import csv
+from concurrent.futures import ProcessPoolExecutor
+from python import file_handler
+from python import fishing_score
+from python import bite_patterns
+from python import profiling
+
+# Kept outside the plots tree so run-folder lookups never mistake it for a date
+SUMMARY_PATH = os.path.join("AI", "Reports", "bite_pattern_summary.csv")
+
+
+# Headless bite-pattern analysis of one trajectory_data.bin
+@profiling.traced("analysis.analyze_trajectory")
+def analyze_trajectory(traj_bin_file_path, dll_path=None, score_backend=None):
+    result = {
+        'bin_path': traj_bin_file_path,
+        'folder': os.path.dirname(traj_bin_file_path),
+        'status': 'ok',
+        'total_points': 0,
+        'patterns': [],
+        'score': None,
+        'score_backend': None,
+        'pattern_source': None,
+        'error': None,
+    }
+
+    if not os.path.exists(traj_bin_file_path):
+        result['status'] = 'missing'
+        return result
+
+    try:
+        records = file_handler.read_trajectory_bin(traj_bin_file_path)
+    except OSError as e:
+        result['status'] = 'unreadable'
+        result['error'] = str(e)
+        return result
+
+    if len(records) == 0:
+        result['status'] = 'empty'
+        return result
+
+    result['total_points'] = len(records)
+    profiling.current().record(rows=len(records), bytes=records.nbytes)
+    # Mined motifs when available; the score below stays on the fixed patterns the DLL also uses
+    pattern_set = bite_patterns.load_patterns()
+    result['pattern_source'] = pattern_set['source']
+    result['patterns'] = [
+        {'pattern': pattern, 'matches': matches, 'windows': windows, 'probability': probability}
+        for pattern, matches, windows, probability in fishing_score.pattern_probabilities(
+            records['quadrant'], pattern_set['patterns'], pattern_set['collapse'])
+    ]
+
+    try:
+        backend = score_backend or fishing_score.get_score_backend(dll_path)
+        result['score_backend'] = backend.name
+        if backend.name == fishing_score.CpuScoreBackend.name:
+            # Records are already in memory, skip re-reading the file
+            result['score'] = fishing_score.score_from_records(records)
+        else:
+            result['score'] = backend.score(traj_bin_file_path)
+    except Exception as e:
+        result['error'] = f"Could not compute fishing score: {e}"
+
+    return result
+
+# Text lines shared by the Tk window and bite_pattern_analysis.txt
+def format_analysis_lines(result):
+    if result['status'] == 'missing':
+        return ["Must Generate Trajectory First\n"]
+    if result['status'] in ('empty', 'unreadable'):
+        return ["Trajectory file is empty or unreadable.\n"]
+
+    lines = [f"Total trajectory points: {result['total_points']}\n\n"]
+    if result.get('pattern_source') not in (None, 'builtin'):
+        lines.append("Patterns: mined zone motifs (counted per zone visit)\n")
+    for p in result['patterns']:
+        lines.append(f"Pattern: {p['pattern']:10} | Matches: {p['matches']:3} / {p['windows']:3} | Probability: {p['probability']:.3f}\n")
+
+    if result['score'] is not None:
+        lines.append(f"\n🎣 Mad Angler Fishing Score: {result['score']:.2f} / 100 ({result['score_backend']})\n")
+    if result['error']:
+        lines.append(f"[ERROR] {result['error']}\n")
+    return lines
+
+def write_analysis_file(result, output_txt_path=None):
+    output_txt_path = output_txt_path or os.path.join(result['folder'], "bite_pattern_analysis.txt")
+    with open(output_txt_path, 'w', encoding='utf-8') as f:
+        f.writelines(format_analysis_lines(result))
+    return output_txt_path
+
+
+def find_trajectory_bins(plots_dir):
+    bin_paths = []
+    for root, dirs, files in os.walk(plots_dir):
+        if "trajectory_data.bin" in files:
+            bin_paths.append(os.path.join(root, "trajectory_data.bin"))
+    return sorted(bin_paths)
+
+# One score backend per worker process, resolved when the pool starts
+_worker_backend = None
+
+def _init_worker(dll_path):
+    global _worker_backend
+    _worker_backend = fishing_score.get_score_backend(dll_path)
+
+def _analyze_for_batch(traj_bin_file_path):
+    return analyze_trajectory(traj_bin_file_path, score_backend=_worker_backend)
+
+def summary_row(result, plots_dir):
+    row = {
+        'run': os.path.relpath(result['folder'], plots_dir),
+        'status': result['status'],
+        'total_points': result['total_points'],
+        'score': '' if result['score'] is None else round(result['score'], 2),
+        'score_backend': result['score_backend'] or '',
+        'error': result['error'] or '',
+    }
+    for p in result['patterns']:
+        row[f"p({p['pattern']})"] = round(p['probability'], 4)
+    return row
+
+# Analyze every trajectory under the plots tree and write one summary table
+def analyze_all_trajectories(plots_dir, dll_path=None, summary_path=None, max_workers=None):
+    bin_paths = find_trajectory_bins(plots_dir)
+    if not bin_paths:
+        print(f"[WARN] No trajectory_data.bin found under {plots_dir}")
+        return []
+
+    chunksize = max(1, len(bin_paths) // ((max_workers or os.cpu_count() or 1) * 4))
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(dll_path,)) as pool:
+        results = list(pool.map(_analyze_for_batch, bin_paths, chunksize=chunksize))
+
+    rows = [summary_row(result, plots_dir) for result in results]
+    fieldnames = []
+    for row in rows:
+        fieldnames.extend(key for key in row if key not in fieldnames)
+
+    summary_path = summary_path or SUMMARY_PATH
+    os.makedirs(os.path.dirname(summary_path) or '.', exist_ok=True)
+    with open(summary_path, 'w', newline='', encoding='utf-8-sig') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"[INFO] Analyzed {len(results)} trajectories, summary saved to: {summary_path}")
+    return results
+
+
+if __name__ == "__main__":
+    # Usage: python -m python.bite_analysis [plots_dir] [dll_path]
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    plots_dir = sys.argv[1] if len(sys.argv) > 1 else os.path.join(script_dir, "..", "AI", "targetFile", "plots")
+    dll_path = sys.argv[2] if len(sys.argv) > 2 else os.path.join(script_dir, "..", "bin", "OmniBase.dll")
+    analyze_all_trajectories(plots_dir, dll_path)
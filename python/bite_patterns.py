@@ -0,0 +1,75 @@
+import os
+import json
+import struct
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Ranked motifs written by motif_mining
+MOTIFS_PATH = os.path.join('AI', 'targetFile', 'cache', 'motifs', 'motifs.json')
+# Mined motifs the bite analysis reports, best first
+MOTIF_TOP = 8
+
+# Define common bite-productive patterns (quadrant labels)
+BITE_PATTERNS = [
+    ['b'],
+    ['f', 'b'],
+    ['g', 'b'],
+    ['e', 'f', 'b']
+]
+
+
+def extract_quadrant_sequence_from_bin(bin_path):
+    point_struct = struct.Struct('fffif')  # dx, dy, dz, quadrant (int), magnitude
+    sequence = []
+
+    with open(bin_path, 'rb') as f:
+        count_bytes = f.read(4)
+        if len(count_bytes) < 4:
+            return []
+
+        point_count = struct.unpack('I', count_bytes)[0]
+        for _ in range(point_count):
+            chunk = f.read(point_struct.size)
+            if len(chunk) < point_struct.size:
+                break
+            _, _, _, quadrant, _ = point_struct.unpack(chunk)
+            sequence.append(quadrant)
+    logger.debug(f"Quadrant sequence ({len(sequence)} points): {sequence}")
+    return sequence
+
+# Find how often each pattern occurs
+
+def count_pattern_occurrences(sequence, pattern):
+    count = 0
+    pattern_len = len(pattern)
+    for i in range(len(sequence) - pattern_len + 1):
+        if sequence[i:i+pattern_len] == pattern:
+            count += 1
+    return count
+
+
+_loaded = {}
+
+# Patterns for the bite analysis: the top mined motifs ending in end_zone when motif_mining has
+# run, else BITE_PATTERNS. Mined motifs describe zone visits, so they are matched on the
+# trajectory with repeated zones collapsed ('collapse': True).
+def load_patterns(path=MOTIFS_PATH, top=MOTIF_TOP, end_zone='b'):
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return {'patterns': BITE_PATTERNS, 'collapse': False, 'source': 'builtin'}
+    key = (path, top, end_zone)
+    if key not in _loaded or _loaded[key][0] != mtime:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                motifs = json.load(f).get('motifs', [])
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read mined motifs from {path}: {e}")
+            motifs = []
+        patterns = [m['zones'] for m in motifs if m['zones'][-1] == end_zone][:top]
+        _loaded[key] = (mtime, patterns)
+    patterns = _loaded[key][1]
+    if not patterns:
+        return {'patterns': BITE_PATTERNS, 'collapse': False, 'source': 'builtin'}
+    return {'patterns': patterns, 'collapse': True, 'source': path}
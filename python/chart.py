@@ -1,13 +1,42 @@
 import os
 import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
 import matplotlib.animation as animation
 from matplotlib.patches import Circle
 from python import  weather
 from python import  my_math
 from python import file_handler
+from python import profiling
+from python import render_cache
+from python import trajectory_lod
+
+
+# Render-cache keys, shared with the report generator so it can reuse charts without drawing
+def chart_run_key(date, time, temp, humidity, pressure, wind):
+    return render_cache.render_key('chart_run', render_cache.hash_rows([date, time, temp, humidity, pressure, wind]),
+                                   t_steps=100)
+
+def weather_plots_key(csv_filename):
+    return render_cache.render_key('plot_weather_data', render_cache.hash_file(csv_filename))
+
+def trajectory_key(bin_path, budget=trajectory_lod.DEFAULT_BUDGET):
+    return render_cache.render_key('plot_trajectory', render_cache.hash_file(bin_path), budget=budget)
+
+# Put cached PNGs on screen the way a fresh render would appear
+def show_cached(paths, title=None):
+    for path in paths:
+        fig = plt.figure(figsize=(8, 8))
+        plt.imshow(plt.imread(path))
+        plt.axis('off')
+        if title:
+            fig.canvas.manager.set_window_title(title)
+        plt.tight_layout()
+    plt.show(block=False)
+    plt.pause(0.1)
 
 
+@profiling.traced("render.chart_gif")
 def chart_gif(gif_dir):
     data_list = file_handler.load_latest_data()
     fig, ax = plt.subplots(figsize=(8, 8))
@@ -45,8 +74,20 @@ def chart_gif(gif_dir):
             continue
     else:
         print("No complete weather data found. Aborting GIF rendering.")
+        plt.close(fig)
         return
 
+    # Same inputs and code as a previous render: reuse the GIF
+    cache_key = render_cache.render_key(
+        'chart_gif', render_cache.hash_rows([row['date'], row['time'], current_temp, current_humidity, current_pressure, current_wind]),
+        t_steps=100, interval=50
+    )
+    cached = render_cache.fetch(cache_key, gif_dir)
+    if cached:
+        plt.close(fig)
+        print(f"GIF loaded from cache: {cached['spiral_chart.gif']}")
+        return cached['spiral_chart.gif']
+
     ax.set_title(f"Fishing Condition Spiral GIF\n{row['date']} {row['time']}")
     zone = weather.classify_conditions(current_temp, current_humidity, current_pressure, current_wind)
     direction_vector = weather.base_tags[zone]['point']
@@ -92,8 +133,11 @@ def chart_gif(gif_dir):
     gif_path = os.path.join(gif_dir, 'spiral_chart.gif')
     ani.save(gif_path, writer='pillow')
     plt.close()
+    render_cache.store(cache_key, [gif_path])
     print(f"GIF saved to {gif_path}")
+    return gif_path
 
+@profiling.traced("render.chart_run")
 def chart_run(output_dir, date_str, time_str):
     data_list = file_handler.load_latest_data()
     # Find the latest complete row from the end of the list
@@ -122,6 +166,13 @@ def chart_run(output_dir, date_str, time_str):
             print("Failed to recover valid data. Aborting chart rendering.")
             return
 
+    # A hit returns the cached PNG path and never touches matplotlib
+    cache_key = chart_run_key(row['date'], row['time'], current_temp, current_humidity, current_pressure, current_wind)
+    cached = render_cache.fetch(cache_key, output_dir)
+    if cached:
+        show_cached([cached['chaos_chart.png']], "Fishing Condition Map")
+        return cached['chaos_chart.png']
+
     zone = weather.classify_conditions(current_temp, current_humidity, current_pressure, current_wind)
     direction_vector = weather.base_tags[zone]['point']
 
@@ -170,11 +221,13 @@ def chart_run(output_dir, date_str, time_str):
     os.makedirs(os.path.dirname(output_dir), exist_ok=True)
     save_fig = os.path.join(output_dir, 'chaos_chart.png')
     plt.savefig(save_fig)
+    render_cache.store(cache_key, [save_fig])
     plt.show(block=False)
     plt.pause(0.1)
 
-    return chart
+    return save_fig
 
+@profiling.traced("render.chart_prediction_run")
 def chart_prediction_run(plots_dir, traj_bin_file_path, predicted_sequence, date_str, time_str):
     if not predicted_sequence:
         print("[ERROR] No predicted sequence to chart.")
@@ -258,13 +311,22 @@ def chart_prediction_run(plots_dir, traj_bin_file_path, predicted_sequence, date
     return chart
 
 
+@profiling.traced("render.plot_weather_data")
 def plot_weather_data(output_dir, csv_filename):
+    # Unchanged CSV: reuse the plots rendered from it last time
+    cache_key = weather_plots_key(csv_filename)
+    cached = render_cache.fetch(cache_key, output_dir)
+    if cached:
+        show_cached(list(cached.values()))
+        return list(cached.values())
+
     # Read CSV file into a pandas DataFrame
     df = pd.read_csv(csv_filename, encoding='utf-8-sig')
     
     # Combine date and time columns into a datetime column and sort by time
     df['datetime'] = pd.to_datetime(df['date'] + ' ' + df['time'])
     df.sort_values('datetime', inplace=True)
+    profiling.current().record(rows=len(df))
     
     # Plot Temperature over time
     plt.figure()
@@ -335,3 +397,67 @@ def plot_weather_data(output_dir, csv_filename):
         print(f"Wind speed plot saved as '{w_plot_path}'")
     else:
         print("No wind speed data available to plot.")
+
+    plot_names = ['temperature_plot.png', 'pressure_plot.png', 'humidity_plot.png', 'wind_speed_plot.png']
+    plot_paths = [p for p in (os.path.join(output_dir, n) for n in plot_names) if os.path.isfile(p)]
+    render_cache.store(cache_key, plot_paths)
+    return plot_paths
+
+
+# 3D quiver of a trajectory_data.bin, drawn from its level-of-detail pyramid so the
+# cost depends on the point budget, not on the trajectory length
+@profiling.traced("render.plot_trajectory")
+def plot_trajectory(bin_path, output_dir=None, budget=trajectory_lod.DEFAULT_BUDGET, show=True):
+    output_dir = output_dir or os.path.dirname(bin_path)
+    cache_key = trajectory_key(bin_path, budget)
+    cached = render_cache.fetch(cache_key, output_dir)
+    if cached:
+        if show:
+            show_cached([cached['trajectory.png']], "Chaos Trajectory")
+        return cached['trajectory.png']
+
+    level = trajectory_lod.load_level(bin_path, budget)
+    profiling.current().record(rows=len(level['index']))
+    if not len(level['index']):
+        print(f"[WARN] No trajectory points in {bin_path}")
+        return None
+
+    fig = plt.figure(figsize=(9, 8))
+    ax = fig.add_subplot(projection='3d')
+    xyz, vector = level['xyz'], level['vector']
+    # Arrows scaled to a fraction of the path extent so short and long runs read alike
+    extent = float(np.ptp(xyz, axis=0).max()) or 1.0
+    peak = float(np.abs(level['magnitude']).max()) or 1.0
+    length = 0.05 * extent / peak
+
+    zone_keys = sorted(weather.base_tags)
+    colors = plt.get_cmap('tab10')
+    for i, key in enumerate(zone_keys):
+        mask = level['quadrant'] == ord(key)
+        if not mask.any():
+            continue
+        label = weather.base_tags[key]['label']
+        ax.quiver(xyz[mask, 0], xyz[mask, 1], xyz[mask, 2],
+                  vector[mask, 0], vector[mask, 1], vector[mask, 2],
+                  length=length, normalize=False, color=colors(i % 10), linewidth=0.8,
+                  label=f"{key.upper()}: {label}")
+    ax.plot(xyz[:, 0], xyz[:, 1], xyz[:, 2], color='grey', linewidth=0.5, alpha=0.6)
+
+    ax.set_xlabel("Temperature")
+    ax.set_ylabel("Humidity")
+    ax.set_zlabel("Pressure")
+    shown = len(level['index'])
+    ax.set_title(f"Chaos Trajectory\n{shown} of {level['point_count']} points")
+    ax.legend(loc='upper left', fontsize=7)
+    fig.tight_layout()
+
+    os.makedirs(output_dir, exist_ok=True)
+    save_fig = os.path.join(output_dir, 'trajectory.png')
+    fig.savefig(save_fig)
+    render_cache.store(cache_key, [save_fig])
+    if show:
+        plt.show(block=False)
+        plt.pause(0.1)
+    else:
+        plt.close(fig)
+    return save_fig
@@ -0,0 +1,292 @@
+import os
+import sys
+import csv
+import json
+import lzma
+import shutil
+import logging
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from python import file_handler
+
+try:
+    import zstandard
+except ImportError:  # optional: xz from the standard library is always available
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_DIR = os.path.join('AI', 'targetFile', 'archive')
+TABLE_FILE = 'weather.npz'
+PACK_FILE = 'runs.pack'
+INDEX_FILE = 'runs.index.json'
+DEDUP_KEY = ['station_name', 'date', 'time']
+
+
+# ---- Member compression: every file is its own frame so it can be read alone ----
+
+def _compress(data, codec):
+    if codec == 'zstd':
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return lzma.compress(data, preset=6)
+
+def _decompress(data, codec):
+    if codec == 'zstd':
+        return zstandard.ZstdDecompressor().decompress(data)
+    return lzma.decompress(data)
+
+def default_codec():
+    return 'zstd' if zstandard is not None else 'xz'
+
+
+# ---- Columnar table ----
+
+def _column_array(values):
+    # Numeric only when float round-trips the exact CSV text, so runs can be rebuilt verbatim
+    text = values.to_numpy(dtype=str)
+    try:
+        numbers = np.array([float(v) if v != '' else np.nan for v in text], dtype=np.float64)
+    except ValueError:
+        return text
+    if all(v == '' or str(float(v)) == v for v in text):
+        return numbers
+    return text
+
+def _cell_text(value):
+    if isinstance(value, (float, np.floating)):
+        return '' if np.isnan(value) else str(float(value))
+    return str(value)
+
+def load_day_table(day_dir):
+    with np.load(os.path.join(day_dir, TABLE_FILE), allow_pickle=False) as data:
+        columns = [str(c) for c in data['__columns__']]
+        table = pd.DataFrame({c: data[f'col:{c}'] for c in columns})
+        runs = {
+            'names': [str(n) for n in data['__run_names__']],
+            'offsets': data['__run_offsets__'],
+            'rows': data['__run_rows__'],
+        }
+    return table, runs
+
+def _save_day_table(day_dir, table, run_names, run_members):
+    offsets = np.zeros(len(run_members) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(m) for m in run_members])
+    arrays = {f'col:{c}': _column_array(table[c].astype(str)) for c in table.columns}
+    arrays['__columns__'] = np.array(list(table.columns), dtype=str)
+    arrays['__run_names__'] = np.array(run_names, dtype=str)
+    arrays['__run_offsets__'] = offsets
+    arrays['__run_rows__'] = np.concatenate(run_members).astype(np.int32) if run_members else np.empty(0, np.int32)
+    tmp_path = os.path.join(day_dir, TABLE_FILE + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        np.savez_compressed(f, **arrays)
+    os.replace(tmp_path, os.path.join(day_dir, TABLE_FILE))
+
+
+# ---- Compaction ----
+
+def _dir_size(path):
+    total = 0
+    for root, dirs, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, f)) for f in files)
+    return total
+
+def _as_text(table):
+    # Back to the string cells the CSV reader produces
+    return pd.DataFrame({c: [_cell_text(v) for v in table[c]] for c in table.columns})
+
+def _existing_day(day_dir):
+    if not os.path.isfile(os.path.join(day_dir, TABLE_FILE)):
+        return None, None, {}
+    table, runs = load_day_table(day_dir)
+    frames = [_as_text(table)]
+    with open(os.path.join(day_dir, INDEX_FILE), 'r', encoding='utf-8') as f:
+        index = json.load(f)
+    return frames, runs, index
+
+# Merge one day's run folders into the archive: deduplicated columnar table + packed run files.
+# The newest run of the whole tree is never compacted: the GUI, charts and API read it live.
+def compact_day(plots_dir, day, archive_dir=ARCHIVE_DIR, codec=None, remove=True):
+    codec = codec or default_codec()
+    day_path = os.path.join(plots_dir, day)
+    latest = file_handler.latest_run_folder(plots_dir)
+    runs = sorted(d for d in os.listdir(day_path)
+                  if os.path.isdir(os.path.join(day_path, d)) and os.path.join(day_path, d) != latest)
+    if not runs:
+        return None
+    out_dir = os.path.join(archive_dir, day)
+    os.makedirs(out_dir, exist_ok=True)
+    bytes_before = sum(_dir_size(os.path.join(day_path, run)) for run in runs)
+
+    frames, old_runs, old_index = _existing_day(out_dir)
+    frames = frames or []
+    run_names = list(old_runs['names']) if old_runs else []
+    member_keys = []
+    if old_runs:
+        for i in range(len(run_names)):
+            member_keys.append(old_runs['rows'][old_runs['offsets'][i]:old_runs['offsets'][i + 1]])
+
+    # Rows of each run tagged with a global position so duplicates can be resolved to the newest run
+    base = sum(len(f) for f in frames)
+    for run in runs:
+        csv_path = os.path.join(day_path, run, 'weather_data.csv')
+        frame = (pd.read_csv(csv_path, encoding='utf-8-sig', dtype=str, keep_default_na=False)
+                 if os.path.isfile(csv_path) else pd.DataFrame(columns=file_handler.CSV_FIELDNAMES))
+        frames.append(frame)
+        run_names.append(f"{day}/{run}")
+        member_keys.append(np.arange(base, base + len(frame)))
+        base += len(frame)
+
+    stacked = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=file_handler.CSV_FIELDNAMES)
+    stacked = stacked.reindex(columns=list(dict.fromkeys(file_handler.CSV_FIELDNAMES + list(stacked.columns))), fill_value='')
+    key_cols = [c for c in DEDUP_KEY if c in stacked.columns]
+    # Position of the surviving (last) copy for every stacked row, then renumber survivors
+    group = stacked.groupby(key_cols, sort=False, dropna=False).ngroup().to_numpy()
+    last_of_group = pd.Series(np.arange(len(stacked))).groupby(group).transform('max').to_numpy()
+    keep = np.unique(last_of_group)
+    renumber = np.full(len(stacked), -1, dtype=np.int64)
+    renumber[keep] = np.arange(len(keep))
+    table = stacked.iloc[keep].reset_index(drop=True)
+    run_members = [renumber[last_of_group[np.asarray(m, dtype=np.int64)]] for m in member_keys]
+    _save_day_table(out_dir, table, run_names, run_members)
+
+    # Pack every other file of each run as independent compressed frames behind an index
+    index = {'codec': codec, 'members': {}}
+    tmp_pack = os.path.join(out_dir, PACK_FILE + '.tmp')
+    with open(tmp_pack, 'wb') as pack:
+        if old_index:
+            with open(os.path.join(out_dir, PACK_FILE), 'rb') as old_pack:
+                for name, entry in old_index['members'].items():
+                    old_pack.seek(entry['offset'])
+                    data = _decompress(old_pack.read(entry['length']), old_index['codec'])
+                    _pack_member(pack, index, name, data, codec)
+        for run in runs:
+            run_path = os.path.join(day_path, run)
+            for root, dirs, files in os.walk(run_path):
+                for name in sorted(files):
+                    if name == 'weather_data.csv':
+                        continue
+                    full = os.path.join(root, name)
+                    with open(full, 'rb') as f:
+                        data = f.read()
+                    member = f"{day}/{os.path.relpath(full, day_path).replace(os.sep, '/')}"
+                    _pack_member(pack, index, member, data, codec)
+    os.replace(tmp_pack, os.path.join(out_dir, PACK_FILE))
+    tmp_index = os.path.join(out_dir, INDEX_FILE + '.tmp')
+    with open(tmp_index, 'w', encoding='utf-8') as f:
+        json.dump(index, f)
+    os.replace(tmp_index, os.path.join(out_dir, INDEX_FILE))
+
+    if remove:
+        for run in runs:
+            shutil.rmtree(os.path.join(day_path, run))
+        if not os.listdir(day_path):
+            os.rmdir(day_path)
+
+    stats = {
+        'day': day,
+        'runs': len(runs),
+        'rows_in': len(stacked),
+        'rows_out': len(table),
+        'bytes_before': bytes_before,
+        'bytes_after': _dir_size(out_dir),
+    }
+    logger.info(f"Compacted {day}: {stats['runs']} runs, {stats['rows_in']} -> {stats['rows_out']} rows, "
+                f"{stats['bytes_before']} -> {stats['bytes_after']} bytes")
+    return stats
+
+def _pack_member(pack, index, name, data, codec):
+    blob = _compress(data, codec)
+    index['members'][name] = {'offset': pack.tell(), 'length': len(blob), 'size': len(data)}
+    pack.write(blob)
+
+# Compact every day older than keep_days; the newest days (and always the newest run) stay as
+# live run folders
+def compact_plots_tree(plots_dir, archive_dir=ARCHIVE_DIR, keep_days=2, codec=None, today=None):
+    cutoff = ((today or date.today()) - timedelta(days=keep_days)).isoformat()
+    results = []
+    for day in sorted(os.listdir(plots_dir)):
+        if day >= cutoff or not os.path.isdir(os.path.join(plots_dir, day)):
+            continue
+        stats = compact_day(plots_dir, day, archive_dir, codec)
+        if stats:
+            results.append(stats)
+    return results
+
+
+# ---- Readers ----
+
+# Rows of one run (CSV-shaped dicts), whether it is still live or already compacted
+def read_run(plots_dir, day, run, archive_dir=ARCHIVE_DIR):
+    csv_path = os.path.join(plots_dir, day, run, 'weather_data.csv')
+    if os.path.isfile(csv_path):
+        with open(csv_path, 'r', encoding='utf-8-sig') as f:
+            return list(csv.DictReader(f))
+    day_dir = os.path.join(archive_dir, day)
+    if not os.path.isfile(os.path.join(day_dir, TABLE_FILE)):
+        return []
+    table, runs = load_day_table(day_dir)
+    try:
+        i = runs['names'].index(f"{day}/{run}")
+    except ValueError:
+        return []
+    rows = table.iloc[runs['rows'][runs['offsets'][i]:runs['offsets'][i + 1]]]
+    return [{k: _cell_text(v) for k, v in r.items()} for r in rows.to_dict(orient='records')]
+
+# One packed file (PNG, GIF, bin, txt) of a compacted run, read without touching the rest
+def read_run_file(day, run, name, archive_dir=ARCHIVE_DIR):
+    day_dir = os.path.join(archive_dir, day)
+    with open(os.path.join(day_dir, INDEX_FILE), 'r', encoding='utf-8') as f:
+        index = json.load(f)
+    entry = index['members'].get(f"{day}/{run}/{name}")
+    if entry is None:
+        raise FileNotFoundError(f"{name} not archived for {day}/{run}")
+    with open(os.path.join(day_dir, PACK_FILE), 'rb') as pack:
+        pack.seek(entry['offset'])
+        return _decompress(pack.read(entry['length']), index['codec'])
+
+# Packed files called `name` across every archived day: {"day/run/.../name": uncompressed size}
+def list_archived_files(name, archive_dir=ARCHIVE_DIR):
+    found = {}
+    if not os.path.isdir(archive_dir):
+        return found
+    for day in sorted(os.listdir(archive_dir)):
+        index_path = os.path.join(archive_dir, day, INDEX_FILE)
+        if not os.path.isfile(index_path):
+            continue
+        with open(index_path, 'r', encoding='utf-8') as f:
+            members = json.load(f)['members']
+        found.update((member, entry['size']) for member, entry in members.items()
+                     if member.rsplit('/', 1)[-1] == name)
+    return found
+
+# Archived observations one day at a time as CSV-style strings, oldest day first
+def iter_archived_history(archive_dir=ARCHIVE_DIR):
+    if not os.path.isdir(archive_dir):
+        return
+    for day in sorted(os.listdir(archive_dir)):
+        day_dir = os.path.join(archive_dir, day)
+        if os.path.isfile(os.path.join(day_dir, TABLE_FILE)):
+            yield day, _as_text(load_day_table(day_dir)[0])
+
+# Every archived observation as CSV-style strings, oldest day first
+def load_archived_history(archive_dir=ARCHIVE_DIR):
+    frames = [frame for _, frame in iter_archived_history(archive_dir)]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+def list_runs(day, archive_dir=ARCHIVE_DIR):
+    _, runs = load_day_table(os.path.join(archive_dir, day))
+    return [name.split('/', 1)[1] for name in runs['names']]
+
+
+if __name__ == "__main__":
+    # Usage: python -m python.compaction [plots_dir] [keep_days]
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(name)s: %(message)s")
+    plots_dir = sys.argv[1] if len(sys.argv) > 1 else os.path.join('AI', 'targetFile', 'plots')
+    keep_days = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+    results = compact_plots_tree(plots_dir, keep_days=keep_days)
+    before = sum(r['bytes_before'] for r in results)
+    after = sum(r['bytes_after'] for r in results)
+    print(f"Compacted {len(results)} days: {before} -> {after} bytes")
@@ -0,0 +1,179 @@
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import tempfile
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from python import http_client
+from python import benchmark
+
+
+# Share of requests that get each fault; the rest are served normally
+DEFAULT_FAULTS = {'error': 0.15, 'throttle': 0.05, 'slow': 0.10, 'hang': 0.02, 'drop': 0.03}
+
+
+# Stand-in for api.weather.gov: /points, station lists and observations, with injected faults
+class FaultServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, faults=None, stations=20, rows=50, slow_seconds=1.0, hang_seconds=30.0, seed=0):
+        super().__init__(address, FaultHandler)
+        self.faults = dict(DEFAULT_FAULTS if faults is None else faults)
+        self.station_ids = [f"KT{i:02d}" for i in range(stations)]
+        self.rows = rows
+        self.slow_seconds = slow_seconds
+        self.hang_seconds = hang_seconds
+        self.outage_until = 0.0
+        self.counts = Counter()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._payloads = {}
+
+    @property
+    def base_url(self):
+        return f"http://{self.server_address[0]}:{self.server_address[1]}"
+
+    # Every request fails with 503 for the next `seconds`
+    def outage(self, seconds):
+        self.outage_until = time.monotonic() + seconds
+
+    def pick_fault(self):
+        with self._lock:
+            if time.monotonic() < self.outage_until:
+                return 'outage'
+            roll = self._rng.random()
+            for name, share in self.faults.items():
+                if roll < share:
+                    return name
+                roll -= share
+            return None
+
+    def payload(self, path):
+        if path not in self._payloads:
+            parts = path.strip('/').split('/')
+            if parts[0] == 'points':
+                body = {'properties': {
+                    'observationStations': f"{self.base_url}/gridpoints/TST/1,1/stations",
+                    'forecastGridData': f"{self.base_url}/gridpoints/TST/1,1",
+                    'timeZone': 'America/Boise',
+                }}
+            elif parts[0] == 'gridpoints' and parts[-1] == 'stations':
+                body = {'features': [{'properties': {'stationIdentifier': s}} for s in self.station_ids]}
+            elif parts[0] == 'stations' and len(parts) == 3 and parts[2] == 'observations':
+                body = benchmark.make_observation_geojson(self.rows, seed=len(self._payloads), station=parts[1])
+            else:
+                return None
+            self._payloads[path] = json.dumps(body).encode('utf-8')
+        return self._payloads[path]
+
+
+class FaultHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body=b'', headers=()):
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header('Content-Type', 'application/geo+json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server
+        fault = server.pick_fault()
+        server.counts[fault or 'ok'] += 1
+        if fault in ('error', 'outage'):
+            return self._send(503 if fault == 'outage' else random.choice((500, 502, 503)))
+        if fault == 'throttle':
+            return self._send(429, headers=[('Retry-After', '1')])
+        if fault == 'drop':
+            self.close_connection = True
+            self.connection.close()
+            return
+        if fault == 'slow':
+            time.sleep(server.slow_seconds)
+        if fault == 'hang':
+            time.sleep(server.hang_seconds)
+
+        body = server.payload(self.path)
+        if body is None:
+            return self._send(404, b'{"title": "Not Found"}')
+        self._send(200, body)
+
+
+def start(port=0, **kwargs):
+    server = FaultServer(('127.0.0.1', port), **kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# Poll every station `rounds` times through the resilience layer and tally the outcomes
+def poll_stations(server, rounds=3, workers=8, cache_dir=None):
+    cache_dir = cache_dir or tempfile.mkdtemp(prefix="mad_angler_http_")
+    urls = [f"{server.base_url}/stations/{s}/observations" for s in server.station_ids]
+    outcomes = Counter()
+    latencies = []
+
+    def fetch(url):
+        start = time.perf_counter()
+        try:
+            http_client.get_json(url, cache_dir=cache_dir)
+            result = 'stale' if http_client.served_stale() else 'fresh'
+        except http_client.UpstreamUnavailable:
+            result = 'failed'
+        latencies.append(time.perf_counter() - start)
+        return result
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for _ in range(rounds):
+            outcomes.update(pool.map(fetch, urls))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        'requests': len(urls) * rounds,
+        'elapsed_s': elapsed,
+        'per_s': len(urls) * rounds / elapsed,
+        'p50_s': latencies[len(latencies) // 2],
+        'max_s': latencies[-1],
+        'outcomes': dict(outcomes),
+        'server': dict(server.counts),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fault-injecting NOAA stub and a polling run against it.")
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--stations", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--outage", type=float, default=0.0, help="seconds of full 503 outage after the first round")
+    parser.add_argument("--serve", action="store_true", help="only run the stub (set MAD_ANGLER_NOAA_API to its URL)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.ERROR, format="[%(levelname)s] %(name)s: %(message)s")
+
+    server = start(args.port, stations=args.stations, hang_seconds=http_client.DEFAULT_TIMEOUT[1] + 5)
+    print(f"Fault server on {server.base_url}")
+    if args.serve:
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            sys.exit(0)
+
+    http_client.configure_host(server.server_address[0] + f":{server.server_address[1]}",
+                               rate=20.0, capacity=20, failure_threshold=8, reset_timeout=5.0)
+    cache_dir = tempfile.mkdtemp(prefix="mad_angler_http_")
+    print(poll_stations(server, rounds=1, workers=args.workers, cache_dir=cache_dir))
+    if args.outage:
+        server.outage(args.outage)
+    print(poll_stations(server, rounds=args.rounds, workers=args.workers, cache_dir=cache_dir))
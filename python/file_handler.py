@@ -1,6 +1,53 @@
 import os
+import re
 import ctypes
 import csv
+import struct
+import logging
+import numpy as np
+from python import profiling
+
+logger = logging.getLogger(__name__)
+
+# "csv" (default) or "sqlite": where load_latest_data reads and what save_to_csv mirrors into
+HISTORY_BACKEND = os.environ.get("MAD_ANGLER_HISTORY", "csv").lower()
+
+CSV_FIELDNAMES = [
+    "date", "time", "temperature (F)", "humidity (%)",
+    "barometric_pressure (hPa)", "weather",
+    "wind_speed (m/s)", "wind_direction (°)",
+    "dew_point (F)", "visibility (mi)", "cloud_cover", "ceiling (ft)",
+    "heat_index (F)", "wind_chill (F)", "precipitation_last_hour (in)",
+    "station_elevation (ft)", "station_name",
+    "species_target", "estimated_water_temp (F)", "fishing_note", "pressure_trend",
+    # Observation time in UTC seconds; date/time above are its local-time labels
+    "epoch_utc"
+]
+
+# Run folders are plots/<YYYY-MM-DD>/<HH-MM>/; anything else in the tree is not a run
+DATE_DIR_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+TIME_DIR_RE = re.compile(r"^\d{2}-\d{2}$")
+
+def _sorted_dirs(path, pattern):
+    try:
+        names = os.listdir(path)
+    except OSError:
+        return []
+    return sorted(n for n in names if pattern.match(n) and os.path.isdir(os.path.join(path, n)))
+
+# Every plots/<date>/<time> folder, oldest first
+def list_run_folders(plots_dir):
+    return [os.path.join(plots_dir, date_dir, time_dir)
+            for date_dir in _sorted_dirs(plots_dir, DATE_DIR_RE)
+            for time_dir in _sorted_dirs(os.path.join(plots_dir, date_dir), TIME_DIR_RE)]
+
+# Newest plots/<date>/<time> folder by name, or None when the tree has no runs
+def latest_run_folder(plots_dir):
+    for date_dir in reversed(_sorted_dirs(plots_dir, DATE_DIR_RE)):
+        time_dirs = _sorted_dirs(os.path.join(plots_dir, date_dir), TIME_DIR_RE)
+        if time_dirs:
+            return os.path.join(plots_dir, date_dir, time_dirs[-1])
+    return None
 
 def run_cpp_function(script_dir, dll_path):
 
@@ -15,9 +62,9 @@ def run_cpp_function(script_dir, dll_path):
     # Load the DLL
     try:
         mylib = ctypes.WinDLL(dll_path)
-        print("DLL loaded successfully!")
+        logger.info("DLL loaded successfully!")
     except OSError as e:
-        print(f"Failed to load DLL: {e}")
+        logger.error(f"Failed to load DLL: {e}")
 
     # Check for function
     if not hasattr(mylib, 'run'):
@@ -31,35 +78,35 @@ def run_cpp_function(script_dir, dll_path):
 
     mylib.run(directory, tag_file, code_file)
 
+@profiling.traced("persist.save_to_csv")
 def save_to_csv(data_list, filename):
-    fieldnames = [
-        "date", "time", "temperature (F)", "humidity (%)",
-        "barometric_pressure (hPa)", "weather",
-        "wind_speed (m/s)", "wind_direction (°)",
-        "dew_point (F)", "visibility (mi)", "cloud_cover", "ceiling (ft)",
-        "heat_index (F)", "wind_chill (F)", "precipitation_last_hour (in)",
-        "station_elevation (ft)", "station_name",
-        "species_target", "estimated_water_temp (F)", "fishing_note", "pressure_trend"
-    ]
+    fieldnames = CSV_FIELDNAMES
     os.makedirs(os.path.dirname(filename), exist_ok=True)
     with open(filename, 'w', newline='', encoding='utf-8-sig') as csvfile:
         writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
         writer.writeheader()
         for row in data_list:
             writer.writerow(row)
-    print(f"Data saved to {filename}")
+    profiling.current().record(rows=len(data_list), bytes=os.path.getsize(filename))
+    logger.info(f"Data saved to {filename}")
 
+    # Mirror the run into the SQLite history when that backend is on
+    if HISTORY_BACKEND == "sqlite":
+        from python import history_db
+        history_db.save_rows(data_list, history_db.run_from_csv_path(filename))
+
+@profiling.traced("persist.parse_weather_csvs")
 def parse_weather_csvs(plots_dir, dll_path):
     script_dir = os.path.dirname(os.path.abspath(__file__))
     # Load DLL
     try:
         mylib = ctypes.WinDLL(dll_path)
     except Exception as e:
-        print(f"Failed to load DLL: {e}")
+        logger.error(f"Failed to load DLL: {e}")
         return
 
     if not hasattr(mylib, 'package_csvs_to_bin'):
-        print("DLL does not contain 'package_csvs_to_bin'")
+        logger.error("DLL does not contain 'package_csvs_to_bin'")
         return
 
     package_csvs_to_bin = mylib.package_csvs_to_bin
@@ -75,34 +122,41 @@ def parse_weather_csvs(plots_dir, dll_path):
     # Call DLL with the cleaned CSV folder
     try:
         package_csvs_to_bin(latest_data_folder.encode('utf-8'), output_bin.encode('utf-8'))
-        print("Weather CSVs packaged successfully.")
+        logger.info("Weather CSVs packaged successfully.")
     except Exception as e:
-        print(f"Error calling DLL or computing trajectory: {e}")
+        logger.error(f"Error calling DLL or computing trajectory: {e}")
 
 #Load csv before displaying it
+@profiling.traced("persist.load_latest_data")
 def load_latest_data():
+    if HISTORY_BACKEND == "sqlite":
+        from python import history_db
+        rows = history_db.load_latest_run()
+        if rows:
+            profiling.current().record(rows=len(rows))
+            return rows
+
     base_path = os.path.join('AI', 'targetFile', 'plots')
-    if not os.path.exists(base_path):
+    latest_folder = latest_run_folder(base_path)
+    if not latest_folder:
         return []
-
-    # Find latest folder
-    latest_date = sorted(os.listdir(base_path))[-1]
-    latest_time = sorted(os.listdir(os.path.join(base_path, latest_date)))[-1]
-    csv_path = os.path.join(base_path, latest_date, latest_time, 'weather_data.csv')
+    csv_path = os.path.join(latest_folder, 'weather_data.csv')
 
     if not os.path.isfile(csv_path):
         return []
 
     with open(csv_path, 'r', encoding='utf-8-sig') as f:
-        reader = csv.DictReader(f)
-        return list(reader)   
+        rows = list(csv.DictReader(f))
+    profiling.current().record(rows=len(rows), bytes=os.path.getsize(csv_path))
+    return rows
     
+@profiling.traced("persist.get_latest_weather_data_folder")
 def get_latest_weather_data_folder(root_plots_dir):
     latest_file = None
     latest_mtime = -1
     latest_folder = None
 
-    print(f"Walking: {root_plots_dir}")
+    logger.debug(f"Walking: {root_plots_dir}")
 
     for root, dirs, files in os.walk(root_plots_dir):
         for file in files:
@@ -110,34 +164,35 @@ def get_latest_weather_data_folder(root_plots_dir):
                 full_path = os.path.join(root, file)
                 try:
                     mtime = os.path.getmtime(full_path)
-                    print(f"Found: {full_path} (mtime={mtime})")
+                    logger.debug(f"Found: {full_path} (mtime={mtime})")
                     if mtime > latest_mtime:
                         latest_mtime = mtime
                         latest_file = full_path
                         latest_folder = os.path.dirname(full_path)
                 except Exception as e:
-                    print(f"Error reading file time for: {full_path} – {e}")
+                    logger.warning(f"Error reading file time for: {full_path} – {e}")
 
     if latest_folder:
-        print(f"Latest folder: {latest_folder}")
+        logger.info(f"Latest folder: {latest_folder}")
     else:
-        print("No valid weather_data.csv found")
+        logger.warning("No valid weather_data.csv found")
 
     return latest_folder
 
 def get_last_known_data_var():
     base_path = os.path.join('AI', 'targetFile', 'plots')
-    if not os.path.exists(base_path):
-        print("No saved plots directory found.")
+    latest_folder = latest_run_folder(base_path)
+    if not latest_folder:
+        logger.warning("No saved run folders found.")
         return None, None, {}
 
     # Find latest date and time folder
-    latest_date = sorted(os.listdir(base_path))[-1]
-    latest_time = sorted(os.listdir(os.path.join(base_path, latest_date)))[-1]
-    csv_path = os.path.join(base_path, latest_date, latest_time, 'weather_data.csv')
+    latest_date = os.path.basename(os.path.dirname(latest_folder))
+    latest_time = os.path.basename(latest_folder)
+    csv_path = os.path.join(latest_folder, 'weather_data.csv')
 
     if not os.path.isfile(csv_path):
-        print("No weather data CSV found in the latest folder.")
+        logger.warning("No weather data CSV found in the latest folder.")
         return None, None, {}
 
     with open(csv_path, 'r', encoding='utf-8-sig') as f:
@@ -149,7 +204,7 @@ def get_last_known_data_var():
                 pressure = float(row['barometric_pressure (hPa)'])
                 wind = float(row['wind_speed (m/s)'])
                 if None not in (temp, humidity, pressure, wind):
-                    print(f"Recovered valid data from last known row at {latest_date} {latest_time}")
+                    logger.info(f"Recovered valid data from last known row at {latest_date} {latest_time}")
                     return latest_date, latest_time, {
                         'temperature': temp,
                         'humidity': humidity,
@@ -159,5 +214,79 @@ def get_last_known_data_var():
             except (ValueError, TypeError):
                 continue
 
-    print("No valid row with complete weather data found.")
+    logger.warning("No valid row with complete weather data found.")
     return None, None, {}
+
+# Every observation across runs as CSV-style strings, one row per station and timestamp.
+# Compacted days are read from the archive first, then the live run folders.
+def load_history_frame(plots_dir, archive_dir=None):
+    import pandas as pd
+    from python import compaction
+
+    archived = compaction.load_archived_history(archive_dir or compaction.ARCHIVE_DIR)
+    frames = [] if archived.empty else [archived]
+    for run_folder in list_run_folders(plots_dir):
+        csv_path = os.path.join(run_folder, 'weather_data.csv')
+        if os.path.isfile(csv_path):
+            frames.append(pd.read_csv(csv_path, encoding='utf-8-sig', dtype=str, keep_default_na=False))
+    if not frames:
+        return pd.DataFrame()
+    from python import station_observation
+
+    history = pd.concat(frames, ignore_index=True)
+    # Consecutive pulls overlap: keep one row per station and observation time (UTC)
+    epochs = station_observation.row_epochs(history)
+    history = history.assign(_epoch=epochs).drop_duplicates(subset=['station_name', '_epoch'], keep='last')
+    return history.sort_values('_epoch', kind='stable').drop(columns='_epoch').reset_index(drop=True)
+
+
+# Binary trajectory layout: uint32 point count followed by packed 'fffif' records
+TRAJECTORY_DTYPE = np.dtype([
+    ('dx', '<f4'),
+    ('dy', '<f4'),
+    ('dz', '<f4'),
+    ('quadrant', '<i4'),
+    ('magnitude', '<f4'),
+])
+
+@profiling.traced("persist.read_trajectory_bin")
+def read_trajectory_bin(bin_path):
+    with open(bin_path, 'rb') as f:
+        count_bytes = f.read(4)
+        if len(count_bytes) < 4:
+            return np.empty(0, dtype=TRAJECTORY_DTYPE)
+        point_count = struct.unpack('<I', count_bytes)[0]
+        records = np.fromfile(f, dtype=TRAJECTORY_DTYPE, count=point_count)
+    # A truncated file yields fewer records than the header promises
+    profiling.current().record(rows=len(records), bytes=records.nbytes)
+    return records
+
+# Same layout from bytes already in memory (e.g. a bin read back from the archive)
+def parse_trajectory_bytes(data):
+    if len(data) < 4:
+        return np.empty(0, dtype=TRAJECTORY_DTYPE)
+    point_count = struct.unpack_from('<I', data)[0]
+    point_count = min(point_count, (len(data) - 4) // TRAJECTORY_DTYPE.itemsize)
+    return np.frombuffer(data, dtype=TRAJECTORY_DTYPE, count=point_count, offset=4)
+
+def write_trajectory_bin(bin_path, records):
+    records = np.asarray(records, dtype=TRAJECTORY_DTYPE)
+    os.makedirs(os.path.dirname(bin_path) or '.', exist_ok=True)
+    with open(bin_path, 'wb') as f:
+        f.write(struct.pack('<I', len(records)))
+        records.tofile(f)
+    return bin_path
+
+# Same format, written chunk by chunk; the count header is patched in at the end
+def stream_trajectory_bin(bin_path, chunks):
+    os.makedirs(os.path.dirname(bin_path) or '.', exist_ok=True)
+    total = 0
+    with open(bin_path, 'wb') as f:
+        f.write(struct.pack('<I', 0))
+        for chunk in chunks:
+            chunk = np.asarray(chunk, dtype=TRAJECTORY_DTYPE)
+            chunk.tofile(f)
+            total += len(chunk)
+        f.seek(0)
+        f.write(struct.pack('<I', total))
+    return total
@@ -0,0 +1,135 @@
+import os
+import csv
+import time
+import numpy as np
+import pandas as pd
+
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fish_rules.csv")
+DEFAULT_REGION = "default"
+DEFAULT_ADVICE = "Marginal conditions."
+# Which ends of a row's range are inclusive (the `closed` column, as in pandas.Interval)
+CLOSED_SIDES = {"left": (True, False), "right": (False, True), "both": (True, True), "neither": (False, False)}
+DEFAULT_CLOSED = "left"
+
+
+# Rule table compiled into sorted [min_temp, max_temp) intervals per (region, species).
+# Rows closed on other sides are shifted to the next float so one half-open search covers them.
+class CompiledRules:
+
+    def __init__(self, rules):
+        self.tables = {}
+        for key, intervals in rules.items():
+            intervals.sort(key=lambda r: r[0])
+            lows = np.array([r[0] for r in intervals], dtype=np.float64)
+            highs = np.array([r[1] for r in intervals], dtype=np.float64)
+            if np.any(lows[1:] < highs[:-1]):
+                raise ValueError(f"Overlapping temperature ranges for {key}")
+            # Trailing DEFAULT_ADVICE slot catches gaps and out-of-range temperatures
+            advice = np.array([r[2] for r in intervals] + [DEFAULT_ADVICE], dtype=object)
+            self.tables[key] = (lows, highs, advice)
+
+    def _table(self, species, region):
+        return self.tables.get((region, species)) or self.tables.get((DEFAULT_REGION, species))
+
+    def species(self, region=DEFAULT_REGION):
+        return sorted({s for r, s in self.tables if r in (region, DEFAULT_REGION)})
+
+    def _indices(self, table, water_temps):
+        lows, highs, advice = table
+        idx = np.searchsorted(lows, water_temps, side='right') - 1
+        inside = (idx >= 0) & (water_temps < highs[np.maximum(idx, 0)])
+        return np.where(inside, idx, len(advice) - 1)
+
+    def lookup(self, water_temp, species, region=DEFAULT_REGION):
+        table = self._table(species, region)
+        if table is None or water_temp is None or water_temp != water_temp:
+            return DEFAULT_ADVICE
+        return table[2][self._indices(table, np.float64(water_temp))]
+
+    # Advice for whole arrays; one binary search per species group
+    def lookup_array(self, water_temps, species, region=DEFAULT_REGION):
+        water_temps = np.asarray(water_temps, dtype=np.float64)
+        species = np.asarray(species, dtype=object)
+        result = np.full(water_temps.shape, DEFAULT_ADVICE, dtype=object)
+        # Hash-based grouping: one pass over the species column
+        groups, names = pd.factorize(species.ravel(), use_na_sentinel=True)
+        for i, name in enumerate(names):
+            table = self._table(name, region)
+            if table is None:
+                continue
+            mask = groups.reshape(species.shape) == i
+            result[mask] = table[2][self._indices(table, water_temps[mask])]
+        return result
+
+    def annotate(self, frame, temp_column="estimated_water_temp (F)", species_column="species_target",
+                 region=DEFAULT_REGION, note_column="fishing_note"):
+        frame = frame.copy()
+        frame[note_column] = self.lookup_array(
+            frame[temp_column].to_numpy(dtype=np.float64), frame[species_column].to_numpy(), region
+        )
+        return frame
+
+
+def _bound(text, missing):
+    text = (text or "").strip()
+    return float(text) if text else missing
+
+def _half_open(low, high, closed):
+    include_low, include_high = CLOSED_SIDES[closed]
+    if not include_low:
+        low = np.nextafter(low, np.inf)
+    if include_high:
+        high = np.nextafter(high, np.inf)
+    return low, high
+
+def load_rules(path=DEFAULT_RULES_PATH):
+    rules = {}
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        for line_no, row in enumerate(csv.DictReader(f), start=2):
+            try:
+                low = _bound(row['min_temp'], -np.inf)
+                high = _bound(row['max_temp'], np.inf)
+            except ValueError as e:
+                raise ValueError(f"{path}:{line_no}: bad temperature bound ({e})")
+            if low >= high:
+                raise ValueError(f"{path}:{line_no}: min_temp must be below max_temp")
+            closed = (row.get('closed') or DEFAULT_CLOSED).strip()
+            if closed not in CLOSED_SIDES:
+                raise ValueError(f"{path}:{line_no}: closed must be one of {', '.join(CLOSED_SIDES)}")
+            low, high = _half_open(low, high, closed)
+            key = ((row.get('region') or DEFAULT_REGION).strip(), row['species'].strip())
+            rules.setdefault(key, []).append((low, high, row['advice'].strip()))
+    return CompiledRules(rules)
+
+# Compiled default table, loaded on first use
+_default_rules = None
+
+def get_default_rules():
+    global _default_rules
+    if _default_rules is None:
+        _default_rules = load_rules()
+    return _default_rules
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    for _ in range(100):
+        rules = load_rules()
+    load_s = (time.perf_counter() - start) / 100
+    print(f"Load + compile: {load_s * 1000:.3f} ms ({sum(len(t[0]) for t in rules.tables.values())} rules)")
+
+    rng = np.random.default_rng(0)
+    temps = rng.uniform(30, 95, 1_000_000)
+    species = rng.choice(np.array(rules.species(), dtype=object), len(temps))
+
+    start = time.perf_counter()
+    for t, s in zip(temps[:100_000], species[:100_000]):
+        rules.lookup(t, s)
+    scalar_s = time.perf_counter() - start
+    print(f"Scalar lookup:     {100_000 / scalar_s:12,.0f} lookups/s")
+
+    start = time.perf_counter()
+    rules.lookup_array(temps, species)
+    vector_s = time.perf_counter() - start
+    print(f"Vectorized lookup: {len(temps) / vector_s:12,.0f} lookups/s")
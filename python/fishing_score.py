@@ -0,0 +1,164 @@
+import os
+import sys
+import time
+import ctypes
+import logging
+import numpy as np
+from python import file_handler
+from python import bite_patterns
+
+logger = logging.getLogger(__name__)
+
+# Blend between pattern evidence and how steady the force-field magnitudes are
+PATTERN_WEIGHT = 0.7
+MAGNITUDE_WEIGHT = 0.3
+
+
+# Vectorized pattern probabilities over a quadrant code array
+def pattern_probabilities(quadrants, patterns=None, collapse=False):
+    patterns = bite_patterns.BITE_PATTERNS if patterns is None else patterns
+    quadrants = np.asarray(quadrants, dtype=np.int32)
+    if collapse and len(quadrants):
+        # One symbol per zone visit, the way mined motifs are counted
+        quadrants = quadrants[np.concatenate(([True], quadrants[1:] != quadrants[:-1]))]
+    results = []
+    for pattern in patterns:
+        codes = np.fromiter((ord(p) for p in pattern), dtype=np.int32, count=len(pattern))
+        windows = len(quadrants) - len(codes) + 1
+        if windows <= 0:
+            results.append(('-'.join(pattern), 0, max(windows, 0), 0.0))
+            continue
+        view = np.lib.stride_tricks.sliding_window_view(quadrants, len(codes))
+        matches = int(np.count_nonzero((view == codes).all(axis=1)))
+        results.append(('-'.join(pattern), matches, windows, matches / windows))
+    return results
+
+def score_from_records(records, patterns=None):
+    if len(records) == 0:
+        return 0.0
+
+    probabilities = np.array([p for _, _, _, p in pattern_probabilities(records['quadrant'], patterns)])
+    # Chance that at least one productive pattern fires at any step
+    pattern_component = 1.0 - np.prod(1.0 - probabilities)
+
+    magnitude = records['magnitude'].astype(np.float64)
+    magnitude = magnitude[np.isfinite(magnitude)]
+    if magnitude.size == 0:
+        magnitude_component = 0.0
+    else:
+        mean = np.abs(magnitude).mean()
+        # Coefficient of variation: calm, steady trajectories score higher
+        cv = magnitude.std() / mean if mean > 0 else 0.0
+        magnitude_component = 1.0 / (1.0 + cv)
+
+    score = 100.0 * (PATTERN_WEIGHT * pattern_component + MAGNITUDE_WEIGHT * magnitude_component)
+    return float(np.clip(score, 0.0, 100.0))
+
+
+# Scoring backends: each exposes name and score(bin_path) -> float in [0, 100]
+class CpuScoreBackend:
+    name = "cpu"
+
+    def score(self, bin_path):
+        return score_from_records(file_handler.read_trajectory_bin(bin_path))
+
+class DllScoreBackend:
+    name = "dll"
+
+    def __init__(self, dll_path):
+        if not hasattr(ctypes, "WinDLL"):
+            raise OSError("WinDLL is only available on Windows")
+        if not dll_path or not os.path.exists(dll_path):
+            raise FileNotFoundError(f"DLL file not found at path: {dll_path}")
+        mylib = ctypes.WinDLL(dll_path)
+        self._get_score = mylib.get_fishing_score
+        self._get_score.argtypes = [ctypes.c_char_p]
+        self._get_score.restype = ctypes.c_float
+
+    def score(self, bin_path):
+        return float(self._get_score(bin_path.encode("utf-8")))
+
+SCORE_BACKENDS = {
+    CpuScoreBackend.name: lambda dll_path=None: CpuScoreBackend(),
+    DllScoreBackend.name: lambda dll_path=None: DllScoreBackend(dll_path),
+}
+
+# Prefer the DLL when it loads, otherwise fall back to the NumPy engine
+def get_score_backend(dll_path=None, preferred=None):
+    order = [preferred] if preferred else [DllScoreBackend.name, CpuScoreBackend.name]
+    for name in order:
+        if name not in SCORE_BACKENDS:
+            raise ValueError(f"Unknown score backend: {name}")
+        try:
+            return SCORE_BACKENDS[name](dll_path)
+        except (OSError, AttributeError) as e:
+            if preferred:
+                raise
+            logger.info(f"Score backend '{name}' unavailable: {e}")
+    return CpuScoreBackend()
+
+
+# Time each backend over the same bin files
+def benchmark_backends(bin_paths, backends, repeat=5):
+    results = {}
+    for backend in backends:
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for bin_path in bin_paths:
+                backend.score(bin_path)
+            timings.append(time.perf_counter() - start)
+        best = min(timings)
+        results[backend.name] = {
+            'best_s': best,
+            'mean_s': sum(timings) / len(timings),
+            'files_per_s': len(bin_paths) / best if best > 0 else float('inf'),
+        }
+    return results
+
+# Compare scores of two backends file by file
+def compare_backends(bin_paths, reference, candidate, tolerance=0.5):
+    rows = []
+    for bin_path in bin_paths:
+        ref_score = reference.score(bin_path)
+        cand_score = candidate.score(bin_path)
+        diff = abs(ref_score - cand_score)
+        rows.append((bin_path, ref_score, cand_score, diff, diff <= tolerance))
+    return rows
+
+def make_synthetic_trajectory(point_count, seed=0):
+    rng = np.random.default_rng(seed)
+    records = np.empty(point_count, dtype=file_handler.TRAJECTORY_DTYPE)
+    records['dx'] = rng.normal(0, 1, point_count)
+    records['dy'] = rng.normal(0, 1, point_count)
+    records['dz'] = rng.normal(0, 1, point_count)
+    records['quadrant'] = rng.choice(np.frombuffer(b'abcdefghx', dtype=np.uint8), point_count)
+    records['magnitude'] = np.sqrt(records['dx'] ** 2 + records['dy'] ** 2 + records['dz'] ** 2)
+    return records
+
+
+if __name__ == "__main__":
+    # Usage: python -m python.fishing_score [dll_path] [bin files...]
+    dll_path = sys.argv[1] if len(sys.argv) > 1 else None
+    bin_paths = sys.argv[2:]
+    if not bin_paths:
+        import tempfile
+        tmp_dir = tempfile.mkdtemp(prefix="score_bench_")
+        for i, size in enumerate((1_000, 10_000, 100_000)):
+            path = os.path.join(tmp_dir, f"trajectory_{size}.bin")
+            file_handler.write_trajectory_bin(path, make_synthetic_trajectory(size, seed=i))
+            bin_paths.append(path)
+
+    backends = [CpuScoreBackend()]
+    try:
+        backends.append(DllScoreBackend(dll_path))
+    except (OSError, AttributeError) as e:
+        print(f"[WARN] DLL backend unavailable: {e}")
+
+    for name, stats in benchmark_backends(bin_paths, backends).items():
+        print(f"{name:4} | best {stats['best_s'] * 1000:8.2f} ms | {stats['files_per_s']:8.1f} files/s")
+
+    if len(backends) > 1:
+        print("\nParity (dll vs cpu):")
+        for path, ref, cand, diff, ok in compare_backends(bin_paths, backends[1], backends[0]):
+            print(f"{os.path.basename(path):30} | dll {ref:6.2f} | cpu {cand:6.2f} | diff {diff:5.2f} | {'OK' if ok else 'MISMATCH'}")
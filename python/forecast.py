@@ -0,0 +1,236 @@
+import os
+import re
+import json
+import time
+import hashlib
+import numpy as np
+import pandas as pd
+from email.utils import parsedate_to_datetime
+from python import station_observation
+from python import weather
+from python import water_temp
+from python import fish_rules
+from python import profiling
+from python import http_client
+from python import station_catalog
+
+
+FORECAST_CACHE_DIR = os.path.join('AI', 'targetFile', 'cache', 'forecast')
+
+# Gridpoint layers pulled into the hourly table
+GRID_LAYERS = {
+    'temperature': 'temperature (F)',
+    'relativeHumidity': 'humidity (%)',
+    'windSpeed': 'wind_speed (m/s)',
+    'windDirection': 'wind_direction (°)',
+    'dewpoint': 'dew_point (F)',
+    'skyCover': 'cloud_cover',
+    'pressure': 'barometric_pressure (hPa)',
+    'quantitativePrecipitation': 'precipitation_last_hour (in)',
+}
+
+# Fallback when the gridpoint has no pressure layer and no observation is given
+STANDARD_PRESSURE_HPA = 1013.25
+
+_DURATION_RE = r'^P(?:(?P<days>\d+)D)?(?:T(?:(?P<hours>\d+)H)?(?:(?P<minutes>\d+)M)?)?$'
+
+# In-process copy of decoded responses so repeated views skip the disk too
+_memory_cache = {}
+
+
+def _cache_path(url, cache_dir):
+    return os.path.join(cache_dir, hashlib.sha1(url.encode('utf-8')).hexdigest() + '.json')
+
+# Expiry from Cache-Control max-age, else Expires, else a short default
+def _expiry_from_headers(headers, default_ttl=900):
+    cache_control = headers.get('Cache-Control', '')
+    match = re.search(r'max-age=(\d+)', cache_control)
+    if match:
+        return time.time() + int(match.group(1))
+    expires = headers.get('Expires')
+    if expires:
+        try:
+            return parsedate_to_datetime(expires).timestamp()
+        except (TypeError, ValueError):
+            pass
+    return time.time() + default_ttl
+
+# GET a JSON document, honouring the API's expiry headers across runs
+@profiling.traced("fetch.forecast_json")
+def fetch_cached_json(url, cache_dir=FORECAST_CACHE_DIR):
+    now = time.time()
+    entry = _memory_cache.get(url)
+    if entry is None:
+        path = _cache_path(url, cache_dir)
+        if os.path.isfile(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+
+    if entry and entry['expires'] > now:
+        _memory_cache[url] = entry
+        return entry['body']
+
+    headers = dict(station_observation.HEADERS)
+    if entry and entry.get('etag'):
+        headers['If-None-Match'] = entry['etag']
+    print(f"Requesting forecast data from: {url}")
+    try:
+        response = http_client.request(url, headers)
+    except http_client.UpstreamUnavailable as e:
+        # An expired forecast beats none while the API is down
+        if entry is None:
+            raise
+        print(f"[WARN] {e}; using cached forecast")
+        _memory_cache[url] = entry
+        return entry['body']
+
+    if response.status_code == 304 and entry:
+        entry['expires'] = _expiry_from_headers(response.headers)
+    else:
+        entry = {
+            'url': url,
+            'expires': _expiry_from_headers(response.headers),
+            'etag': response.headers.get('ETag'),
+            'body': response.json(),
+        }
+
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(_cache_path(url, cache_dir), 'w', encoding='utf-8') as f:
+        json.dump(entry, f)
+    _memory_cache[url] = entry
+    return entry['body']
+
+
+# Decode ISO-8601 "start/duration" validTimes into whole-hour start offsets and lengths
+def decode_valid_times(valid_times):
+    parts = pd.Series(valid_times, dtype='string').str.split('/', n=1, expand=True)
+    starts = pd.to_datetime(parts[0], utc=True, format='ISO8601')
+    start_hours = ((starts - pd.Timestamp(0, tz='UTC')) // pd.Timedelta(hours=1)).to_numpy(dtype=np.int64)
+
+    duration = parts[1].str.extract(_DURATION_RE).fillna('0').astype(np.int64)
+    hours = duration['days'].to_numpy() * 24 + duration['hours'].to_numpy() + (duration['minutes'].to_numpy() > 0)
+    return start_hours, np.maximum(hours, 1)
+
+# Expand one layer's interval values onto a regular hourly axis
+def layer_to_hourly(layer, base_hour, hour_count, spread=False):
+    values = layer.get('values', []) if layer else []
+    hourly = np.full(hour_count, np.nan)
+    if not values:
+        return hourly
+
+    valid_times = [v['validTime'] for v in values]
+    raw = np.array([np.nan if v['value'] is None else v['value'] for v in values], dtype=np.float64)
+    start_hours, lengths = decode_valid_times(valid_times)
+    if spread:
+        # Accumulations (precipitation) are shared evenly over their interval
+        raw = raw / lengths
+
+    # Hour index for every hour covered by every interval, without a Python loop
+    offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    idx = np.repeat(start_hours - base_hour, lengths) + offsets
+    vals = np.repeat(raw, lengths)
+    keep = (idx >= 0) & (idx < hour_count)
+    hourly[idx[keep]] = vals[keep]
+    return hourly
+
+def _convert_units(column, values, unit_code):
+    unit = (unit_code or '').split(':')[-1]
+    if unit == 'degC':
+        return values * 9 / 5 + 32
+    if unit == 'Pa':
+        return values / 100.0
+    if unit == 'mm' and column == 'precipitation_last_hour (in)':
+        return values / 25.4
+    # Wind stays in the API's unit, same as retrieve_observations stores it
+    return values
+
+# Regular hourly forecast table from a forecastGridData document
+def decode_gridpoint(grid_props, hours=168, start=None, fallback_pressure=None):
+    start = pd.Timestamp.now(tz='UTC') if start is None else pd.Timestamp(start)
+    base_hour = int(start.floor('h').timestamp() // 3600)
+
+    frame = pd.DataFrame({'valid_time': pd.to_datetime((base_hour + np.arange(hours)) * 3600, unit='s', utc=True)})
+    for layer_name, column in GRID_LAYERS.items():
+        layer = grid_props.get(layer_name)
+        hourly = layer_to_hourly(layer, base_hour, hours, spread=(layer_name == 'quantitativePrecipitation'))
+        frame[column] = _convert_units(column, hourly, layer.get('uom') if layer else None)
+
+    pressure = frame['barometric_pressure (hPa)']
+    if pressure.isna().all():
+        # No pressure layer: hold the last observed pressure (or standard) flat
+        frame['barometric_pressure (hPa)'] = fallback_pressure or STANDARD_PRESSURE_HPA
+    else:
+        frame['barometric_pressure (hPa)'] = pressure.ffill().bfill()
+
+    elevation_m = (grid_props.get('elevation') or {}).get('value')
+    frame['station_elevation (ft)'] = elevation_m * 3.28084 if elevation_m is not None else np.nan
+    return frame
+
+# Lagged water temperature over the forecast hours, continued from a station's stored state
+# when one is given. Hours without a forecast air temperature stay NaN (no estimate, no advice).
+def forecast_water_temp(frame, hour=None, seed=None):
+    temp = frame['temperature (F)'].to_numpy(dtype=np.float64)
+    valid = ~np.isnan(temp)
+    estimates = np.full(len(frame), np.nan)
+    if not valid.any():
+        return estimates
+    epochs = ((frame['valid_time'] - pd.Timestamp(0, tz='UTC')) // pd.Timedelta(seconds=1)).to_numpy(dtype=np.float64)[valid]
+    start = {}
+    if seed and seed['epoch'] <= epochs[0]:
+        start = {'initial_temp': seed['water_temp'], 'initial_epoch': seed['epoch']}
+    rows = frame[valid]
+    estimates[valid] = water_temp.backfill(
+        epochs, temp[valid], rows['wind_speed (m/s)'], rows['dew_point (F)'], rows['cloud_cover'],
+        rows['precipitation_last_hour (in)'], rows['station_elevation (ft)'],
+        hour=None if hour is None else np.asarray(hour)[valid], **start
+    )
+    return np.round(estimates, 1)
+
+# Zones, water temperature and advice through the same rules as observations
+def annotate_forecast(frame, time_zone=None, lat=None, water_seed=None):
+    frame = frame.copy()
+    hour = None
+    if time_zone:
+        local = frame['valid_time'].dt.tz_convert(time_zone)
+        frame['date'] = local.dt.strftime('%Y-%m-%d')
+        frame['time'] = local.dt.strftime('%H:%M')
+        hour = (local.dt.hour + local.dt.minute / 60.0).to_numpy()
+
+    temp = frame['temperature (F)'].to_numpy()
+    wind = frame['wind_speed (m/s)'].to_numpy()
+    elevation = frame['station_elevation (ft)'].to_numpy()
+    frame['zone'] = weather.classify_conditions_array(temp, frame['humidity (%)'], frame['barometric_pressure (hPa)'], wind)
+    frame['species_target'] = station_catalog.species_for_array(elevation, lat)
+    frame['estimated_water_temp (F)'] = forecast_water_temp(frame, hour, water_seed)
+    frame['fishing_note'] = fish_rules.get_default_rules().lookup_array(
+        frame['estimated_water_temp (F)'], frame['species_target']
+    )
+    diff = frame['barometric_pressure (hPa)'].diff()
+    frame['pressure_trend'] = np.select([diff > 0, diff < 0], ["Rising", "Falling"], default="N/A")
+    return frame
+
+# Per-day summary of the hourly outlook
+def daily_outlook(frame):
+    day = frame['date'] if 'date' in frame else frame['valid_time'].dt.strftime('%Y-%m-%d')
+    grouped = frame.assign(day=day, ideal=(frame['zone'] == 'b')).groupby('day')
+    return pd.DataFrame({
+        'dominant_zone': grouped['zone'].agg(lambda z: z.mode().iat[0]),
+        'ideal_hours': grouped['ideal'].sum(),
+        'min_temp (F)': grouped['temperature (F)'].min(),
+        'max_temp (F)': grouped['temperature (F)'].max(),
+        'mean_water_temp (F)': grouped['estimated_water_temp (F)'].mean().round(1),
+        'fishing_note': grouped['fishing_note'].agg(lambda n: n.mode().iat[0]),
+    })
+
+# 7-day fishing outlook for a location, reusing cached gridpoint forecasts. With a station_id
+# the water temperature continues from that station's observed state (the state is not updated).
+def get_fishing_outlook(lat, lon, hours=168, fallback_pressure=None, cache_dir=FORECAST_CACHE_DIR,
+                        station_id=None):
+    points = fetch_cached_json(f"https://api.weather.gov/points/{lat},{lon}", cache_dir)['properties']
+    grid = fetch_cached_json(points['forecastGridData'], cache_dir)['properties']
+    water_seed = water_temp.load_state().get(station_id) if station_id else None
+    hourly = annotate_forecast(
+        decode_gridpoint(grid, hours=hours, fallback_pressure=fallback_pressure),
+        time_zone=points.get('timeZone'), lat=lat, water_seed=water_seed
+    )
+    return hourly, daily_outlook(hourly)
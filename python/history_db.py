@@ -0,0 +1,272 @@
+import os
+import csv
+import sys
+import time
+import sqlite3
+import logging
+import tzlocal
+import numpy as np
+import pandas as pd
+from python import weather
+
+logger = logging.getLogger(__name__)
+
+HISTORY_DB_PATH = os.path.join('AI', 'targetFile', 'history.sqlite')
+INSERT_BATCH = 5_000
+
+# CSV field -> SQLite column, in save_to_csv order
+COLUMNS = [
+    ("date", "date", "TEXT"),
+    ("time", "time", "TEXT"),
+    ("temperature (F)", "temperature_f", "REAL"),
+    ("humidity (%)", "humidity_pct", "REAL"),
+    ("barometric_pressure (hPa)", "pressure_hpa", "REAL"),
+    ("weather", "weather", "TEXT"),
+    ("wind_speed (m/s)", "wind_speed", "REAL"),
+    ("wind_direction (°)", "wind_direction", "REAL"),
+    ("dew_point (F)", "dew_point_f", "REAL"),
+    ("visibility (mi)", "visibility_mi", "REAL"),
+    ("cloud_cover", "cloud_cover", "TEXT"),
+    ("ceiling (ft)", "ceiling_ft", "REAL"),
+    ("heat_index (F)", "heat_index_f", "REAL"),
+    ("wind_chill (F)", "wind_chill_f", "REAL"),
+    ("precipitation_last_hour (in)", "precip_in", "REAL"),
+    ("station_elevation (ft)", "elevation_ft", "REAL"),
+    ("station_name", "station", "TEXT"),
+    ("species_target", "species_target", "TEXT"),
+    ("estimated_water_temp (F)", "water_temp_f", "REAL"),
+    ("fishing_note", "fishing_note", "TEXT"),
+    ("pressure_trend", "pressure_trend", "TEXT"),
+    ("epoch_utc", "epoch_utc", "INTEGER"),
+]
+FIELD_TO_COLUMN = {field: column for field, column, _ in COLUMNS}
+QUERY_OPS = {"<", "<=", ">", ">=", "=", "!="}
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY,
+    run TEXT UNIQUE NOT NULL,
+    saved_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS observations (
+    station TEXT NOT NULL,
+    zone TEXT,
+    run_id INTEGER REFERENCES runs(run_id),
+    {", ".join(f"{column} {kind}" for _, column, kind in COLUMNS if column not in ("station", "epoch_utc"))},
+    epoch_utc INTEGER NOT NULL,
+    PRIMARY KEY (station, epoch_utc)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_observations_zone ON observations (zone, epoch_utc);
+CREATE INDEX IF NOT EXISTS idx_observations_run ON observations (run_id);
+"""
+
+_initialized = set()
+
+
+def connect(db_path=HISTORY_DB_PATH):
+    os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    if db_path not in _initialized:
+        _upgrade(conn)
+        conn.executescript(_SCHEMA)
+        _initialized.add(db_path)
+    return conn
+
+# Databases keyed on the local "date time" label (before epoch_utc) are re-keyed in place:
+# the old table is renamed, and its rows are copied with epochs from row_epochs
+def _upgrade(conn):
+    tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    if "observations" in tables and "observations_v1" not in tables:
+        columns = {r[1] for r in conn.execute("PRAGMA table_info(observations)")}
+        if "epoch_utc" in columns:
+            return
+        conn.executescript(
+            "BEGIN; DROP INDEX IF EXISTS idx_observations_zone; DROP INDEX IF EXISTS idx_observations_run;"
+            " ALTER TABLE observations RENAME TO observations_v1; COMMIT;"
+        )
+    elif "observations_v1" not in tables:
+        return
+    conn.executescript(_SCHEMA)
+    old = conn.execute("SELECT * FROM observations_v1").fetchall()
+    by_run = {}
+    for record in old:
+        by_run.setdefault(record["run_id"], []).append(
+            {field: '' if record[column] is None else str(record[column])
+             for field, column, _ in COLUMNS if column in record.keys()})
+    sql = _insert_sql()
+    with conn:
+        for run_id, rows in by_run.items():
+            conn.executemany(sql, _records(rows, run_id))
+        conn.execute("DROP TABLE observations_v1")
+    logger.info(f"Re-keyed {len(old)} history rows on (station, epoch_utc)")
+
+# Run key from plots/<date>/<time>/weather_data.csv
+def run_from_csv_path(csv_path):
+    time_dir = os.path.dirname(os.path.abspath(csv_path))
+    return f"{os.path.basename(os.path.dirname(time_dir))}/{os.path.basename(time_dir)}"
+
+def _number(value):
+    if value is None or value == '':
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def _records(rows, run_id):
+    rows = [row for row in rows if row.get("station_name") and row.get("date")]
+    if not rows:
+        return []
+    from python import station_observation
+
+    # Rows without epoch_utc (older CSVs) get it from their local date/time label
+    epochs = station_observation.row_epochs(pd.DataFrame(rows))
+    converted = []
+    for row, epoch in zip(rows, epochs):
+        if np.isnan(epoch):
+            continue
+        values = {}
+        for field, column, kind in COLUMNS:
+            value = row.get(field)
+            values[column] = _number(value) if kind == "REAL" else (None if value in (None, '') else str(value))
+        values["epoch_utc"] = int(epoch)
+        converted.append(values)
+    if not converted:
+        return []
+
+    def numeric(column):
+        return np.array([np.nan if v[column] is None else v[column] for v in converted], dtype=np.float64)
+
+    zones = weather.classify_conditions_array(
+        numeric("temperature_f"), numeric("humidity_pct"), numeric("pressure_hpa"), numeric("wind_speed")
+    )
+    columns = [column for _, column, _ in COLUMNS if column != "station"]
+    return [
+        (v["station"], str(zone), run_id, *(v[c] for c in columns))
+        for v, zone in zip(converted, zones)
+    ]
+
+def _insert_sql():
+    columns = ["station", "zone", "run_id"] + [c for _, c, _ in COLUMNS if c != "station"]
+    return f"INSERT OR REPLACE INTO observations ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+
+# Store one run's rows; overlapping observations from earlier runs are replaced, not duplicated
+def save_rows(rows, run, db_path=HISTORY_DB_PATH, conn=None):
+    own = conn is None
+    conn = conn or connect(db_path)
+    try:
+        with conn:
+            conn.execute("INSERT OR IGNORE INTO runs (run, saved_at) VALUES (?, ?)", (run, time.time()))
+            run_id = conn.execute("SELECT run_id FROM runs WHERE run = ?", (run,)).fetchone()[0]
+            sql = _insert_sql()
+            records = _records(rows, run_id)
+            for i in range(0, len(records), INSERT_BATCH):
+                conn.executemany(sql, records[i:i + INSERT_BATCH])
+        return len(records)
+    finally:
+        if own:
+            conn.close()
+
+def _as_csv_row(record):
+    # Same shape and string values csv.DictReader gives for weather_data.csv
+    row = {}
+    for field, column, _ in COLUMNS:
+        value = record[column]
+        row[field] = '' if value is None else str(value)
+    return row
+
+# Rows last written by the newest run, like load_latest_data reading its CSV
+def load_latest_run(db_path=HISTORY_DB_PATH):
+    if not os.path.isfile(db_path):
+        return []
+    conn = connect(db_path)
+    try:
+        latest = conn.execute("SELECT run_id FROM runs ORDER BY run DESC LIMIT 1").fetchone()
+        if latest is None:
+            return []
+        records = conn.execute(
+            "SELECT * FROM observations WHERE run_id = ? ORDER BY epoch_utc DESC", (latest[0],)
+        ).fetchall()
+        return [_as_csv_row(r) for r in records]
+    finally:
+        conn.close()
+
+# Range bound as UTC seconds: epochs pass through; "YYYY-MM-DD[ HH:MM]" is read in the station's
+# zone (this machine's without a station). A bare end date includes that whole day.
+def _bound_epoch(value, station, end=False):
+    if isinstance(value, (int, float)):
+        return value
+    from python import station_observation
+
+    whole_day = end and len(value) <= 10
+    stamp = pd.Timestamp(value) + pd.Timedelta(days=1 if whole_day else 0)
+    time_zone = station_observation.station_time_zone(station) if station else tzlocal.get_localzone_name()
+    stamp = stamp.tz_localize(time_zone, ambiguous=False, nonexistent='shift_forward')
+    return int(stamp.timestamp()) - (1 if whole_day else 0)
+
+# e.g. query_observations("KBOI", "2025-06-01", "2025-06-30", conditions=[("barometric_pressure (hPa)", "<", 1008)])
+def query_observations(station=None, start=None, end=None, zones=None, conditions=(), db_path=HISTORY_DB_PATH):
+    clauses, params = [], []
+    if station:
+        clauses.append("station = ?")
+        params.append(station)
+    if start:
+        clauses.append("epoch_utc >= ?")
+        params.append(_bound_epoch(start, station))
+    if end:
+        clauses.append("epoch_utc <= ?")
+        params.append(_bound_epoch(end, station, end=True))
+    if zones:
+        clauses.append(f"zone IN ({', '.join('?' * len(zones))})")
+        params.extend(zones)
+    for field, op, value in conditions:
+        column = FIELD_TO_COLUMN.get(field, field)
+        if column not in FIELD_TO_COLUMN.values() or op not in QUERY_OPS:
+            raise ValueError(f"Unsupported condition: {field} {op}")
+        clauses.append(f"{column} {op} ?")
+        params.append(value)
+
+    sql = "SELECT * FROM observations"
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    sql += " ORDER BY station, epoch_utc"
+    conn = connect(db_path)
+    try:
+        return [dict(_as_csv_row(r), zone=r["zone"]) for r in conn.execute(sql, params)]
+    finally:
+        conn.close()
+
+# One-shot import of every plots/<date>/<time>/weather_data.csv, oldest run first
+def migrate_plots_tree(plots_dir, db_path=HISTORY_DB_PATH):
+    start = time.perf_counter()
+    conn = connect(db_path)
+    runs = rows_total = 0
+    try:
+        for date_dir in sorted(os.listdir(plots_dir)):
+            date_path = os.path.join(plots_dir, date_dir)
+            if not os.path.isdir(date_path):
+                continue
+            for time_dir in sorted(os.listdir(date_path)):
+                csv_path = os.path.join(date_path, time_dir, 'weather_data.csv')
+                if not os.path.isfile(csv_path):
+                    continue
+                with open(csv_path, 'r', encoding='utf-8-sig') as f:
+                    rows = list(csv.DictReader(f))
+                rows_total += save_rows(rows, f"{date_dir}/{time_dir}", conn=conn)
+                runs += 1
+    finally:
+        conn.close()
+    elapsed = time.perf_counter() - start
+    logger.info(f"Migrated {rows_total} rows from {runs} runs in {elapsed:.2f}s")
+    return runs, rows_total
+
+
+if __name__ == "__main__":
+    # Usage: python -m python.history_db [plots_dir] [db_path]
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(name)s: %(message)s")
+    plots_dir = sys.argv[1] if len(sys.argv) > 1 else os.path.join('AI', 'targetFile', 'plots')
+    db_path = sys.argv[2] if len(sys.argv) > 2 else HISTORY_DB_PATH
+    migrate_plots_tree(plots_dir, db_path)
@@ -0,0 +1,231 @@
+import os
+import json
+import time
+import random
+import hashlib
+import logging
+import threading
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import requests
+
+from python import profiling
+
+logger = logging.getLogger(__name__)
+
+LAST_KNOWN_DIR = os.path.join('AI', 'targetFile', 'cache', 'http')
+
+# (connect, read) seconds for one attempt, and the budget for a call including retries
+DEFAULT_TIMEOUT = (3.05, 15.0)
+DEFAULT_DEADLINE = 45.0
+MAX_RETRIES = 4
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 8.0
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+# Per-host limits; hosts not listed use DEFAULT_HOST_POLICY
+DEFAULT_HOST_POLICY = {'rate': 5.0, 'capacity': 10, 'failure_threshold': 5, 'reset_timeout': 30.0}
+HOST_POLICIES = {
+    'api.weather.gov': {'rate': 2.0, 'capacity': 6, 'failure_threshold': 5, 'reset_timeout': 60.0},
+}
+
+
+class UpstreamUnavailable(Exception):
+    """Raised when a host cannot be reached and there is no last-known copy to serve."""
+
+
+class TokenBucket:
+
+    def __init__(self, rate, capacity):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    # Seconds to wait before the caller may send; the token is reserved either way
+    def reserve(self):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._stamp) * self.rate)
+            self._stamp = now
+            self._tokens -= 1.0
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def acquire(self):
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class CircuitBreaker:
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    # Closed: always. Open: never, until reset_timeout passes. Half-open: a single trial call.
+    def allow(self):
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._trial_running = False
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self._failures = 0
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning(f"Circuit opened after {self._failures} failures")
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._trial_running = False
+
+
+class _Host:
+    def __init__(self, policy):
+        self.bucket = TokenBucket(policy['rate'], policy['capacity'])
+        self.breaker = CircuitBreaker(policy['failure_threshold'], policy['reset_timeout'])
+
+_hosts = {}
+_hosts_lock = threading.Lock()
+_local = threading.local()
+
+def host_state(host):
+    with _hosts_lock:
+        state = _hosts.get(host)
+        if state is None:
+            state = _hosts[host] = _Host(HOST_POLICIES.get(host, DEFAULT_HOST_POLICY))
+        return state
+
+def configure_host(host, **policy):
+    HOST_POLICIES[host] = dict(HOST_POLICIES.get(host, DEFAULT_HOST_POLICY), **policy)
+    with _hosts_lock:
+        _hosts.pop(host, None)
+
+def reset():
+    with _hosts_lock:
+        _hosts.clear()
+
+
+# One keep-alive session per thread; swap `transport` out to run fully offline
+def _session_get(url, headers, timeout):
+    session = getattr(_local, 'session', None)
+    if session is None:
+        session = _local.session = requests.Session()
+    return session.get(url, headers=headers, timeout=timeout)
+
+transport = _session_get
+
+
+def _retry_after(response):
+    value = response.headers.get('Retry-After') if response is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def backoff_delay(attempt, base=BACKOFF_BASE, cap=BACKOFF_CAP):
+    # Full jitter: spreads retries from many pollers instead of stampeding in step
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+# GET with rate limiting, bounded timeouts, retries with backoff, and a per-host breaker.
+# Returns the response (2xx or 304); raises UpstreamUnavailable or requests.HTTPError.
+def request(url, headers=None, timeout=DEFAULT_TIMEOUT, retries=MAX_RETRIES, deadline=DEFAULT_DEADLINE):
+    host = urlsplit(url).netloc
+    state = host_state(host)
+    give_up_at = time.monotonic() + deadline
+    last_error = None
+
+    for attempt in range(retries + 1):
+        if not state.breaker.allow():
+            raise UpstreamUnavailable(f"Circuit open for {host}")
+        state.bucket.acquire()
+        response = None
+        try:
+            response = transport(url, headers, timeout)
+            if response.status_code not in RETRY_STATUS:
+                # Other 4xx are the caller's problem, not the host's health
+                state.breaker.record_success()
+                if response.status_code != 304:
+                    response.raise_for_status()
+                return response
+            last_error = f"HTTP {response.status_code}"
+        except (requests.ConnectionError, requests.Timeout) as e:
+            last_error = f"{type(e).__name__}: {e}"
+        state.breaker.record_failure()
+
+        delay = _retry_after(response)
+        delay = backoff_delay(attempt) if delay is None else delay
+        if attempt == retries or time.monotonic() + delay >= give_up_at:
+            break
+        logger.info(f"Retrying {url} in {delay:.2f}s after {last_error}")
+        time.sleep(delay)
+    raise UpstreamUnavailable(f"{url} failed: {last_error}")
+
+
+def _last_known_path(url, cache_dir):
+    return os.path.join(cache_dir, hashlib.sha1(url.encode('utf-8')).hexdigest() + '.json')
+
+def _load_last_known(url, cache_dir):
+    try:
+        with open(_last_known_path(url, cache_dir), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _save_last_known(url, body, cache_dir):
+    os.makedirs(cache_dir, exist_ok=True)
+    path = _last_known_path(url, cache_dir)
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'url': url, 'saved_at': time.time(), 'body': body}, f)
+    os.replace(tmp_path, path)
+
+# JSON GET that falls back to the last good body for this URL while the host is failing
+def get_json(url, headers=None, cache_dir=LAST_KNOWN_DIR, **kwargs):
+    _local.stale = False
+    try:
+        response = request(url, headers, **kwargs)
+    except UpstreamUnavailable as e:
+        entry = _load_last_known(url, cache_dir)
+        if entry is None:
+            raise
+        age = time.time() - entry['saved_at']
+        logger.warning(f"{e}; serving last-known data from {age / 60:.0f} min ago")
+        _local.stale = True
+        return entry['body']
+    profiling.current().record(bytes=len(response.content))
+    body = response.json()
+    _save_last_known(url, body, cache_dir)
+    return body
+
+# Whether this thread's last get_json answer came from the last-known cache
+def served_stale():
+    return getattr(_local, 'stale', False)
@@ -1,46 +1,212 @@
 import os
+import re
+import json
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
 
-def list_directory_contents(path):
+DATE_DIR = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+CACHE_FILE = "directory_scan_cache.json"
+# Directories modified this recently are always rescanned
+RECENT_SECONDS = 24 * 3600
+
+
+# ---- Scanning ----
+
+# Re-read a directory when its mtime moved; unchanged ones reuse the cached entry. A
+# directory's mtime only changes when entries are added, removed or renamed, not when a file
+# is rewritten in place (save_to_csv, render_cache.fetch), so the active run (`force`) and
+# anything touched in the last RECENT_SECONDS are always rescanned.
+def _scan(path, rel, mtime, old_cache, new_cache, stats, force=False):
+    cached = old_cache.get(rel)
+    recent = time.time_ns() - mtime < RECENT_SECONDS * 1_000_000_000
+    if cached is not None and cached["mtime"] == mtime and not (force or recent):
+        stats["reused"] += 1
+        files, dirs = cached["files"], cached["dirs"]
+    else:
+        stats["scanned"] += 1
+        files, dirs = {}, {}
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        dirs[entry.name] = None
+                    elif entry.is_file(follow_symlinks=False):
+                        files[entry.name] = entry.stat(follow_symlinks=False).st_size
+                except OSError:
+                    continue
+        dirs = sorted(dirs)
+    new_cache[rel] = {"mtime": mtime, "files": files, "dirs": dirs}
+    return dirs
+
+def _scan_subtree(path, rel, mtime, old_cache, stats, parallel=None, force=False):
+    new_cache = {}
+    pending = [(path, rel, mtime)]
+    while pending:
+        path, rel, mtime = pending.pop()
+        for name in _scan(path, rel, mtime, old_cache, new_cache, stats, force):
+            child = os.path.join(path, name)
+            try:
+                child_mtime = os.stat(child).st_mtime_ns
+            except OSError:
+                continue
+            child_rel = f"{rel}/{name}" if rel else name
+            # Date folders are independent subtrees: hand them to the pool
+            if parallel is not None and DATE_DIR.match(name):
+                parallel.append((child, child_rel, child_mtime))
+            else:
+                pending.append((child, child_rel, child_mtime))
+    return new_cache
+
+def scan_tree(root, cache=None, max_workers=None):
+    cache = cache or {}
+    stats = {"scanned": 0, "reused": 0}
+    date_roots = []
+    new_cache = _scan_subtree(root, "", os.stat(root).st_mtime_ns, cache, stats, parallel=date_roots)
+    if date_roots:
+        # The newest date folder holds the run being written to
+        newest = max(os.path.basename(path) for path, _, _ in date_roots)
+        worker_stats = [{"scanned": 0, "reused": 0} for _ in date_roots]
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            jobs = [pool.submit(_scan_subtree, path, rel, mtime, cache, worker,
+                                force=os.path.basename(path) == newest)
+                    for (path, rel, mtime), worker in zip(date_roots, worker_stats)]
+            for job in jobs:
+                new_cache.update(job.result())
+        for worker in worker_stats:
+            stats["scanned"] += worker["scanned"]
+            stats["reused"] += worker["reused"]
+    stats["directories"] = len(new_cache)
+    return new_cache, stats
+
+def load_cache(cache_path, root):
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    # Entries are keyed by path relative to the scanned root
+    if data.get("root") != os.path.abspath(root):
+        return {}
+    return data.get("directories", {})
+
+def save_cache(cache_path, root, cache):
+    os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+    tmp_path = cache_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"root": os.path.abspath(root), "directories": cache}, f)
+    os.replace(tmp_path, cache_path)
+
+
+# ---- Reports ----
+
+def _date_of(rel):
+    for part in rel.split("/"):
+        if DATE_DIR.match(part):
+            return part
+    return None
+
+def aggregate(cache):
+    by_date, by_type = {}, {}
+    total_files = total_size = 0
+    for rel, node in cache.items():
+        date = _date_of(rel)
+        if date is not None:
+            day = by_date.setdefault(date, {"files": 0, "bytes": 0, "runs": 0})
+            # plots/<date>/<time> is one run
+            if rel.split("/")[-2:-1] == [date]:
+                day["runs"] += 1
+        for name, size in node["files"].items():
+            ext = os.path.splitext(name)[1].lower() or "(none)"
+            kind = by_type.setdefault(ext, {"files": 0, "bytes": 0})
+            kind["files"] += 1
+            kind["bytes"] += size
+            if date is not None:
+                day["files"] += 1
+                day["bytes"] += size
+            total_files += 1
+            total_size += size
+    return {
+        "total_files": total_files,
+        "total_bytes": total_size,
+        "directories": len(cache),
+        "by_date": dict(sorted(by_date.items())),
+        "by_type": dict(sorted(by_type.items(), key=lambda kv: -kv[1]["bytes"])),
+    }
+
+def format_summary(summary, directory):
+    mb = 1024 * 1024
+    lines = [f"Directory summary of: {directory}", ""]
+    lines.append(f"{summary['total_files']} files in {summary['directories']} directories, "
+                 f"{summary['total_bytes']} bytes ({summary['total_bytes'] / mb:.2f} MB)")
+    lines += ["", "By date:", f"    {'date':12}{'runs':>6}{'files':>8}{'MB':>12}"]
+    for date, day in summary["by_date"].items():
+        lines.append(f"    {date:12}{day['runs']:>6}{day['files']:>8}{day['bytes'] / mb:>12.2f}")
+    lines += ["", "By file type:", f"    {'type':12}{'files':>8}{'MB':>12}"]
+    for ext, kind in summary["by_type"].items():
+        lines.append(f"    {ext:12}{kind['files']:>8}{kind['bytes'] / mb:>12.2f}")
+    return "\n".join(lines)
+
+# The old indented listing, built from the scan cache instead of a second walk
+def format_listing(cache, root_name):
     output = []
     total_size = 0
-    for root, dirs, files in os.walk(path):
-        level = root.replace(path, "").count(os.sep)
-        indent = " " * 4 * level
-        output.append(f"{indent}{os.path.basename(root)}/")
-        sub_indent = " " * 4 * (level + 1)
-        for file in files:
-            file_path = os.path.join(root, file)
-            file_size = os.path.getsize(file_path)
-            total_size += file_size
-            output.append(f"{sub_indent}{file} - {file_size} bytes")
-
+    pending = [("", 0)]
+    while pending:
+        rel, level = pending.pop()
+        node = cache.get(rel)
+        if node is None:
+            continue
+        output.append(f"{' ' * 4 * level}{rel.rsplit('/', 1)[-1] if rel else root_name}/")
+        for name, size in node["files"].items():
+            total_size += size
+            output.append(f"{' ' * 4 * (level + 1)}{name} - {size} bytes")
+        pending.extend((f"{rel}/{d}" if rel else d, level + 1) for d in reversed(node["dirs"]))
     output.append(f"\nTotal size of directory: {total_size} bytes ({total_size / (1024 * 1024):.2f} MB)")
     return "\n".join(output)
 
-if __name__ == "__main__":
-    # Construct the correct path relative to script_dir
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    reports_dir = os.path.join(script_dir, '..', 'AI', 'Reports')
+def list_directory_contents(path, cache_path=None):
+    cache = load_cache(cache_path, path) if cache_path else {}
+    cache, _ = scan_tree(path, cache)
+    if cache_path:
+        save_cache(cache_path, path, cache)
+    return format_listing(cache, os.path.basename(os.path.normpath(path)))
 
-    # Create the directory if it doesn't exist
-    os.makedirs(reports_dir, exist_ok=True)
 
-    # Get the actual script location
+if __name__ == "__main__":
     script_dir = os.path.dirname(os.path.abspath(__file__))
-    directory = os.path.join(script_dir, "..", "AI", "targetFile")  # Adjust as needed
+    parser = argparse.ArgumentParser(description="Summarize the size of AI/targetFile by date and file type.")
+    parser.add_argument("--directory", default=os.path.join(script_dir, "..", "AI", "targetFile"))
+    parser.add_argument("--reports-dir", default=os.path.join(script_dir, "..", "AI", "Reports"))
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--full", action="store_true", help="also write the per-file listing")
+    args = parser.parse_args()
 
+    directory = args.directory
+    os.makedirs(args.reports_dir, exist_ok=True)
     print(f"Listing contents of directory: {directory}\n")
 
     if not os.path.exists(directory):
         print(f"Error: Directory '{directory}' does not exist.")
     else:
-        structure = list_directory_contents(directory)
+        start = time.perf_counter()
+        cache_path = os.path.join(args.reports_dir, CACHE_FILE)
+        cache, stats = scan_tree(directory, load_cache(cache_path, directory), args.workers)
+        save_cache(cache_path, directory, cache)
+        summary = aggregate(cache)
+        elapsed = time.perf_counter() - start
 
-        # Save output
-        output_file = os.path.join(script_dir, "..", "AI", "Reports", "directory_structure_full.txt")
+        output_file = os.path.join(args.reports_dir, "directory_summary.txt")
         with open(output_file, "w", encoding="utf-8") as file:
-            file.write(f"Directory structure of: {directory}\n\n")
-            file.write(structure)
+            file.write(format_summary(summary, directory))
             file.write(f"\n\nSystem path of main directory: {directory}")
+        with open(os.path.join(args.reports_dir, "directory_summary.json"), "w", encoding="utf-8") as file:
+            json.dump(summary, file, indent=2)
+        if args.full:
+            with open(os.path.join(args.reports_dir, "directory_structure_full.txt"), "w", encoding="utf-8") as file:
+                file.write(f"Directory structure of: {directory}\n\n")
+                file.write(format_listing(cache, os.path.basename(os.path.normpath(directory))))
+                file.write(f"\n\nSystem path of main directory: {directory}")
 
-        print(f"\nDirectory structure has been saved to: {output_file}")
+        print(f"{stats['directories']} directories ({stats['scanned']} rescanned, {stats['reused']} cached) in {elapsed:.2f}s")
+        print(f"\nDirectory summary has been saved to: {output_file}")
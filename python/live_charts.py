@@ -0,0 +1,260 @@
+import os
+import logging
+import tkinter as tk
+from tkinter import ttk
+
+import numpy as np
+import pandas as pd
+import matplotlib.dates as mdates
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+from python import chart
+from python import weather
+from python import my_math
+from python import profiling
+from python import render_cache
+
+logger = logging.getLogger(__name__)
+
+# Repaints requested within this window collapse into one
+REDRAW_DELAY_MS = 200
+# How often the run CSV's mtime is checked for rows appended by the polling pipeline
+WATCH_INTERVAL_MS = 30_000
+
+SERIES = (
+    ('temperature (F)', 'Temperature (°F)'),
+    ('barometric_pressure (hPa)', 'Barometric Pressure (hPa)'),
+    ('humidity (%)', 'Relative Humidity (%)'),
+    ('wind_speed (m/s)', 'Wind Speed (m/s)'),
+)
+SPIRAL_STEPS = 100
+# Per-series files chart.plot_weather_data writes; the API and reports look for these names
+PLOT_FILES = {
+    'temperature (F)': 'temperature_plot.png',
+    'barometric_pressure (hPa)': 'pressure_plot.png',
+    'humidity (%)': 'humidity_plot.png',
+    'wind_speed (m/s)': 'wind_speed_plot.png',
+}
+
+
+def rows_to_frame(rows):
+    frame = pd.DataFrame(rows)
+    if frame.empty:
+        return frame
+    frame['datetime'] = pd.to_datetime(frame['date'].astype(str) + ' ' + frame['time'].astype(str), errors='coerce')
+    for column, _ in SERIES:
+        if column in frame:
+            frame[column] = pd.to_numeric(frame[column], errors='coerce')
+    return frame.dropna(subset=['datetime']).sort_values('datetime').reset_index(drop=True)
+
+
+# One Tk canvas whose repaints are coalesced: any number of request_redraw() calls inside
+# REDRAW_DELAY_MS produce a single draw, and nothing is scheduled while idle
+class _EmbeddedFigure:
+
+    def __init__(self, parent, figsize):
+        self.figure = Figure(figsize=figsize)
+        self.canvas = FigureCanvasTkAgg(self.figure, master=parent)
+        self.widget = self.canvas.get_tk_widget()
+        self._pending = None
+        self.draw_count = 0
+
+    def request_redraw(self):
+        if self._pending is None:
+            self._pending = self.widget.after(REDRAW_DELAY_MS, self._redraw)
+
+    def _redraw(self):
+        self._pending = None
+        with profiling.span("render.live_redraw", figure=type(self).__name__):
+            self.canvas.draw_idle()
+        self.draw_count += 1
+
+    # Rescale only when the new data leaves the current view, with some headroom so
+    # small appends do not rescale every time
+    @staticmethod
+    def _fit(ax, x, y, margin=0.05):
+        finite = np.isfinite(y)
+        if not finite.any():
+            return False
+        x_low, x_high = ax.get_xlim()
+        y_low, y_high = ax.get_ylim()
+        data = (x.min(), x.max(), y[finite].min(), y[finite].max())
+        if x_low <= data[0] and data[1] <= x_high and y_low <= data[2] and data[3] <= y_high:
+            return False
+        x_pad = (data[1] - data[0]) * margin or 0.5
+        y_pad = (data[3] - data[2]) * margin or 1.0
+        ax.set_xlim(data[0] - x_pad, data[1] + x_pad)
+        ax.set_ylim(data[2] - y_pad, data[3] + y_pad)
+        return True
+
+
+# Temperature, pressure, humidity and wind time series; lines are created once and fed with set_data
+class WeatherSeriesFigure(_EmbeddedFigure):
+
+    def __init__(self, parent):
+        super().__init__(parent, figsize=(9, 6))
+        self.lines = {}
+        axes = self.figure.subplots(2, 2, sharex=True).ravel()
+        for ax, (column, label) in zip(axes, SERIES):
+            line, = ax.plot([], [], marker='o', markersize=3)
+            ax.set_title(label, fontsize=10)
+            ax.grid(True)
+            ax.xaxis.set_major_formatter(mdates.DateFormatter('%m-%d %H:%M'))
+            self.lines[column] = line
+        for ax in axes[2:]:
+            ax.tick_params(axis='x', rotation=45)
+        self.figure.tight_layout()
+        self._signature = None
+
+    def update(self, frame):
+        if frame.empty:
+            return False
+        x = mdates.date2num(frame['datetime'].to_numpy())
+        signature = (len(frame), x[-1])
+        if signature == self._signature:
+            return False
+        self._signature = signature
+        for column, line in self.lines.items():
+            y = frame[column].to_numpy(dtype=np.float64) if column in frame else np.full(len(x), np.nan)
+            line.set_data(x, y)
+            self._fit(line.axes, x, y)
+        self.request_redraw()
+        return True
+
+    # One PNG per series, cut from the shared figure, in the run folder and the render cache
+    # under the key chart.plot_weather_data uses for the same CSV
+    def save(self, output_dir, csv_filename):
+        renderer = self.canvas.get_renderer()
+        paths = []
+        for column, line in self.lines.items():
+            if not np.isfinite(line.get_ydata()).any():
+                continue
+            bbox = line.axes.get_tightbbox(renderer).transformed(self.figure.dpi_scale_trans.inverted())
+            path = os.path.join(output_dir, PLOT_FILES[column])
+            self.figure.savefig(path, bbox_inches=bbox.padded(0.05))
+            paths.append(path)
+        render_cache.store(chart.weather_plots_key(csv_filename), paths)
+        return paths
+
+
+# Zone map with the spiral trail for the latest complete observation
+class ConditionMapFigure(_EmbeddedFigure):
+
+    def __init__(self, parent):
+        super().__init__(parent, figsize=(6, 6))
+        ax = self.ax = self.figure.add_subplot()
+        for key, info in weather.base_tags.items():
+            ax.scatter(*info['point'], label=f"{key.upper()}: {info['label']}", s=60)
+            ax.text(info['point'][0] + 0.05, info['point'][1] + 0.05, key.upper(), fontsize=10)
+        self.trail, = ax.plot([], [], color='blue', linewidth=2, label='Spiral Path')
+        self.marker, = ax.plot([], [], 'o', color='red', markeredgecolor='black', markersize=12,
+                               label='Current Condition (Spiral)')
+        ax.axhline(0, color='black', linewidth=0.5)
+        ax.axvline(0, color='black', linewidth=0.5)
+        ax.set_xlabel("Condition Axis (Worst to Best Conditions)")
+        ax.set_ylabel("Activity Axis (Least to Most Active)")
+        ax.grid(True)
+        ax.legend(fontsize=6, loc='lower left')
+        ax.set_aspect('equal', adjustable='box')
+        self.figure.tight_layout()
+        self._signature = None
+        self._row = None
+
+    def update(self, frame):
+        columns = [c for c, _ in SERIES]
+        if frame.empty or not set(columns) <= set(frame.columns):
+            return False
+        complete = frame.dropna(subset=columns)
+        if complete.empty:
+            return False
+        row = complete.iloc[-1]
+        values = tuple(float(row[c]) for c in columns)
+        signature = (row['datetime'],) + values
+        if signature == self._signature:
+            return False
+        self._signature = signature
+        self._row = row
+
+        temp, pressure, humidity, wind = values
+        zone = weather.classify_conditions(temp, humidity, pressure, wind)
+        x, y = my_math.spiral_positions(temp, humidity, pressure, weather.base_tags[zone]['point'], wind,
+                                        t=np.arange(SPIRAL_STEPS) / 10.0)
+        self.trail.set_data(x, y)
+        self.marker.set_data([x[-1]], [y[-1]])
+        self.ax.set_title(f"Fishing Condition Map\n{row['datetime']:%Y-%m-%d %H:%M}", fontsize=10)
+        self._fit(self.ax, np.append(x, [-1.5, 1.5]), np.append(y, [-1.5, 1.5]))
+        self.request_redraw()
+        return True
+
+    # chaos_chart.png in the run folder and the render cache, keyed like chart.chart_run
+    def save(self, output_dir, csv_filename=None):
+        row = self._row
+        path = os.path.join(output_dir, 'chaos_chart.png')
+        self.figure.savefig(path)
+        render_cache.store(chart.chart_run_key(
+            row['date'], row['time'], float(row['temperature (F)']), float(row['humidity (%)']),
+            float(row['barometric_pressure (hPa)']), float(row['wind_speed (m/s)'])), [path])
+        return [path]
+
+
+# Notebook with both figures, fed from a run CSV. The CSV is re-read only when its mtime
+# changes, so the watch timer costs one stat per interval while idle. Figures whose data
+# changed are also saved into the run folder and the render cache for the API and reports.
+class ChartPanel:
+
+    def __init__(self, parent, csv_filename=None, watch_interval_ms=WATCH_INTERVAL_MS, output_dir=None):
+        self.frame = tk.Frame(parent)
+        self.notebook = ttk.Notebook(self.frame)
+        self.notebook.pack(fill='both', expand=True)
+        self.figures = {}
+        for name, label, cls in (('weather', 'Weather Data', WeatherSeriesFigure),
+                                 ('conditions', 'Condition Map', ConditionMapFigure)):
+            tab = tk.Frame(self.notebook)
+            self.notebook.add(tab, text=label)
+            figure = cls(tab)
+            figure.widget.pack(fill='both', expand=True)
+            self.figures[name] = (tab, figure)
+        self.csv_filename = csv_filename
+        self.output_dir = output_dir or (os.path.dirname(csv_filename) if csv_filename else None)
+        self.watch_interval_ms = watch_interval_ms
+        self._mtime = None
+        self._watching = None
+
+    def show(self, name):
+        if not self.frame.winfo_ismapped():
+            self.frame.pack(fill='both', expand=True)
+        self.notebook.select(self.figures[name][0])
+        self.refresh()
+        if self.csv_filename and self._watching is None:
+            self._watching = self.frame.after(self.watch_interval_ms, self._watch)
+
+    def update(self, rows):
+        frame = rows_to_frame(rows)
+        updated = [name for name, (_, figure) in self.figures.items() if figure.update(frame)]
+        if self.output_dir and self.csv_filename and os.path.isfile(self.csv_filename):
+            for name in updated:
+                try:
+                    with profiling.span("render.live_save", figure=name):
+                        self.figures[name][1].save(self.output_dir, self.csv_filename)
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Could not save the {name} chart: {e}")
+        return updated
+
+    def refresh(self, force=False):
+        if not self.csv_filename:
+            return []
+        try:
+            mtime = os.path.getmtime(self.csv_filename)
+        except OSError:
+            return []
+        if mtime == self._mtime and not force:
+            return []
+        self._mtime = mtime
+        frame = pd.read_csv(self.csv_filename, encoding='utf-8-sig', dtype=str, keep_default_na=False)
+        return self.update(frame.to_dict(orient='records'))
+
+    def _watch(self):
+        self._watching = None
+        self.refresh()
+        self._watching = self.frame.after(self.watch_interval_ms, self._watch)
@@ -0,0 +1,283 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import logging
+
+import numpy as np
+
+from python import bite_patterns
+from python import file_handler
+from python import compaction
+from python import profiling
+
+logger = logging.getLogger(__name__)
+
+MOTIF_DIR = os.path.dirname(bite_patterns.MOTIFS_PATH)
+INDEX_PATH = os.path.join(MOTIF_DIR, 'index.npz')
+MANIFEST_PATH = os.path.join(MOTIF_DIR, 'manifest.json')
+SEQUENCE_DIR = os.path.join(MOTIF_DIR, 'sequences')
+BIN_NAME = 'trajectory_data.bin'
+
+ZONES = 'abcdefghx'
+# Zone codes are 0-8; 9 separates trajectories so no n-gram spans two of them.
+# With base 10 an n-gram's code is exact (no collisions) up to 18 symbols in int64.
+SEPARATOR = len(ZONES)
+BASE = SEPARATOR + 1
+MAX_N = 6
+MIN_SUPPORT = 5
+MOTIF_LIMIT = 50
+
+_ZONE_CODES = np.full(256, SEPARATOR, dtype=np.uint8)
+_ZONE_CODES[np.frombuffer(ZONES.encode('ascii'), dtype=np.uint8)] = np.arange(len(ZONES), dtype=np.uint8)
+
+
+# ---- Sequences ----
+
+# Zone history of one trajectory with repeats collapsed: one symbol per visit to a zone, so
+# motifs describe transitions rather than how many substeps a zone lasted
+def collapsed_zones(quadrants):
+    codes = _ZONE_CODES[np.asarray(quadrants, dtype=np.int64) & 0xFF]
+    if len(codes) == 0:
+        return codes
+    return codes[np.concatenate(([True], codes[1:] != codes[:-1]))]
+
+def _join(sequences):
+    parts = []
+    for sequence in sequences:
+        parts.append(np.asarray(sequence, dtype=np.uint8))
+        parts.append(np.array([SEPARATOR], dtype=np.uint8))
+    return np.concatenate(parts) if parts else np.empty(0, dtype=np.uint8)
+
+
+# ---- N-gram counts ----
+
+# Sorted unique n-gram codes and their counts for n = 1..max_n, built with a rolling code:
+# code_n[i] = code_(n-1)[i] * BASE + symbol[i + n - 1]
+def count_ngrams(sequences, max_n=MAX_N):
+    symbols = _join(sequences)
+    valid = symbols != SEPARATOR
+    codes = symbols.astype(np.int64)
+    window_valid = valid
+    counts = {}
+    for n in range(1, max_n + 1):
+        if n > 1:
+            codes = codes[:-1] * BASE + symbols[n - 1:]
+            window_valid = window_valid[:-1] & valid[n - 1:]
+        keys, values = np.unique(codes[window_valid], return_counts=True)
+        counts[n] = (keys, values.astype(np.int64))
+    return counts
+
+def _merge(base, delta, sign=1):
+    keys = np.concatenate([base[0], delta[0]])
+    values = np.concatenate([base[1], sign * delta[1]])
+    merged, inverse = np.unique(keys, return_inverse=True)
+    totals = np.bincount(inverse, weights=values, minlength=len(merged)).astype(np.int64)
+    keep = totals > 0
+    return merged[keep], totals[keep]
+
+def merge_counts(counts, delta, sign=1):
+    return {n: _merge(counts[n], delta[n], sign) for n in counts}
+
+def _lookup(table, keys):
+    table_keys, table_values = table
+    if len(table_keys) == 0:
+        return np.zeros(len(keys), dtype=np.int64)
+    idx = np.clip(np.searchsorted(table_keys, keys), 0, len(table_keys) - 1)
+    return np.where(table_keys[idx] == keys, table_values[idx], 0)
+
+def decode(key, n):
+    zones = []
+    for _ in range(n):
+        key, code = divmod(int(key), BASE)
+        zones.append(ZONES[code])
+    return zones[::-1]
+
+
+# ---- Scoring ----
+
+# Over-represented motifs ranked by z-score against a Markov background of the highest order
+# the counts support: for w = a..b, E[N(w)] = N(a..) * N(..b) / N(middle). Two-symbol motifs
+# use zone frequencies, excluding self-transitions that collapsing removed.
+def score_motifs(counts, min_support=MIN_SUPPORT, limit=MOTIF_LIMIT):
+    total = counts[1][1].sum()
+    ranked = []
+    for n in range(2, max(counts) + 1):
+        keys, observed = counts[n]
+        frequent = observed >= min_support
+        keys, observed = keys[frequent], observed[frequent].astype(np.float64)
+        if len(keys) == 0:
+            continue
+        suffix = _lookup(counts[n - 1], keys % BASE ** (n - 1))
+        if n == 2:
+            first = _lookup(counts[1], keys // BASE)
+            expected = first * suffix / np.maximum(total - first, 1)
+        else:
+            prefix = _lookup(counts[n - 1], keys // BASE)
+            middle = _lookup(counts[n - 2], (keys // BASE) % BASE ** (n - 2))
+            expected = prefix * suffix / np.maximum(middle, 1)
+        expected = np.maximum(expected, 1e-9)
+        z = (observed - expected) / np.sqrt(expected)
+        # Only the best `limit` of each length can make the overall top `limit`
+        best = np.argsort(-z)[:limit]
+        best = best[z[best] > 0]
+        ranked.extend((float(z[i]), n, keys[i], observed[i], expected[i]) for i in best)
+
+    ranked.sort(key=lambda m: m[0], reverse=True)
+    motifs = []
+    for score, n, key, count, exp in ranked[:limit]:
+        zones = decode(key, n)
+        motifs.append({'pattern': '-'.join(zones), 'zones': zones, 'count': int(count),
+                       'expected': round(float(exp), 3), 'z': round(score, 3)})
+    return motifs
+
+
+# ---- Incremental index ----
+
+def _empty_counts(max_n):
+    return {n: (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)) for n in range(1, max_n + 1)}
+
+def load_index(index_path=INDEX_PATH, manifest_path=MANIFEST_PATH, max_n=MAX_N):
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        with np.load(index_path) as data:
+            if int(data['max_n']) != max_n:
+                raise ValueError("index built for a different max_n")
+            counts = {n: (data[f'keys_{n}'], data[f'counts_{n}']) for n in range(1, max_n + 1)}
+        return counts, manifest
+    except (OSError, ValueError, KeyError):
+        return _empty_counts(max_n), {}
+
+def save_index(counts, manifest, index_path=INDEX_PATH, manifest_path=MANIFEST_PATH):
+    os.makedirs(os.path.dirname(index_path) or '.', exist_ok=True)
+    arrays = {'max_n': np.int64(max(counts))}
+    for n, (keys, values) in counts.items():
+        arrays[f'keys_{n}'], arrays[f'counts_{n}'] = keys, values
+    tmp_path = index_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, **arrays)
+    os.replace(tmp_path, index_path)
+    with open(manifest_path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+    os.replace(manifest_path + '.tmp', manifest_path)
+
+def _sequence_path(bin_key, sequence_dir):
+    return os.path.join(sequence_dir, hashlib.sha1(bin_key.encode('utf-8')).hexdigest() + '.npy')
+
+def _read_archived(bin_key, archive_dir):
+    day, run, name = bin_key.split('/', 2)
+    return file_handler.parse_trajectory_bytes(compaction.read_run_file(day, run, name, archive_dir))
+
+# Bin key ("<date>/<time>/.../trajectory_data.bin") -> (reader, signature) for every bin on disk.
+# Live bins are signed by size and mtime, archived ones by size; a live bin wins over its archived copy.
+def _current_bins(plots_dir, archive_dir):
+    from python import bite_analysis
+
+    current = {}
+    for bin_key, size in compaction.list_archived_files(BIN_NAME, archive_dir).items():
+        current[bin_key] = (lambda k=bin_key: _read_archived(k, archive_dir), ['archive', size])
+    for bin_path in bite_analysis.find_trajectory_bins(plots_dir):
+        stat = os.stat(bin_path)
+        bin_key = os.path.relpath(bin_path, plots_dir).replace(os.sep, '/')
+        current[bin_key] = (lambda p=bin_path: file_handler.read_trajectory_bin(p), [stat.st_size, stat.st_mtime_ns])
+    return current
+
+def _unchanged(stat, signature):
+    # Compacting a run moves its bin into the archive byte for byte
+    return stat == signature or (signature[0] == 'archive' and stat[0] == signature[1])
+
+# Bring the index up to date with the trajectory bins in the plots tree and the archive. Only
+# new and changed bins are read; a changed bin's old n-grams are subtracted using its stored
+# collapsed sequence. A bin deleted from disk stays counted: the index is the whole history.
+@profiling.traced("analysis.mine_motifs")
+def update_index(plots_dir, max_n=MAX_N, rebuild=False, index_path=INDEX_PATH,
+                 manifest_path=MANIFEST_PATH, sequence_dir=SEQUENCE_DIR, archive_dir=compaction.ARCHIVE_DIR):
+    counts, manifest = load_index(index_path, manifest_path, max_n)
+    if rebuild or not manifest:
+        counts, manifest = _empty_counts(max_n), {}
+    os.makedirs(sequence_dir, exist_ok=True)
+    current = _current_bins(plots_dir, archive_dir)
+
+    added, removed = [], []
+    dirty = False
+    for bin_key, entry in list(manifest.items()):
+        if bin_key not in current:
+            # It can no longer change, so its sequence is not needed to take it back out
+            if entry.get('sequence', True):
+                try:
+                    os.remove(_sequence_path(bin_key, sequence_dir))
+                except OSError:
+                    pass
+                entry['sequence'] = False
+                dirty = True
+            continue
+        signature = current[bin_key][1]
+        if _unchanged(entry['stat'], signature):
+            if entry['stat'] != signature:
+                entry['stat'] = signature
+                dirty = True
+            continue
+        try:
+            removed.append(np.load(_sequence_path(bin_key, sequence_dir)))
+        except OSError:
+            # Without the old sequence its counts cannot be taken back out
+            logger.warning(f"Stored sequence for {bin_key} is missing; rebuilding the motif index")
+            return update_index(plots_dir, max_n, True, index_path, manifest_path, sequence_dir, archive_dir)
+        del manifest[bin_key]
+    for bin_key, (read, signature) in current.items():
+        if bin_key in manifest:
+            continue
+        sequence = collapsed_zones(read()['quadrant'])
+        np.save(_sequence_path(bin_key, sequence_dir), sequence)
+        manifest[bin_key] = {'stat': signature, 'symbols': int(len(sequence))}
+        added.append(sequence)
+
+    if removed:
+        counts = merge_counts(counts, count_ngrams(removed, max_n), sign=-1)
+    if added:
+        counts = merge_counts(counts, count_ngrams(added, max_n))
+    if added or removed or dirty:
+        save_index(counts, manifest, index_path, manifest_path)
+    stats = {'bins': len(manifest), 'added': len(added), 'removed': len(removed),
+             'symbols': int(counts[1][1].sum())}
+    profiling.current().record(rows=sum(len(s) for s in added))
+    return counts, stats
+
+def write_motifs(motifs, stats, motifs_path=bite_patterns.MOTIFS_PATH):
+    os.makedirs(os.path.dirname(motifs_path) or '.', exist_ok=True)
+    document = {'generated_at': time.time(), 'sequence': 'collapsed', **stats, 'motifs': motifs}
+    with open(motifs_path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(document, f, indent=1)
+    os.replace(motifs_path + '.tmp', motifs_path)
+    return motifs_path
+
+# Update the index and publish ranked motifs where the bite analysis loads them
+def mine(plots_dir, max_n=MAX_N, rebuild=False, min_support=MIN_SUPPORT, limit=MOTIF_LIMIT,
+         motifs_path=bite_patterns.MOTIFS_PATH):
+    start = time.perf_counter()
+    counts, stats = update_index(plots_dir, max_n, rebuild)
+    motifs = score_motifs(counts, min_support, limit)
+    write_motifs(motifs, stats, motifs_path)
+    logger.info(f"Motifs: {stats['symbols']} symbols from {stats['bins']} trajectories "
+                f"(+{stats['added']} / -{stats['removed']}), {len(motifs)} ranked "
+                f"in {time.perf_counter() - start:.2f}s -> {motifs_path}")
+    return motifs, stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mine surprising zone motifs from trajectory history.")
+    parser.add_argument("plots_dir", nargs="?", default=os.path.join('AI', 'targetFile', 'plots'))
+    parser.add_argument("--max-n", type=int, default=MAX_N)
+    parser.add_argument("--min-support", type=int, default=MIN_SUPPORT)
+    parser.add_argument("--rebuild", action="store_true", help="discard the index and recount the bins on disk (live and archived)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(name)s: %(message)s")
+
+    if not os.path.isdir(args.plots_dir):
+        sys.exit(f"No plots directory at {args.plots_dir}")
+    motifs, stats = mine(args.plots_dir, args.max_n, args.rebuild, args.min_support)
+    for motif in motifs[:15]:
+        print(f"{motif['pattern']:14} count {motif['count']:8}  expected {motif['expected']:10.1f}  z {motif['z']:8.2f}")
@@ -1,3 +1,4 @@
+import os
 import tkinter as tk
 from tkinter import ttk, scrolledtext
 from tkinter import messagebox
@@ -6,6 +7,11 @@ from python import file_handler
 from python import my_math
 from python import  chart
 from python import  fish_behavior as fb
+from python import trajectory_engine
+from python import live_charts
+from python import motif_mining
+from python import report
+from python import forecast
 
 
 def display_data(window):
@@ -14,7 +20,8 @@ def display_data(window):
         tk.Label(window, text="No data available.", foreground="red").pack()
         return
 
-    columns = list(data_list[0].keys())
+    # epoch_utc is storage, not display: date/time already show it in the station's zone
+    columns = [col for col in data_list[0].keys() if col != 'epoch_utc']
 
     # Create a frame to hold both the Treeview and scrollbars
     frame = tk.Frame(window)
@@ -51,11 +58,57 @@ def display_data(window):
         values = [row[col] for col in columns]
         tree.insert('', tk.END, values=values)
 
-def dummy_def():
-    root = tk.Tk()
-    root.withdraw()  # Hide the main window
-    messagebox.showinfo("GPU Version Only")
-    root.destroy()
+# report.json and report.html for the current run, from cached charts only
+def generate_report(output_dir, dll_path):
+    if not os.path.isfile(os.path.join(output_dir, 'weather_data.csv')):
+        messagebox.showerror("Report", "No weather data for this run yet. Gather data first.")
+        return None
+    try:
+        paths = report.generate_run_report(output_dir, dll_path)
+    except Exception as e:
+        messagebox.showerror("Report", f"Could not generate the report: {e}")
+        return None
+    messagebox.showinfo("Report", f"Report saved to:\n{paths['json']}\n{paths['html']}")
+    return paths
+
+# NumPy trajectory for the current run, written where the bite analysis reads it
+def chaos_trajectory(output_dir, csv_filename, plots_dir=None):
+    try:
+        results = trajectory_engine.generate_for_csv(csv_filename, output_dir)
+    except FileNotFoundError:
+        messagebox.showerror("Chaos Trajectory", "No weather data for this run yet. Gather data first.")
+        return None
+    if not results:
+        messagebox.showwarning("Chaos Trajectory", "Not enough observations to build a trajectory.")
+        return None
+    for result in results:
+        result['plot'] = chart.plot_trajectory(result['bin_path'], os.path.dirname(result['bin_path']))
+    if plots_dir:
+        # New bins only: the motif index is updated incrementally
+        try:
+            motif_mining.mine(plots_dir)
+        except Exception as e:
+            print(f"[WARN] Motif mining skipped: {e}")
+    lines = [f"{r['station']}: {r['points']} points -> {r['plot'] or r['bin_path']}" for r in results]
+    messagebox.showinfo("Chaos Trajectory", "\n".join(lines))
+    return results
+
+# 7-day outlook from the NOAA gridpoint forecast; the hourly table is saved with the run
+def get_predictions(output_dir):
+    try:
+        lat, lon = station_observation.get_location()
+        station_id = station_observation.get_station(lat, lon)
+        hourly, daily = forecast.get_fishing_outlook(lat, lon, station_id=station_id)
+    except Exception as e:
+        messagebox.showerror("Predictions", f"Could not get the forecast outlook: {e}")
+        return None
+    os.makedirs(output_dir, exist_ok=True)
+    hourly_path = os.path.join(output_dir, "forecast_outlook.csv")
+    hourly.to_csv(hourly_path, index=False)
+    lines = [f"{day}: {row['ideal_hours']} ideal hours, water {row['mean_water_temp (F)']}°F – {row['fishing_note']}"
+             for day, row in daily.iterrows()]
+    messagebox.showinfo("Predictions", "\n".join(lines + [f"Hourly outlook saved to: {hourly_path}"]))
+    return daily
 
 def deploy(script_dir, dll_path, plots_dir, output_dir, date_str, time_str, csv_filename):
     try:
@@ -75,32 +128,40 @@ def deploy(script_dir, dll_path, plots_dir, output_dir, date_str, time_str, csv_
         title = tk.Label(content_frame, text="Latest Fishing Conditions Report", font=("Helvetica", 18, "bold"))
         title.pack(pady=10)
 
+        # Charts live in this window; figures are built once and updated in place
+        chart_panel = live_charts.ChartPanel(content_frame, csv_filename)
+
+        def gather_and_update():
+            data_list = station_observation.gather_data(dll_path, plots_dir, csv_filename, output_dir)
+            if data_list:
+                chart_panel.update(data_list)
+
         tk.Button(left_frame, text="Gather Data", width=20,
-                  command=lambda: station_observation.gather_data(dll_path, plots_dir, csv_filename, output_dir)).pack(pady=5)
+                  command=gather_and_update).pack(pady=5)
 
         tk.Button(left_frame, text="Display Data", width=20,
                   command=lambda: display_data(content_frame)).pack(pady=5)
 
         tk.Button(left_frame, text="Plot Weather Data", width=20,
-                  command=lambda: chart.plot_weather_data(output_dir, csv_filename)).pack(pady=5)
+                  command=lambda: chart_panel.show('weather')).pack(pady=5)
 
         tk.Button(left_frame, text="Run Chaos Chart", width=20,
-                  command=lambda: chart.chart_run( output_dir, date_str, time_str)).pack(pady=5)
+                  command=lambda: chart_panel.show('conditions')).pack(pady=5)
 
         tk.Button(left_frame, text="Chaos Trajectory", width=20,
-                  command=lambda: dummy_def()).pack(pady=5)
+                  command=lambda: chaos_trajectory(output_dir, csv_filename, plots_dir)).pack(pady=5)
         
         tk.Button(left_frame, text="Get Predictions", width=20,
-                  command=lambda: dummy_def()).pack(pady=5)
+                  command=lambda: get_predictions(output_dir)).pack(pady=5)
 
         tk.Button(left_frame, text="Generate Chart GIF", width=20,
                   command=lambda: chart.chart_gif(output_dir)).pack(pady=5)
         
         tk.Button(left_frame, text="Analyze Bite Patterns", width=20,
-                  command=lambda: dummy_def()).pack(pady=5)
+                  command=lambda: fb.ana_bite_pat(output_dir, dll_path)).pack(pady=5)
 
         tk.Button(left_frame, text="Generate JSON & Report", width=20,
-                  command=lambda: dummy_def()).pack(pady=5)
+                  command=lambda: generate_report(output_dir, dll_path)).pack(pady=5)
 
 
         root.mainloop()
@@ -2,6 +2,7 @@ import os
 import struct
 import math
 import ctypes
+import numpy as np
 
 #Water Temp
 def estimate_water_temp(air_temp, wind_speed, elevation_ft):
@@ -10,6 +11,15 @@ def estimate_water_temp(air_temp, wind_speed, elevation_ft):
         base -= 5
     return round(base, 1)
 
+# Vectorized estimate_water_temp, missing air temp/wind default like retrieve_observations
+def estimate_water_temp_array(air_temp, wind_speed, elevation_ft):
+    air_temp = np.nan_to_num(np.asarray(air_temp, dtype=np.float64), nan=60.0)
+    wind_speed = np.nan_to_num(np.asarray(wind_speed, dtype=np.float64), nan=0.0)
+    elevation_ft = np.nan_to_num(np.asarray(elevation_ft, dtype=np.float64), nan=0.0)
+    base = air_temp - wind_speed * 0.5
+    base = base - np.where(elevation_ft > 5000, 5.0, 0.0)
+    return np.round(base, 1)
+
 def normalize_inputs(humidity, pressure, temp, wind):
     norm_humidity = max(min(humidity / 100.0, 1.0), 0.01)
     norm_pressure = pressure / 1013.25
@@ -69,3 +79,41 @@ def spiral_position_within_quadrant(temp, humidity, pressure, center, wind, t=1.
 
     return x, y
 
+
+# Vectorized spiral_position_within_quadrant.
+# Inputs broadcast against each other; pass t with a trailing axis (e.g. t[None, :])
+# to get a full trail per scenario in one call.
+def spiral_positions(temp, humidity, pressure, center, wind, t=1.0, scale=10.0):
+    temp, humidity, pressure, wind = (np.asarray(v, dtype=np.float64) for v in (temp, humidity, pressure, wind))
+    center = np.asarray(center, dtype=np.float64)
+    t = np.asarray(t, dtype=np.float64)
+
+    norm_humidity = np.clip(humidity / 100.0, 0.01, 1.0)
+    norm_pressure = pressure / 1013.25
+    norm_temp = np.clip((temp - 32) / 68.0, 0.0, 1.5)
+    norm_wind = np.clip(wind / 15.0, 0.0, 2.0)
+    volatility = norm_temp * (1.0 - norm_pressure) * norm_humidity
+    spiral_speed = norm_wind * norm_humidity
+
+    chaos_strength = volatility * 2.0
+    chaos_angle = np.pi * (norm_wind - 0.5) * 2
+    tension = (norm_humidity + norm_temp + (1 - norm_pressure) + norm_wind) / 4
+    offset_distance = (0.5 + volatility) * tension * scale
+    shift = offset_distance + chaos_strength
+
+    if t.ndim:
+        # Scenario-level terms gain a trailing axis to broadcast over time steps
+        expand = lambda a: a[..., None]
+        cx, cy = expand(center[..., 0]), expand(center[..., 1])
+        shift, chaos_angle, spiral_speed = expand(shift), expand(chaos_angle), expand(spiral_speed)
+        decay, base_radius = expand(0.25 + norm_humidity * 0.5), expand(1.2 + volatility)
+    else:
+        cx, cy = center[..., 0], center[..., 1]
+        decay, base_radius = 0.25 + norm_humidity * 0.5, 1.2 + volatility
+
+    r = base_radius * (1 - np.exp(-decay * t))
+    theta = -2 * np.pi * spiral_speed * t
+
+    x = cx + shift * np.cos(chaos_angle) + r * np.cos(theta)
+    y = cy + shift * np.sin(chaos_angle) + r * np.sin(theta)
+    return x, y
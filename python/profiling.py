@@ -0,0 +1,158 @@
+import os
+import csv
+import json
+import time
+import cProfile
+import functools
+import threading
+from collections import deque
+
+
+# Tracing is off unless enabled here or with MAD_ANGLER_TRACE=1
+_enabled = os.environ.get("MAD_ANGLER_TRACE", "") not in ("", "0")
+_spans = deque(maxlen=10_000)
+# Span names to run under cProfile, e.g. MAD_ANGLER_PROFILE=render.chart_run,fetch.*
+_profile_names = set(filter(None, os.environ.get("MAD_ANGLER_PROFILE", "").split(",")))
+_profile_dir = os.path.join("AI", "Reports", "profiles")
+_local = threading.local()
+
+
+class _NullSpan:
+    def record(self, rows=None, bytes=None, **attrs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+
+    def __init__(self, name, attrs):
+        self.name = name
+        self.rows = None
+        self.bytes = None
+        self.attrs = attrs
+        self._profiler = None
+
+    # Row/byte counts are summed so a span can report several writes
+    def record(self, rows=None, bytes=None, **attrs):
+        if rows is not None:
+            self.rows = (self.rows or 0) + rows
+        if bytes is not None:
+            self.bytes = (self.bytes or 0) + bytes
+        self.attrs.update(attrs)
+
+    def _should_profile(self):
+        prefix = self.name.split(".")[0] + ".*"
+        return bool({self.name, prefix, "*"} & _profile_names)
+
+    def __enter__(self):
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        self.parent = stack[-1].name if stack else None
+        stack.append(self)
+        if _profile_names and self._should_profile():
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        self.start = time.time()
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self._t0
+        if self._profiler is not None:
+            self._profiler.disable()
+            os.makedirs(_profile_dir, exist_ok=True)
+            self._profiler.dump_stats(os.path.join(_profile_dir, f"{self.name}-{int(self.start * 1000)}.prof"))
+        _local.stack.pop()
+        _spans.append({
+            "name": self.name,
+            "parent": self.parent,
+            "start": self.start,
+            "wall_s": wall,
+            "rows": self.rows,
+            "bytes": self.bytes,
+            "error": exc_type.__name__ if exc_type else None,
+            "thread": threading.current_thread().name,
+            **self.attrs,
+        })
+        return False
+
+
+def enable(capacity=10_000, profile=None, profile_dir=None):
+    global _enabled, _spans, _profile_names, _profile_dir
+    _spans = deque(_spans, maxlen=capacity)
+    if profile is not None:
+        _profile_names = set(profile)
+    _profile_dir = profile_dir or _profile_dir
+    _enabled = True
+
+def disable():
+    global _enabled
+    _enabled = False
+
+def is_enabled():
+    return _enabled
+
+def span(name, **attrs):
+    if not _enabled:
+        return _NULL_SPAN
+    return Span(name, attrs)
+
+# Innermost open span on this thread, for recording rows/bytes from inside a traced call
+def current():
+    stack = getattr(_local, "stack", None)
+    return stack[-1] if _enabled and stack else _NULL_SPAN
+
+def traced(name):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with Span(name, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def spans():
+    return list(_spans)
+
+def clear():
+    _spans.clear()
+
+# Per-name totals for a quick look at where time goes
+def summary():
+    totals = {}
+    for s in _spans:
+        entry = totals.setdefault(s["name"], {"count": 0, "wall_s": 0.0, "rows": 0, "bytes": 0})
+        entry["count"] += 1
+        entry["wall_s"] += s["wall_s"]
+        entry["rows"] += s["rows"] or 0
+        entry["bytes"] += s["bytes"] or 0
+    return dict(sorted(totals.items(), key=lambda kv: kv[1]["wall_s"], reverse=True))
+
+def export_json(path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"spans": spans(), "summary": summary()}, f, indent=2)
+    return path
+
+def export_csv(path):
+    rows = spans()
+    fieldnames = ["name", "parent", "start", "wall_s", "rows", "bytes", "error", "thread"]
+    for row in rows:
+        fieldnames.extend(key for key in row if key not in fieldnames)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+    return path
@@ -0,0 +1,137 @@
+import os
+import json
+import shutil
+import hashlib
+import logging
+import contextlib
+
+logger = logging.getLogger(__name__)
+
+RENDER_CACHE_DIR = os.path.join('AI', 'targetFile', 'cache', 'render')
+MAX_CACHE_BYTES = 200 * 1024 * 1024
+
+# Source files whose changes invalidate every cached render
+_CODE_FILES = ('chart.py', 'my_math.py', 'weather.py', 'render_cache.py', 'trajectory_lod.py')
+_code_version = None
+# Off for benchmarks, which must time real renders; MAD_ANGLER_RENDER_CACHE=0 turns it off too
+_enabled = os.environ.get("MAD_ANGLER_RENDER_CACHE", "1") != "0"
+
+
+@contextlib.contextmanager
+def disabled():
+    global _enabled
+    previous, _enabled = _enabled, False
+    try:
+        yield
+    finally:
+        _enabled = previous
+
+def code_version():
+    global _code_version
+    if _code_version is None:
+        digest = hashlib.sha256()
+        module_dir = os.path.dirname(os.path.abspath(__file__))
+        for name in _CODE_FILES:
+            with open(os.path.join(module_dir, name), 'rb') as f:
+                digest.update(f.read())
+        _code_version = digest.hexdigest()[:16]
+    return _code_version
+
+def hash_rows(rows):
+    return hashlib.sha256(json.dumps(rows, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+# Key = input data hash + chart name + parameters + code version
+def render_key(chart_name, data_hash, **params):
+    payload = json.dumps({'chart': chart_name, 'data': data_hash, 'params': params, 'code': code_version()},
+                         sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _manifest_path(key, cache_dir):
+    return os.path.join(cache_dir, f"{key}.json")
+
+def _entry_path(key, name, cache_dir):
+    return os.path.join(cache_dir, f"{key}__{name}")
+
+def _place(src, dest):
+    os.makedirs(os.path.dirname(dest) or '.', exist_ok=True)
+    if os.path.abspath(src) == os.path.abspath(dest):
+        return
+    # Copies, not hard links: a later savefig to dest must not rewrite the cached file
+    shutil.copyfile(src, dest)
+
+# On a hit, place every cached output in output_dir and return their paths; None on a miss
+def fetch(key, output_dir, cache_dir=RENDER_CACHE_DIR):
+    if not _enabled:
+        return None
+    manifest = _manifest_path(key, cache_dir)
+    if not os.path.isfile(manifest):
+        return None
+    try:
+        with open(manifest, 'r', encoding='utf-8') as f:
+            names = json.load(f)['files']
+    except (OSError, ValueError, KeyError):
+        return None
+    if not all(os.path.isfile(_entry_path(key, name, cache_dir)) for name in names):
+        return None
+
+    paths = {}
+    for name in names:
+        dest = os.path.join(output_dir, name)
+        _place(_entry_path(key, name, cache_dir), dest)
+        paths[name] = dest
+    # Touch the manifest: its mtime is the LRU clock
+    os.utime(manifest)
+    logger.info(f"Render cache hit {key[:12]}: {', '.join(names)}")
+    return paths
+
+def store(key, files, cache_dir=RENDER_CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+    if not _enabled:
+        return
+    os.makedirs(cache_dir, exist_ok=True)
+    names = []
+    for path in files:
+        if not os.path.isfile(path):
+            continue
+        name = os.path.basename(path)
+        _place(path, _entry_path(key, name, cache_dir))
+        names.append(name)
+    with open(_manifest_path(key, cache_dir), 'w', encoding='utf-8') as f:
+        json.dump({'files': names}, f)
+    evict(cache_dir, max_bytes)
+
+# Drop least recently used entries until the cache fits in max_bytes
+def evict(cache_dir=RENDER_CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+    entries = {}
+    total = 0
+    with os.scandir(cache_dir) as it:
+        for item in it:
+            if not item.is_file():
+                continue
+            key = item.name.split('__', 1)[0].removesuffix('.json')
+            size = item.stat().st_size
+            entry = entries.setdefault(key, {'size': 0, 'mtime': 0.0, 'files': []})
+            entry['size'] += size
+            entry['files'].append(item.path)
+            if item.name.endswith('.json'):
+                entry['mtime'] = item.stat().st_mtime
+            total += size
+
+    for key, entry in sorted(entries.items(), key=lambda kv: kv[1]['mtime']):
+        if total <= max_bytes:
+            break
+        for path in entry['files']:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        total -= entry['size']
+        logger.debug(f"Evicted render {key[:12]} ({entry['size']} bytes)")
+    return total
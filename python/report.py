@@ -0,0 +1,354 @@
+import os
+import sys
+import json
+import html
+import math
+import time
+import argparse
+import logging
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from python import weather
+from python import my_math
+from python import chart
+from python import render_cache
+from python import bite_analysis
+from python import file_handler
+from python import profiling
+
+logger = logging.getLogger(__name__)
+
+REPORT_JSON = 'report.json'
+REPORT_HTML = 'report.html'
+# Observation rows read, classified and written per step; bounds memory for long histories
+CHUNK_ROWS = 5_000
+# Same final spiral step as chart_run
+SPIRAL_T = (100 - 1) / 10.0
+
+OBSERVATION_FIELDS = [
+    "date", "time", "epoch_utc", "station_name", "temperature (F)", "humidity (%)",
+    "barometric_pressure (hPa)", "wind_speed (m/s)", "weather", "estimated_water_temp (F)",
+    "species_target", "fishing_note", "pressure_trend",
+]
+CONDITION_COLUMNS = ["temperature (F)", "humidity (%)", "barometric_pressure (hPa)", "wind_speed (m/s)"]
+
+
+# ---- Incremental JSON ----
+
+def _plain(value):
+    # NaN is not JSON; numpy scalars are not serializable as-is
+    if isinstance(value, (np.floating, float)):
+        return None if math.isnan(value) else float(value)
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, dict):
+        return {k: _plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    return value
+
+# Writes one JSON document piece by piece: containers are opened and closed explicitly and
+# values are serialized as they arrive, so nothing but the open-container stack is kept
+class JsonStreamWriter:
+
+    def __init__(self, f):
+        self.f = f
+        self._stack = []
+
+    def _separator(self, key):
+        if self._stack:
+            if self._stack[-1]['count']:
+                self.f.write(',')
+            self._stack[-1]['count'] += 1
+            self.f.write('\n' + '  ' * len(self._stack))
+        if key is not None:
+            self.f.write(json.dumps(key) + ': ')
+
+    def begin(self, kind, key=None):
+        self._separator(key)
+        self.f.write('{' if kind == 'object' else '[')
+        self._stack.append({'kind': kind, 'count': 0})
+
+    def end(self):
+        closing = '}' if self._stack.pop()['kind'] == 'object' else ']'
+        self.f.write('\n' + '  ' * len(self._stack) + closing)
+        if not self._stack:
+            self.f.write('\n')
+
+    def value(self, value, key=None):
+        self.encoded(_ENCODER.encode(_plain(value)), key)
+
+    # Already JSON-encoded text, for hot loops that build plain values themselves
+    def encoded(self, text, key=None):
+        self._separator(key)
+        self.f.write(text)
+
+_ENCODER = json.JSONEncoder(ensure_ascii=False, allow_nan=False)
+
+
+# ---- Observation stream ----
+
+def _numeric(frame, column):
+    return pd.to_numeric(frame[column], errors='coerce').to_numpy(dtype=np.float64) if column in frame \
+        else np.full(len(frame), np.nan)
+
+# Zone and spiral end-point for a chunk of rows, vectorized
+def annotate_chunk(frame):
+    temp, humidity, pressure, wind = (_numeric(frame, c) for c in CONDITION_COLUMNS)
+    zones = weather.classify_conditions_array(temp, humidity, pressure, wind)
+    spiral_x, spiral_y = my_math.spiral_positions(temp, humidity, pressure, weather.zone_points(zones), wind, t=SPIRAL_T)
+    complete = ~(np.isnan(temp) | np.isnan(humidity) | np.isnan(pressure) | np.isnan(wind))
+    return zones, np.where(complete, spiral_x, np.nan), np.where(complete, spiral_y, np.nan)
+
+def _iter_csv_chunks(csv_path):
+    for chunk in pd.read_csv(csv_path, encoding='utf-8-sig', dtype=str, keep_default_na=False, chunksize=CHUNK_ROWS):
+        yield chunk
+
+# Observation chunks of every run: archived days first, then live run folders, oldest first.
+# Consecutive pulls overlap, so a row is kept only if it is newer (UTC epoch) than anything an
+# earlier day or run had for its station: one high-water mark per station, not a set of every row.
+def iter_history_chunks(plots_dir, archive_dir=None):
+    from python import compaction
+    from python import station_observation
+
+    def sources():
+        for _, frame in compaction.iter_archived_history(archive_dir or compaction.ARCHIVE_DIR):
+            yield (frame.iloc[start:start + CHUNK_ROWS] for start in range(0, len(frame), CHUNK_ROWS))
+        for run_folder in file_handler.list_run_folders(plots_dir):
+            csv_path = os.path.join(run_folder, 'weather_data.csv')
+            if os.path.isfile(csv_path):
+                yield _iter_csv_chunks(csv_path)
+
+    high_water = {}
+    for chunks in sources():
+        newest = {}
+        for chunk in chunks:
+            stations = chunk['station_name'] if 'station_name' in chunk else pd.Series('', index=chunk.index)
+            epochs = station_observation.row_epochs(chunk)
+            floor = stations.map(high_water).astype('float64').fillna(-np.inf).to_numpy()
+            yield chunk[epochs > floor]
+            for station, epoch in pd.Series(epochs, index=stations.to_numpy()).groupby(level=0).max().items():
+                newest[station] = max(newest.get(station, -np.inf), epoch)
+        # Rows within one day or run are already unique; the mark moves once the source is done
+        for station, epoch in newest.items():
+            if epoch > high_water.get(station, -np.inf):
+                high_water[station] = epoch
+
+# Stream annotated observations into an open "observations" array, returning running stats
+def write_observations(writer, chunks):
+    stats = {'count': 0, 'zones': {}, 'first': None, 'last': None, 'latest': None}
+    for frame in chunks:
+        if frame.empty:
+            continue
+        zones, spiral_x, spiral_y = annotate_chunk(frame)
+        columns = [c for c in OBSERVATION_FIELDS if c in frame.columns]
+        # CSV cells are strings already, so rows go straight to the encoder
+        rows = frame[columns].to_numpy(dtype=object).tolist()
+        spiral = np.round(np.stack([spiral_x, spiral_y], axis=1), 4).tolist()
+        for values, zone, end in zip(rows, zones.tolist(), spiral):
+            record = dict(zip(columns, values))
+            record['zone'] = zone
+            record['spiral_end'] = None if math.isnan(end[0]) else end
+            writer.encoded(_ENCODER.encode(record))
+            stats['zones'][record['zone']] = stats['zones'].get(record['zone'], 0) + 1
+            stamp = f"{record.get('date')} {record.get('time')}"
+            stats['first'] = stamp if stats['first'] is None or stamp < stats['first'] else stats['first']
+            if stats['last'] is None or stamp >= stats['last']:
+                stats['last'] = stamp
+                if record['spiral_end'] is not None:
+                    stats['latest'] = record
+        stats['count'] += len(rows)
+    return stats
+
+
+# ---- Chart references ----
+
+# Charts this run already has in the render cache, placed into the run folder; never renders
+def cached_charts(run_folder, latest=None):
+    charts = {}
+    csv_path = os.path.join(run_folder, 'weather_data.csv')
+    bin_path = os.path.join(run_folder, 'trajectory_data.bin')
+    keys = []
+    if os.path.isfile(csv_path):
+        keys.append(('weather', chart.weather_plots_key(csv_path)))
+    if latest is not None:
+        keys.append(('condition_map', chart.chart_run_key(
+            latest['date'], latest['time'], *(float(latest[c]) for c in CONDITION_COLUMNS))))
+    if os.path.isfile(bin_path):
+        keys.append(('trajectory', chart.trajectory_key(bin_path)))
+    for name, key in keys:
+        placed = render_cache.fetch(key, run_folder)
+        if placed:
+            charts[name] = sorted(os.path.relpath(p, run_folder) for p in placed.values())
+    # Charts saved straight into the run folder before the cache existed
+    for name, files in (('gif', ['spiral_chart.gif']), ('condition_map', ['chaos_chart.png']),
+                        ('trajectory', ['trajectory.png'])):
+        if name not in charts and all(os.path.isfile(os.path.join(run_folder, f)) for f in files):
+            charts[name] = files
+    return charts
+
+
+# ---- Reports ----
+
+def _bite_section(run_folder, dll_path):
+    result = bite_analysis.analyze_trajectory(os.path.join(run_folder, 'trajectory_data.bin'), dll_path)
+    return {key: result[key] for key in ('status', 'total_points', 'patterns', 'pattern_source',
+                                         'score', 'score_backend', 'error')}
+
+def _write_report(json_path, title, chunks, run_folder=None, dll_path=None):
+    tmp_path = json_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        writer = JsonStreamWriter(f)
+        writer.begin('object')
+        writer.value(title, 'title')
+        writer.value(time.strftime('%Y-%m-%dT%H:%M:%S%z'), 'generated_at')
+        writer.begin('array', 'observations')
+        stats = write_observations(writer, chunks)
+        writer.end()
+
+        latest = stats.pop('latest')
+        summary = dict(stats)
+        if latest is not None:
+            summary['latest'] = latest
+            summary['latest_zone_label'] = weather.base_tags[latest['zone']]['label']
+        writer.value(summary, 'summary')
+        sections = {'summary': summary}
+        if run_folder:
+            sections['bite_patterns'] = _bite_section(run_folder, dll_path)
+            sections['charts'] = cached_charts(run_folder, latest)
+            writer.value(sections['bite_patterns'], 'bite_patterns')
+            writer.value(sections['charts'], 'charts')
+        writer.end()
+    os.replace(tmp_path, json_path)
+    return sections
+
+# report.json (and report.html) for one run folder
+@profiling.traced("persist.generate_report")
+def generate_run_report(run_folder, dll_path=None, write_html=True):
+    csv_path = os.path.join(run_folder, 'weather_data.csv')
+    chunks = _iter_csv_chunks(csv_path) if os.path.isfile(csv_path) else iter(())
+    title = f"Mad Angler report {os.path.basename(os.path.dirname(run_folder))} {os.path.basename(run_folder)}"
+    json_path = os.path.join(run_folder, REPORT_JSON)
+    sections = _write_report(json_path, title, chunks, run_folder, dll_path)
+    paths = {'json': json_path}
+    if write_html:
+        paths['html'] = write_html_summary(os.path.join(run_folder, REPORT_HTML), title, sections)
+    profiling.current().record(rows=sections['summary']['count'], bytes=os.path.getsize(json_path))
+    return paths
+
+# One report over every observation on record, streamed day by day
+@profiling.traced("persist.generate_history_report")
+def generate_history_report(plots_dir, output_path, archive_dir=None, write_html=True):
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    sections = _write_report(output_path, "Mad Angler history report", iter_history_chunks(plots_dir, archive_dir))
+    paths = {'json': output_path}
+    if write_html:
+        paths['html'] = write_html_summary(os.path.splitext(output_path)[0] + '.html', "Mad Angler history report", sections)
+    return paths
+
+def _is_current(run_folder):
+    report = os.path.join(run_folder, REPORT_JSON)
+    if not os.path.isfile(report):
+        return False
+    inputs = [os.path.join(run_folder, n) for n in ('weather_data.csv', 'trajectory_data.bin')]
+    newest = max((os.path.getmtime(p) for p in inputs if os.path.isfile(p)), default=0)
+    return os.path.getmtime(report) >= newest
+
+def _report_job(args):
+    run_folder, dll_path, write_html = args
+    try:
+        return run_folder, generate_run_report(run_folder, dll_path, write_html), None
+    except Exception as e:
+        return run_folder, None, str(e)
+
+# Regenerate the reports of every run folder, skipping those newer than their inputs
+def generate_all_reports(plots_dir, dll_path=None, write_html=True, force=False, max_workers=None):
+    run_folders = [f for f in file_handler.list_run_folders(plots_dir) if force or not _is_current(f)]
+    if not run_folders:
+        print(f"[INFO] All reports under {plots_dir} are up to date")
+        return []
+    jobs = [(folder, dll_path, write_html) for folder in run_folders]
+    if len(jobs) == 1 or max_workers == 1:
+        results = [_report_job(job) for job in jobs]
+    else:
+        chunksize = max(1, len(jobs) // ((max_workers or os.cpu_count() or 1) * 4))
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(_report_job, jobs, chunksize=chunksize))
+    for run_folder, _, error in results:
+        if error:
+            print(f"[ERROR] Report for {run_folder} failed: {error}")
+    print(f"[INFO] Generated {sum(1 for r in results if r[2] is None)} of {len(results)} reports")
+    return results
+
+
+# ---- HTML ----
+
+def _table(headers, rows):
+    head = ''.join(f"<th>{html.escape(str(h))}</th>" for h in headers)
+    body = ''.join('<tr>' + ''.join(f"<td>{html.escape('' if v is None else str(v))}</td>" for v in row) + '</tr>'
+                   for row in rows)
+    return f"<table><tr>{head}</tr>{body}</table>"
+
+# Small human-readable page from the summary sections; the observations stay in the JSON
+def write_html_summary(html_path, title, sections):
+    summary = sections['summary']
+    parts = [f"<!DOCTYPE html><html><head><meta charset='utf-8'><title>{html.escape(title)}</title>",
+             "<style>body{font-family:sans-serif;margin:2em}table{border-collapse:collapse;margin:1em 0}"
+             "td,th{border:1px solid #ccc;padding:4px 8px}img{max-width:45%;margin:4px}</style></head><body>",
+             f"<h1>{html.escape(title)}</h1>",
+             f"<p>{summary['count']} observations, {html.escape(str(summary['first']))} to {html.escape(str(summary['last']))}</p>"]
+    latest = summary.get('latest')
+    if latest:
+        parts.append("<h2>Latest conditions</h2>")
+        parts.append(_table(['Field', 'Value'], [(k, latest.get(k)) for k in OBSERVATION_FIELDS if k in latest] +
+                            [('zone', f"{latest['zone'].upper()}: {summary['latest_zone_label']}"),
+                             ('spiral end-point', latest['spiral_end'])]))
+    parts.append("<h2>Zones</h2>")
+    parts.append(_table(['Zone', 'Label', 'Observations'],
+                        [(z.upper(), weather.base_tags.get(z, {}).get('label', ''), n)
+                         for z, n in sorted(summary['zones'].items())]))
+    bite = sections.get('bite_patterns')
+    if bite:
+        parts.append("<h2>Bite patterns</h2>")
+        if bite['status'] == 'ok':
+            parts.append(_table(['Pattern', 'Matches', 'Windows', 'Probability'],
+                                [(p['pattern'], p['matches'], p['windows'], f"{p['probability']:.3f}")
+                                 for p in bite['patterns']]))
+            if bite['score'] is not None:
+                parts.append(f"<p>Fishing score: {bite['score']:.2f} / 100 ({html.escape(bite['score_backend'])})</p>")
+        else:
+            parts.append(f"<p>No trajectory analysis ({html.escape(bite['status'])}).</p>")
+    charts = sections.get('charts')
+    if charts:
+        parts.append("<h2>Charts</h2>")
+        for files in charts.values():
+            parts.extend(f"<img src='{html.escape(f)}' alt='{html.escape(f)}'>" for f in files)
+    parts.append("</body></html>")
+    with open(html_path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(parts))
+    return html_path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate JSON/HTML reports for run folders.")
+    parser.add_argument("run_folder", nargs="?", help="one run folder (default: every run under --plots-dir)")
+    parser.add_argument("--plots-dir", default=os.path.join('AI', 'targetFile', 'plots'))
+    parser.add_argument("--history", metavar="PATH", help="write one report over the whole history to PATH")
+    parser.add_argument("--dll", default=None)
+    parser.add_argument("--no-html", action="store_true")
+    parser.add_argument("--force", action="store_true")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(name)s: %(message)s")
+
+    if args.history:
+        print(generate_history_report(args.plots_dir, args.history, write_html=not args.no_html))
+    elif args.run_folder:
+        print(generate_run_report(args.run_folder, args.dll, write_html=not args.no_html))
+    else:
+        if not os.path.isdir(args.plots_dir):
+            sys.exit(f"No plots directory at {args.plots_dir}")
+        generate_all_reports(args.plots_dir, args.dll, not args.no_html, args.force, args.workers)
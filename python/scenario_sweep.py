@@ -0,0 +1,151 @@
+import os
+import time
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from python import weather
+from python import my_math
+from python import fish_rules
+from python import profiling
+from python import station_catalog
+
+
+SCENARIO_COLUMNS = ["temperature (F)", "humidity (%)", "barometric_pressure (hPa)", "wind_speed (m/s)"]
+
+# Same final step as chart_run: t = (t_steps - 1) / 10
+SPIRAL_T_STEPS = 100
+
+
+def _as_frame(items, name):
+    frame = items if isinstance(items, pd.DataFrame) else pd.DataFrame(list(items))
+    if frame.empty:
+        raise ValueError(f"No {name} given for the sweep.")
+    return frame.reset_index(drop=True)
+
+def _fill_names(frame, column, prefix):
+    default = pd.Series([f"{prefix}{i}" for i in range(len(frame))])
+    frame[column] = frame[column].fillna(default) if column in frame.columns else default
+
+# Every location paired with every scenario (or every ensemble member)
+def build_grid(locations, scenarios):
+    locations = _as_frame(locations, "locations")
+    scenarios = _as_frame(scenarios, "scenarios")
+    missing = [col for col in SCENARIO_COLUMNS if col not in scenarios.columns]
+    if missing:
+        raise ValueError(f"Scenarios are missing columns: {missing}")
+    _fill_names(locations, "location", "loc")
+    _fill_names(scenarios, "scenario", "s")
+    if "station_elevation (ft)" not in locations.columns:
+        locations["station_elevation (ft)"] = np.nan
+    return locations.merge(scenarios, how="cross")
+
+# Zones, spiral end-points and advice for one batch of grid rows
+def evaluate_batch(grid):
+    grid = grid.copy()
+    temp = grid["temperature (F)"].to_numpy(dtype=np.float64)
+    humidity = grid["humidity (%)"].to_numpy(dtype=np.float64)
+    pressure = grid["barometric_pressure (hPa)"].to_numpy(dtype=np.float64)
+    wind = grid["wind_speed (m/s)"].to_numpy(dtype=np.float64)
+    elevation = grid["station_elevation (ft)"].to_numpy(dtype=np.float64)
+
+    zones = weather.classify_conditions_array(temp, humidity, pressure, wind)
+    spiral_x, spiral_y = my_math.spiral_positions(
+        temp, humidity, pressure, weather.zone_points(zones), wind,
+        t=(SPIRAL_T_STEPS - 1) / 10.0
+    )
+
+    # Species choice follows retrieve_observations
+    lat = grid["lat"].to_numpy(dtype=np.float64) if "lat" in grid.columns else None
+    species = station_catalog.species_for_array(elevation, lat)
+    water_temp = my_math.estimate_water_temp_array(temp, wind, elevation)
+
+
+    grid["zone"] = zones
+    grid["zone_label"] = [weather.base_tags[z]["label"] for z in zones]
+    grid["spiral_x"] = spiral_x
+    grid["spiral_y"] = spiral_y
+    grid["species_target"] = species
+    grid["estimated_water_temp (F)"] = water_temp
+    grid["fishing_note"] = fish_rules.get_default_rules().lookup_array(water_temp, species)
+    return grid
+
+# Run the full sweep, spreading batches across cores when there is enough work
+@profiling.traced("analysis.run_sweep")
+def run_sweep(locations, scenarios, batch_size=50_000, max_workers=None):
+    start = time.perf_counter()
+    grid = build_grid(locations, scenarios)
+    batches = [grid.iloc[i:i + batch_size] for i in range(0, len(grid), batch_size)]
+
+    if len(batches) > 1 and max_workers != 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(evaluate_batch, batches))
+    else:
+        results = [evaluate_batch(batch) for batch in batches]
+
+    table = pd.concat(results, ignore_index=True)
+    elapsed = time.perf_counter() - start
+    stats = {
+        "scenarios": len(table),
+        "seconds": elapsed,
+        "scenarios_per_s": len(table) / elapsed if elapsed > 0 else float("inf"),
+    }
+    print(f"[INFO] Swept {stats['scenarios']} scenarios in {elapsed:.3f}s ({stats['scenarios_per_s']:.0f} scenarios/s)")
+    return table, stats
+
+def save_sweep(table, output_dir, filename="scenario_sweep.csv"):
+    os.makedirs(output_dir, exist_ok=True)
+    csv_path = os.path.join(output_dir, filename)
+    table.to_csv(csv_path, index=False, encoding="utf-8-sig")
+    print(f"[INFO] Sweep table saved to: {csv_path}")
+    return csv_path
+
+# Small-multiples chart: one condition map per location (rows) x scenario (columns)
+@profiling.traced("render.chart_sweep")
+def chart_sweep(table, output_dir, max_locations=6, max_scenarios=6, filename="scenario_sweep.png"):
+    from matplotlib.figure import Figure
+
+    locations = list(dict.fromkeys(table["location"]))[:max_locations]
+    scenarios = list(dict.fromkeys(table["scenario"]))[:max_scenarios]
+    subset = table[table["location"].isin(locations) & table["scenario"].isin(scenarios)]
+
+    fig = Figure(figsize=(2.5 * len(scenarios), 2.5 * len(locations)))
+    axes = fig.subplots(len(locations), len(scenarios), squeeze=False, sharex=True, sharey=True)
+
+    t = np.arange(SPIRAL_T_STEPS)[None, :] / 10.0
+    trail_x, trail_y = my_math.spiral_positions(
+        subset["temperature (F)"], subset["humidity (%)"], subset["barometric_pressure (hPa)"],
+        weather.zone_points(subset["zone"].to_numpy()), subset["wind_speed (m/s)"], t=t
+    )
+    base_points = np.array([info["point"] for info in weather.base_tags.values()])
+
+    for i, (_, row) in enumerate(subset.iterrows()):
+        ax = axes[locations.index(row["location"])][scenarios.index(row["scenario"])]
+        ax.scatter(base_points[:, 0], base_points[:, 1], s=15, color="gray")
+        ax.plot(trail_x[i], trail_y[i], color="blue", linewidth=1)
+        ax.scatter(row["spiral_x"], row["spiral_y"], color="red", edgecolor="black", s=40)
+        ax.axhline(0, color="black", linewidth=0.5)
+        ax.axvline(0, color="black", linewidth=0.5)
+        ax.set_title(f"{row['location']} / {row['scenario']}: {row['zone'].upper()}", fontsize=8)
+
+    fig.tight_layout()
+    os.makedirs(output_dir, exist_ok=True)
+    png_path = os.path.join(output_dir, filename)
+    fig.savefig(png_path)
+    print(f"[INFO] Sweep chart saved to: {png_path}")
+    return png_path
+
+
+if __name__ == "__main__":
+    # Synthetic sweep to report throughput
+    rng = np.random.default_rng(0)
+    locations = [
+        {"location": f"lake{i}", "station_elevation (ft)": float(e)}
+        for i, e in enumerate(rng.uniform(500, 8000, 100))
+    ]
+    scenarios = pd.DataFrame({
+        "temperature (F)": rng.uniform(30, 95, 5000),
+        "humidity (%)": rng.uniform(10, 100, 5000),
+        "barometric_pressure (hPa)": rng.uniform(995, 1030, 5000),
+        "wind_speed (m/s)": rng.uniform(0, 25, 5000),
+    })
+    run_sweep(locations, scenarios)
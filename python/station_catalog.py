@@ -0,0 +1,327 @@
+import os
+import sys
+import math
+import json
+import time
+import heapq
+import logging
+import argparse
+
+import numpy as np
+import requests
+
+from python import http_client
+
+logger = logging.getLogger(__name__)
+
+HEADERS = {"User-Agent": "weather-data-retrieval-script (joshua.kujawa16@outlook.com)"}
+CATALOG_PATH = os.path.join('AI', 'targetFile', 'cache', 'stations', 'catalog.json')
+EARTH_RADIUS_KM = 6371.0088
+LEAF_SIZE = 16
+REFRESH_MAX_AGE_DAYS = 7
+PAGE_LIMIT = 500
+# Beyond this the catalog's nearest station is not trusted and /points is asked instead
+MAX_STATION_DISTANCE_KM = 75
+
+US_STATES = (
+    "AL", "AK", "AZ", "AR", "CA", "CO", "CT", "DE", "DC", "FL", "GA", "HI", "ID", "IL", "IN", "IA", "KS",
+    "KY", "LA", "ME", "MD", "MA", "MI", "MN", "MS", "MO", "MT", "NE", "NV", "NH", "NJ", "NM", "NY", "NC",
+    "ND", "OH", "OK", "OR", "PA", "RI", "SC", "SD", "TN", "TX", "UT", "VT", "VA", "WA", "WV", "WI", "WY",
+    "PR", "GU", "VI", "AS", "MP",
+)
+
+COLDWATER = "Coldwater (e.g., trout)"
+COOLWATER = "Coolwater (e.g., walleye)"
+WARMWATER = "Warmwater (e.g., bass)"
+
+
+# ---- Species by elevation and latitude ----
+
+# Elevation where water stays cold enough for trout: about 4000 ft at 40°N, falling roughly
+# 330 ft per degree toward the pole and rising toward the tropics
+def coldwater_threshold_ft(lat):
+    return min(max(4000.0 - 330.0 * ((lat if lat is not None else 40.0) - 40.0), 0.0), 9000.0)
+
+# Replaces the fixed 4000 ft cut; a 1500 ft band under the threshold is coolwater
+def species_for(elevation_ft, lat=None):
+    if elevation_ft is None:
+        return WARMWATER
+    threshold = coldwater_threshold_ft(lat)
+    if elevation_ft >= threshold:
+        return COLDWATER
+    if elevation_ft >= threshold - 1500.0:
+        return COOLWATER
+    return WARMWATER
+
+# species_for over arrays; missing latitudes count as 40°N, missing elevations as warmwater
+def species_for_array(elevation_ft, lat=None):
+    elevation = np.asarray(elevation_ft, dtype=np.float64)
+    lat = np.full(elevation.shape, 40.0) if lat is None else np.nan_to_num(np.asarray(lat, dtype=np.float64), nan=40.0)
+    threshold = np.clip(4000.0 - 330.0 * (lat - 40.0), 0.0, 9000.0)
+    with np.errstate(invalid='ignore'):
+        return np.select([elevation >= threshold, elevation >= threshold - 1500.0],
+                         [COLDWATER, COOLWATER], default=WARMWATER)
+
+
+# ---- KD-tree over unit vectors ----
+
+def _unit_vectors(lat, lon):
+    lat, lon = np.radians(np.asarray(lat, dtype=np.float64)), np.radians(np.asarray(lon, dtype=np.float64))
+    return np.stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)], axis=-1)
+
+def _unit_vector(lat, lon):
+    lat, lon = math.radians(lat), math.radians(lon)
+    return (math.cos(lat) * math.cos(lon), math.cos(lat) * math.sin(lon), math.sin(lat))
+
+def chord_to_km(chord):
+    return 2.0 * EARTH_RADIUS_KM * math.asin(min(chord / 2.0, 1.0))
+
+def distance_km(lat1, lon1, lat2, lon2):
+    return chord_to_km(math.dist(_unit_vector(lat1, lon1), _unit_vector(lat2, lon2)))
+
+# Static implicit KD-tree: points are reordered so every range's middle element is its split
+# point. Chord distance between unit vectors orders points exactly like great-circle distance.
+class KDTree:
+
+    def __init__(self, points):
+        points = np.asarray(points, dtype=np.float64)
+        self.size = len(points)
+        order = np.arange(self.size)
+        axes = np.zeros(self.size, dtype=np.int8)
+        stack = [(0, self.size)]
+        while stack:
+            lo, hi = stack.pop()
+            if hi - lo <= LEAF_SIZE:
+                continue
+            block = points[order[lo:hi]]
+            axis = int(np.argmax(block.max(axis=0) - block.min(axis=0)))
+            mid = (lo + hi) // 2
+            order[lo:hi] = order[lo:hi][np.argpartition(block[:, axis], mid - lo)]
+            axes[mid] = axis
+            stack.append((lo, mid))
+            stack.append((mid + 1, hi))
+        self.order = order
+        # Plain Python floats: per-point access in the query loop is much faster than numpy scalars
+        self._coords = points[order].tolist()
+        self._axes = axes.tolist()
+
+    # k nearest as [(chord, original_index)], closest first
+    def query(self, point, k=1):
+        qx, qy, qz = point
+        heap = []
+        coords, axes = self._coords, self._axes
+
+        def visit(i):
+            px, py, pz = coords[i]
+            d = (px - qx) ** 2 + (py - qy) ** 2 + (pz - qz) ** 2
+            if len(heap) < k:
+                heapq.heappush(heap, (-d, i))
+            elif d < -heap[0][0]:
+                heapq.heapreplace(heap, (-d, i))
+
+        stack = [(0, self.size)]
+        while stack:
+            lo, hi = stack.pop()
+            if hi - lo <= LEAF_SIZE:
+                for i in range(lo, hi):
+                    visit(i)
+                continue
+            mid = (lo + hi) // 2
+            visit(mid)
+            axis = axes[mid]
+            diff = point[axis] - coords[mid][axis]
+            near, far = ((lo, mid), (mid + 1, hi)) if diff < 0 else ((mid + 1, hi), (lo, mid))
+            # Far side only if the splitting plane is closer than the current k-th best
+            if len(heap) < k or diff * diff < -heap[0][0]:
+                stack.append(far)
+            stack.append(near)
+        return [(math.sqrt(-d), int(self.order[i])) for d, i in sorted(heap, reverse=True)]
+
+
+# ---- Catalog ----
+
+def _station_from_feature(feature, state=None):
+    props = feature.get('properties', {})
+    coords = (feature.get('geometry') or {}).get('coordinates') or [None, None]
+    station_id = props.get('stationIdentifier')
+    if not station_id or coords[1] is None:
+        return None
+    elevation_m = (props.get('elevation') or {}).get('value')
+    return {
+        'id': station_id,
+        'name': props.get('name'),
+        'lat': float(coords[1]),
+        'lon': float(coords[0]),
+        'elevation_ft': elevation_m * 3.28084 if elevation_m is not None else None,
+        'time_zone': props.get('timeZone'),
+        'state': state,
+    }
+
+class StationCatalog:
+
+    def __init__(self, stations=None, states=None):
+        self.stations = stations or {}
+        self.states = states or {}
+        self._ids = None
+        self._tree = None
+
+    def __len__(self):
+        return len(self.stations)
+
+    def _index(self):
+        if self._tree is None and self.stations:
+            self._ids = list(self.stations)
+            self._tree = KDTree(_unit_vectors([self.stations[i]['lat'] for i in self._ids],
+                                              [self.stations[i]['lon'] for i in self._ids]))
+        return self._tree
+
+    def add_features(self, features, state=None):
+        added = 0
+        for feature in features:
+            station = _station_from_feature(feature, state)
+            if station:
+                # Keep the state a full refresh assigned when a nearby lookup reports the same station
+                station['state'] = station['state'] or self.stations.get(station['id'], {}).get('state')
+                self.stations[station['id']] = station
+                added += 1
+        self._tree = None
+        return added
+
+    # Nearest k stations as dicts with an added distance_km, closest first
+    def nearest(self, lat, lon, k=1):
+        tree = self._index()
+        if tree is None:
+            return []
+        point = _unit_vector(lat, lon)
+        return [dict(self.stations[self._ids[i]], distance_km=chord_to_km(chord))
+                for chord, i in tree.query(point, k)]
+
+    def get(self, station_id):
+        return self.stations.get(station_id)
+
+    def time_zone(self, station_id):
+        return (self.stations.get(station_id) or {}).get('time_zone')
+
+    def species(self, station_id):
+        station = self.stations.get(station_id)
+        return species_for(station['elevation_ft'], station['lat']) if station else None
+
+    def save(self, path=CATALOG_PATH):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'stations': self.stations, 'states': self.states}, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=CATALOG_PATH):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls()
+        return cls(data.get('stations'), data.get('states'))
+
+
+_catalog = None
+_catalog_mtime = None
+
+# Shared catalog, reloaded when the file on disk changes (e.g. after a refresh job)
+def get_catalog(path=CATALOG_PATH):
+    global _catalog, _catalog_mtime
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        mtime = None
+    if _catalog is None or mtime != _catalog_mtime:
+        _catalog = StationCatalog.load(path)
+        _catalog_mtime = mtime
+    return _catalog
+
+# Merge stations seen in a live response (e.g. a /points station list) into the cached catalog
+def remember(features, path=CATALOG_PATH):
+    catalog = get_catalog(path)
+    if catalog.add_features(features):
+        catalog.save(path)
+        global _catalog_mtime
+        _catalog_mtime = os.path.getmtime(path)
+    return catalog
+
+
+# ---- Refresh job ----
+
+def _fetch_state(api, state, etag=None):
+    url = f"{api}/stations?state={state}&limit={PAGE_LIMIT}"
+    headers = dict(HEADERS)
+    if etag:
+        headers['If-None-Match'] = etag
+    response = http_client.request(url, headers)
+    if response.status_code == 304:
+        return None, etag
+    first_etag = response.headers.get('ETag')
+    features = []
+    body = response.json()
+    while True:
+        page = body.get('features', [])
+        features.extend(page)
+        next_url = (body.get('pagination') or {}).get('next')
+        if not page or not next_url:
+            break
+        body = http_client.request(next_url, dict(HEADERS)).json()
+    return features, first_etag
+
+# Re-download only states older than max_age_days; unchanged states answer 304 and cost one request
+def refresh_catalog(states=US_STATES, max_age_days=REFRESH_MAX_AGE_DAYS, path=CATALOG_PATH, api=None, force=False):
+    from python import station_observation
+    api = api or station_observation.NOAA_API
+    catalog = StationCatalog.load(path)
+    now = time.time()
+    summary = {'refreshed': [], 'unchanged': [], 'skipped': [], 'failed': []}
+    for state in states:
+        entry = catalog.states.get(state, {})
+        if not force and now - entry.get('fetched_at', 0) < max_age_days * 86400:
+            summary['skipped'].append(state)
+            continue
+        try:
+            features, etag = _fetch_state(api, state, entry.get('etag'))
+        except (http_client.UpstreamUnavailable, requests.RequestException) as e:
+            logger.warning(f"Station refresh for {state} failed: {e}")
+            summary['failed'].append(state)
+            continue
+        if features is None:
+            summary['unchanged'].append(state)
+        else:
+            # Drop the state's old entries so retired stations disappear
+            for station_id in [i for i, s in catalog.stations.items() if s.get('state') == state]:
+                del catalog.stations[station_id]
+            catalog.add_features(features, state)
+            summary['refreshed'].append(state)
+        catalog.states[state] = {'etag': etag, 'fetched_at': now}
+        # Save per state so an interrupted run keeps what it already fetched
+        catalog.save(path)
+    logger.info(f"Station catalog: {len(catalog)} stations; refreshed {len(summary['refreshed'])}, "
+                f"unchanged {len(summary['unchanged'])}, skipped {len(summary['skipped'])}, failed {len(summary['failed'])}")
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or refresh the local NOAA station catalog.")
+    parser.add_argument("--states", default=",".join(US_STATES))
+    parser.add_argument("--max-age-days", type=float, default=REFRESH_MAX_AGE_DAYS)
+    parser.add_argument("--force", action="store_true")
+    parser.add_argument("--nearest", nargs=2, type=float, metavar=("LAT", "LON"), help="query instead of refreshing")
+    parser.add_argument("-k", type=int, default=5)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(name)s: %(message)s")
+
+    if args.nearest:
+        catalog = get_catalog()
+        start = time.perf_counter()
+        found = catalog.nearest(*args.nearest, k=args.k)
+        elapsed = time.perf_counter() - start
+        for s in found:
+            print(f"{s['id']:6} {s['distance_km']:8.1f} km  {s['elevation_ft'] or 0:7.0f} ft  "
+                  f"{species_for(s['elevation_ft'], s['lat']):26} {s['time_zone']}  {s['name']}")
+        print(f"{len(catalog)} stations, query {elapsed * 1e6:.0f} µs")
+        sys.exit(0)
+    refresh_catalog(args.states.split(","), args.max_age_days, force=args.force)
@@ -1,9 +1,15 @@
+import os
+import time
 import requests
-import geocoder
-import pytz
-from datetime import datetime
+import tzlocal
 from python import my_math
+from python import water_temp
+from python import profiling
+from python import http_client
+from python import station_catalog
 import math
+import numpy as np
+import pandas as pd
 from python import fish_behavior as fb
 from python import file_handler
 from python import my_math
@@ -11,54 +17,147 @@ from python import my_math
 
 # Set a proper User-Agent for NOAA API requests
 HEADERS = {"User-Agent": "weather-data-retrieval-script (joshua.kujawa16@outlook.com)"}
+# Point at a local stub (python/fault_server.py) to exercise failures offline
+NOAA_API = os.environ.get("MAD_ANGLER_NOAA_API", "https://api.weather.gov").rstrip("/")
+# IP geolocation (the service geocoder.ip('me') used); "loc" holds "lat,lon"
+GEOLOCATION_URL = os.environ.get("MAD_ANGLER_GEOLOCATION_URL", "https://ipinfo.io/json")
+# Location must not stall the GUI: short timeouts, one retry, then the last known location
+GEOLOCATION_TIMEOUT = (3.05, 5.0)
+GEOLOCATION_DEADLINE = 10.0
 
+@profiling.traced("fetch.get_location")
 def get_location():
-    g = geocoder.ip('me')
-    if g.ok and g.latlng:
-        lat, lon = g.latlng
-        print(f"Detected location: Latitude {lat}, Longitude {lon}")
-        return lat, lon
-    else:
-        print("Failed to get location.")
+    try:
+        body = http_client.get_json(GEOLOCATION_URL, HEADERS, timeout=GEOLOCATION_TIMEOUT,
+                                    retries=1, deadline=GEOLOCATION_DEADLINE)
+        lat, lon = (float(v) for v in body['loc'].split(','))
+    except (http_client.UpstreamUnavailable, requests.RequestException, KeyError, ValueError, AttributeError) as e:
+        print(f"Failed to get location: {e}")
         raise Exception("Could not determine device location.")
+    stale = " (last known)" if http_client.served_stale() else ""
+    print(f"Detected location: Latitude {lat}, Longitude {lon}{stale}")
+    return lat, lon
 
-def get_station(lat, lon):
-    points_url = f"https://api.weather.gov/points/{lat},{lon}"
+# /points document: observation stations plus forecast and forecastGridData URLs
+@profiling.traced("fetch.get_points")
+def get_points(lat, lon):
+    points_url = f"{NOAA_API}/points/{lat},{lon}"
     print(f"Requesting gridpoint data from: {points_url}")
-    response = requests.get(points_url, headers=HEADERS)
-    response.raise_for_status()
-    points_data = response.json()
-    stations_url = points_data['properties']['observationStations']
+    return http_client.get_json(points_url, HEADERS)['properties']
+
+# Nearest station from the local catalog when one is close enough; otherwise the /points
+# station list, whose stations are remembered so the next lookup stays offline
+@profiling.traced("fetch.get_station")
+def get_station(lat, lon, points=None):
+    if points is None:
+        nearest = station_catalog.get_catalog().nearest(lat, lon, k=1)
+        if nearest and nearest[0]['distance_km'] <= station_catalog.MAX_STATION_DISTANCE_KM:
+            station = nearest[0]
+            print(f"Using observation station: {station['id']} ({station['distance_km']:.1f} km, cached)")
+            profiling.current().record(source="catalog")
+            return station['id']
+    points = points or get_points(lat, lon)
+    stations_url = points['observationStations']
     print(f"Requesting stations data from: {stations_url}")
-    station_resp = requests.get(stations_url, headers=HEADERS)
-    station_resp.raise_for_status()
-    stations_data = station_resp.json()
+    stations_data = http_client.get_json(stations_url, HEADERS)
     if stations_data['features']:
-        station_id = stations_data['features'][0]['properties']['stationIdentifier']
+        # NOAA's list order is not distance order; pick the closest one ourselves
+        catalog = station_catalog.remember(stations_data['features'])
+        ids = [f['properties'].get('stationIdentifier') for f in stations_data['features']]
+        known = [catalog.get(i) for i in ids if catalog.get(i)]
+        station_id = min(known, key=lambda s: station_catalog.distance_km(lat, lon, s['lat'], s['lon']))['id'] \
+            if known else ids[0]
         print(f"Using observation station: {station_id}")
+        profiling.current().record(source="network")
         return station_id
     else:
         print("No observation stations found.")
         raise Exception("No observation stations found for the location.")
 
+# Station id -> IANA zone, resolved once per process
+_time_zones = {}
+
+# The station's own time zone: catalog first, then /stations/<id>, then this machine's zone
+def station_time_zone(station_id):
+    if station_id in _time_zones:
+        return _time_zones[station_id]
+    time_zone = station_catalog.get_catalog().time_zone(station_id)
+    if not time_zone:
+        try:
+            feature = http_client.get_json(f"{NOAA_API}/stations/{station_id}", HEADERS)
+            station_catalog.remember([feature])
+            time_zone = feature.get('properties', {}).get('timeZone')
+        except Exception as e:
+            print(f"[WARN] Could not resolve time zone for {station_id}: {e}")
+    _time_zones[station_id] = time_zone or tzlocal.get_localzone_name()
+    return _time_zones[station_id]
+
+# ISO-8601 strings -> UTC epoch seconds in one pass; unparseable entries become NaN
+def parse_timestamps(values):
+    stamps = pd.to_datetime(pd.Series(values, dtype=object), utc=True, format='ISO8601', errors='coerce')
+    epochs = (stamps - pd.Timestamp(0, tz='UTC')) / pd.Timedelta(seconds=1)
+    return epochs.to_numpy(dtype=np.float64)
+
+# Display columns for UTC epochs in a station's zone: date, HH:MM and fractional hour
+def local_date_time(epochs, time_zone):
+    local = pd.Series(pd.to_datetime(np.asarray(epochs, dtype=np.float64), unit='s', utc=True)).dt.tz_convert(time_zone)
+    return (local.dt.strftime('%Y-%m-%d').tolist(), local.dt.strftime('%H:%M').tolist(),
+            (local.dt.hour + local.dt.minute / 60.0).to_numpy())
+
+# UTC epochs for stored rows: epoch_utc where the row has one, else its date/time label read in
+# the station's zone (rows saved before epoch_utc was stored). Unparseable rows are NaN.
+def row_epochs(frame):
+    if 'epoch_utc' in frame:
+        epochs = pd.to_numeric(frame['epoch_utc'], errors='coerce').to_numpy(dtype=np.float64, copy=True)
+    else:
+        epochs = np.full(len(frame), np.nan)
+    missing = np.flatnonzero(np.isnan(epochs))
+    if len(missing) == 0 or 'date' not in frame or 'time' not in frame:
+        return epochs
+
+    legacy = frame.iloc[missing]
+    labels = pd.to_datetime(legacy['date'].astype(str) + ' ' + legacy['time'].astype(str),
+                            format='%Y-%m-%d %H:%M', errors='coerce')
+    stations = (legacy['station_name'].fillna('').astype(str).to_numpy() if 'station_name' in legacy
+                else np.full(len(legacy), ''))
+    for station in pd.unique(stations):
+        rows = stations == station
+        time_zone = station_time_zone(station) if station else tzlocal.get_localzone_name()
+        # The repeated hour of a DST fall-back is read as standard time
+        local = labels[rows].dt.tz_localize(time_zone, ambiguous=np.zeros(rows.sum(), dtype=bool),
+                                            nonexistent='shift_forward')
+        epochs[missing[rows]] = ((local - pd.Timestamp(0, tz='UTC')) / pd.Timedelta(seconds=1)).to_numpy(dtype=np.float64)
+    return epochs
+
+# plots/<YYYY-MM-DD>/<HH-MM> names for an epoch (default now), on the same clock and zone
+# local_date_time labels the run's rows with
+def run_folder_name(time_zone, epoch=None):
+    dates, times, _ = local_date_time([time.time() if epoch is None else epoch], time_zone)
+    return dates[0], times[0].replace(':', '-')
+
+# Station and zone for this session's run folder; this machine's zone if the lookup fails
+def session_station():
+    try:
+        lat, lon = get_location()
+        station_id = get_station(lat, lon)
+    except Exception as e:
+        print(f"[WARN] Could not resolve the observation station: {e}")
+        return None, tzlocal.get_localzone_name()
+    return station_id, station_time_zone(station_id)
+
+@profiling.traced("fetch.retrieve_observations")
 def retrieve_observations(station_id, max_results=50):
-    obs_url = f"https://api.weather.gov/stations/{station_id}/observations"
-    response = requests.get(obs_url, headers=HEADERS)
-    response.raise_for_status()
-    obs_data = response.json()
+    obs_url = f"{NOAA_API}/stations/{station_id}/observations"
+    obs_data = http_client.get_json(obs_url, HEADERS)
+    profiling.current().record(station=station_id)
     observations = obs_data.get('features', [])[:max_results]
+    all_epochs = parse_timestamps([f['properties'].get('timestamp') for f in observations])
     data_list = []
-    for feature in observations:
-        props = feature['properties']
-        timestamp = props.get('timestamp')
-        if not timestamp:
+    epochs = []
+    for feature, epoch in zip(observations, all_epochs):
+        if np.isnan(epoch):
             continue
-        dt_utc = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
-        if dt_utc.tzinfo is None:
-            dt_utc = pytz.utc.localize(dt_utc)
-        dt = dt_utc.astimezone(pytz.timezone('America/Boise'))
-        date_str = dt.date().isoformat()
-        time_str = dt.time().strftime('%H:%M')
+        props = feature['properties']
         temp_temp = props.get('temperature', {}).get('value')
         temp = (temp_temp * 9/5 + 32) if temp_temp is not None else None
         pressure = props.get('barometricPressure', {}).get('value')
@@ -90,7 +189,10 @@ def retrieve_observations(station_id, max_results=50):
         elevation_ft = elevation_m * 3.28084 if elevation_m is not None else None
         station_url = props.get('station')
         station_name = station_url.split('/')[-1] if station_url else None
-        species = "Coldwater (e.g., trout)" if elevation_ft and elevation_ft >= 4000 else "Warmwater (e.g., bass)"
+        # Station latitude shifts the elevation where coldwater species hold
+        coords = (feature.get('geometry') or {}).get('coordinates') or [None, None]
+        station_lat = coords[1] if coords[1] is not None else (station_catalog.get_catalog().get(station_id) or {}).get('lat')
+        species = station_catalog.species_for(elevation_ft, station_lat)
         est_water_temp = my_math.estimate_water_temp(temp if temp else 60, wind_speed if wind_speed else 0, elevation_ft if elevation_ft else 0)
         fish_note = fb.get_fishing_behavior_advice(est_water_temp, species)
         pressure_trend = "N/A"
@@ -99,8 +201,8 @@ def retrieve_observations(station_id, max_results=50):
             if last_pressure and pressure_hpa:
                 pressure_trend = "Rising" if pressure_hpa > last_pressure else "Falling"
         data_list.append({
-            "date": date_str,
-            "time": time_str,
+            "date": None,
+            "time": None,
             "temperature (F)": temp,
             "humidity (%)": rh,
             "barometric_pressure (hPa)": pressure_hpa,
@@ -119,16 +221,41 @@ def retrieve_observations(station_id, max_results=50):
             "species_target": species,
             "estimated_water_temp (F)": est_water_temp,
             "fishing_note": fish_note,
-            "pressure_trend": pressure_trend
+            "pressure_trend": pressure_trend,
+            "epoch_utc": int(epoch),
         })
+        epochs.append(epoch)
+
+    if data_list:
+        # epoch_utc is the stored time and the row key; date/time are cached display labels of it
+        # in the station's own zone, the zone the run folder is named in
+        dates, times, hours = local_date_time(epochs, station_time_zone(station_id))
+        for row, date_str, time_str in zip(data_list, dates, times):
+            row["date"], row["time"] = date_str, time_str
+
+        # Replace the stateless estimate with the lagged per-station model
+        frame = pd.DataFrame(data_list).assign(epoch=epochs, hour=hours)
+        state = water_temp.load_state()
+        estimates = water_temp.estimate_for_station(state, station_id, frame)
+        water_temp.save_state(state)
+        for row, est in zip(data_list, estimates):
+            row["estimated_water_temp (F)"] = float(est)
+            row["fishing_note"] = fb.get_fishing_behavior_advice(est, row["species_target"])
+    profiling.current().record(rows=len(data_list))
     return data_list
 
 
 
-def gather_data(dll_path, plots_dir, csv_filename, output_dir):
-    lat, lon = get_location()
-    station_id = get_station(lat, lon)
-    data_list = retrieve_observations(station_id)
+def gather_data(dll_path, plots_dir, csv_filename, output_dir, station_id=None):
+    # A NOAA outage with nothing cached must not take the GUI down with it
+    try:
+        if station_id is None:
+            lat, lon = get_location()
+            station_id = get_station(lat, lon)
+        data_list = retrieve_observations(station_id)
+    except Exception as e:
+        print(f"[ERROR] Could not retrieve observations: {e}")
+        return
     if not data_list:
         print("No observation data retrieved.")
         return
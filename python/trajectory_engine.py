@@ -0,0 +1,150 @@
+import os
+import sys
+import time
+import argparse
+import logging
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from python import weather
+from python import profiling
+from python import file_handler
+from python import station_observation
+
+logger = logging.getLogger(__name__)
+
+# Points generated between two consecutive observations
+SUBSTEPS = 20
+# Observation segments expanded per chunk; bounds memory at CHUNK_SEGMENTS * SUBSTEPS records
+CHUNK_SEGMENTS = 8192
+
+INPUT_COLUMNS = {
+    'temperature (F)': 'temp',
+    'humidity (%)': 'humidity',
+    'barometric_pressure (hPa)': 'pressure',
+    'wind_speed (m/s)': 'wind',
+}
+
+
+# Observation rows (CSV dicts or a DataFrame) -> per-station float arrays in time order
+def station_series(rows):
+    frame = rows if isinstance(rows, pd.DataFrame) else pd.DataFrame(rows)
+    if frame.empty:
+        return {}
+    values = pd.DataFrame({name: pd.to_numeric(frame[col], errors='coerce') for col, name in INPUT_COLUMNS.items()})
+    # UTC seconds for every row, so rows from before and after epoch_utc line up
+    values['epoch'] = station_observation.row_epochs(frame)
+    values['station'] = frame['station_name'].replace('', np.nan).fillna('unknown').astype(str) \
+        if 'station_name' in frame else 'unknown'
+    values = values[values['epoch'].notna()]
+
+    series = {}
+    for station, group in values.groupby('station', sort=True):
+        group = group.sort_values('epoch').drop_duplicates('epoch', keep='last')
+        # Gaps in one variable are carried over from the neighbouring readings
+        group = group.ffill().bfill().dropna(subset=list(INPUT_COLUMNS.values()))
+        if len(group) >= 2:
+            series[station] = {name: group[name].to_numpy(dtype=np.float64)
+                               for name in list(INPUT_COLUMNS.values()) + ['epoch']}
+    return series
+
+def _normalized_state(series):
+    # Same scaling as my_math.normalize_inputs: temperature, humidity, pressure
+    return np.stack([
+        np.clip((series['temp'] - 32) / 68.0, 0.0, 1.5),
+        np.clip(series['humidity'] / 100.0, 0.01, 1.0),
+        series['pressure'] / 1013.25,
+    ], axis=1)
+
+# Force-field vectors, quadrant codes and magnitudes for one station, one chunk at a time.
+# Each observation segment is split into `substeps` points. The vector is the hourly rate of
+# change of (temperature, humidity, pressure), blended from the previous segment's rate to this
+# segment's. The quadrant is the weather zone of the interpolated conditions.
+def iter_trajectory_chunks(series, substeps=SUBSTEPS, chunk_segments=CHUNK_SEGMENTS):
+    state = _normalized_state(series)
+    hours = np.maximum(np.diff(series['epoch']) / 3600.0, 1.0 / 60.0)
+    rates = np.diff(state, axis=0) / hours[:, None]
+    previous_rates = np.vstack([rates[:1], rates[:-1]])
+    raw = np.stack([series['temp'], series['humidity'], series['pressure'], series['wind']], axis=1)
+    frac = (np.arange(substeps, dtype=np.float64) / substeps)[None, :, None]
+
+    segments = len(rates)
+    for start in range(0, segments, chunk_segments):
+        stop = min(start + chunk_segments, segments)
+        vectors = previous_rates[start:stop, None, :] * (1 - frac) + rates[start:stop, None, :] * frac
+        conditions = raw[start:stop, None, :] + (raw[start + 1:stop + 1, None, :] - raw[start:stop, None, :]) * frac
+        zones = weather.classify_conditions_array(*(conditions[..., k] for k in range(4)))
+
+        records = np.empty(vectors.shape[0] * substeps, dtype=file_handler.TRAJECTORY_DTYPE)
+        flat = vectors.reshape(-1, 3)
+        records['dx'], records['dy'], records['dz'] = flat[:, 0], flat[:, 1], flat[:, 2]
+        # Quadrants are stored as the ASCII code of the zone letter
+        records['quadrant'] = zones.reshape(-1).astype('U1').view(np.int32)
+        records['magnitude'] = np.sqrt(np.einsum('ij,ij->i', flat, flat))
+        yield records
+
+def generate_trajectory(series, bin_path, substeps=SUBSTEPS, chunk_segments=CHUNK_SEGMENTS):
+    return file_handler.stream_trajectory_bin(bin_path, iter_trajectory_chunks(series, substeps, chunk_segments))
+
+def _generate_job(args):
+    station, series, bin_path, substeps = args
+    start = time.perf_counter()
+    points = generate_trajectory(series, bin_path, substeps)
+    return station, bin_path, points, time.perf_counter() - start
+
+# One trajectory_data.bin per station. A single station writes straight into output_dir (where
+# the bite analysis looks); several stations get output_dir/<station>/ each, one process apiece.
+@profiling.traced("analysis.generate_trajectories")
+def generate_trajectories(rows, output_dir, substeps=SUBSTEPS, max_workers=None):
+    series = station_series(rows)
+    if not series:
+        logger.warning("Not enough observations to build a trajectory")
+        return []
+    if len(series) == 1:
+        station, values = next(iter(series.items()))
+        jobs = [(station, values, os.path.join(output_dir, 'trajectory_data.bin'), substeps)]
+    else:
+        jobs = [(station, values, os.path.join(output_dir, station, 'trajectory_data.bin'), substeps)
+                for station, values in series.items()]
+
+    if len(jobs) == 1 or max_workers == 1:
+        results = [_generate_job(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(_generate_job, jobs))
+
+    summary = []
+    for station, bin_path, points, elapsed in results:
+        logger.info(f"Trajectory for {station}: {points} points in {elapsed:.3f}s -> {bin_path}")
+        summary.append({'station': station, 'bin_path': bin_path, 'points': points, 'seconds': elapsed})
+    profiling.current().record(rows=sum(s['points'] for s in summary))
+    return summary
+
+def generate_for_csv(csv_path, output_dir=None, substeps=SUBSTEPS, max_workers=None):
+    frame = pd.read_csv(csv_path, encoding='utf-8-sig', dtype=str, keep_default_na=False)
+    return generate_trajectories(frame, output_dir or os.path.dirname(csv_path), substeps, max_workers)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build trajectory_data.bin from observation history.")
+    parser.add_argument("csv", nargs="?", help="weather_data.csv of one run (default: full history)")
+    parser.add_argument("--plots-dir", default=os.path.join('AI', 'targetFile', 'plots'))
+    parser.add_argument("--output-dir", help="where to write (default: next to the CSV / latest run)")
+    parser.add_argument("--substeps", type=int, default=SUBSTEPS)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(name)s: %(message)s")
+
+    if args.csv:
+        results = generate_for_csv(args.csv, args.output_dir, args.substeps, args.workers)
+    else:
+        output_dir = args.output_dir or file_handler.get_latest_weather_data_folder(args.plots_dir)
+        if not output_dir:
+            sys.exit("No run folder to write into; pass --output-dir")
+        results = generate_trajectories(file_handler.load_history_frame(args.plots_dir), output_dir,
+                                        args.substeps, args.workers)
+    for result in results:
+        rate = result['points'] / result['seconds'] if result['seconds'] else float('inf')
+        print(f"{result['station']:10} {result['points']:>12} points  {rate:,.0f} points/s  {result['bin_path']}")
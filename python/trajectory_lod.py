@@ -0,0 +1,132 @@
+import os
+import sys
+import time
+import logging
+
+import numpy as np
+
+from python import file_handler
+
+logger = logging.getLogger(__name__)
+
+# Points drawn by default; quiver stays interactive well past this, but arrows stop being readable
+DEFAULT_BUDGET = 4_000
+# Pyramid levels, coarsest first; only levels smaller than the trajectory are stored
+PYRAMID_BUDGETS = (1_000, 4_000, 16_000, 64_000)
+# Share of a budget that may go to quadrant transitions before they are thinned out
+TRANSITION_SHARE = 0.5
+
+
+def pyramid_path(bin_path):
+    return os.path.splitext(bin_path)[0] + '.lod.npz'
+
+# Path through (temperature, humidity, pressure) space: running sum of the force vectors
+def positions(records):
+    return np.cumsum(np.stack([records['dx'], records['dy'], records['dz']], axis=1, dtype=np.float64), axis=0)
+
+def _bin_extremes(magnitude, bins):
+    # Contiguous equal-width index bins; min and max magnitude of each, found in O(n)
+    n = len(magnitude)
+    width = -(-n // bins)
+    padded = np.full(bins * width, np.nan)
+    padded[:n] = magnitude
+    padded = padded.reshape(bins, width)
+    valid = ~np.isnan(padded).all(axis=1)
+    offsets = np.arange(bins) * width
+    lows = np.argmin(np.where(np.isnan(padded), np.inf, padded), axis=1) + offsets
+    highs = np.argmax(np.where(np.isnan(padded), -np.inf, padded), axis=1) + offsets
+    return np.concatenate([lows[valid], highs[valid]])
+
+# Indices of at most `budget` points, in trajectory order: first and last points, quadrant
+# transitions (evenly thinned when there are too many), and the magnitude min and max of
+# equal index bins filling the rest of the budget.
+def decimate(records, budget=DEFAULT_BUDGET):
+    n = len(records)
+    if n <= budget:
+        return np.arange(n)
+
+    quadrant = records['quadrant']
+    transitions = np.flatnonzero(quadrant[1:] != quadrant[:-1]) + 1
+    transition_cap = int(budget * TRANSITION_SHARE)
+    if len(transitions) > transition_cap:
+        transitions = transitions[np.linspace(0, len(transitions) - 1, transition_cap).astype(np.int64)]
+
+    bins = max((budget - len(transitions) - 2) // 2, 1)
+    keep = np.concatenate([[0, n - 1], transitions, _bin_extremes(records['magnitude'].astype(np.float64), bins)])
+    keep = np.unique(keep)
+    if len(keep) > budget:
+        # Bin extremes can coincide with transitions less often than planned; trim evenly
+        keep = keep[np.linspace(0, len(keep) - 1, budget).astype(np.int64)]
+    return keep
+
+def _level(records, xyz, indices):
+    return {
+        'index': indices.astype(np.int64),
+        'xyz': xyz[indices].astype(np.float32),
+        'vector': np.stack([records['dx'][indices], records['dy'][indices], records['dz'][indices]], axis=1),
+        'quadrant': records['quadrant'][indices],
+        'magnitude': records['magnitude'][indices],
+    }
+
+# Decimated copies of a trajectory at every pyramid budget, written next to the bin file
+def build_pyramid(bin_path, budgets=PYRAMID_BUDGETS):
+    start = time.perf_counter()
+    records = file_handler.read_trajectory_bin(bin_path)
+    xyz = positions(records)
+    stat = os.stat(bin_path)
+    arrays = {
+        'source_size': np.int64(stat.st_size),
+        'source_mtime_ns': np.int64(stat.st_mtime_ns),
+        'point_count': np.int64(len(records)),
+        'budgets': np.array([b for b in budgets if b < len(records)], dtype=np.int64),
+    }
+    for budget in arrays['budgets']:
+        for name, values in _level(records, xyz, decimate(records, int(budget))).items():
+            arrays[f'{budget}:{name}'] = values
+    tmp_path = pyramid_path(bin_path) + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, **arrays)
+    os.replace(tmp_path, pyramid_path(bin_path))
+    logger.info(f"LOD pyramid for {bin_path}: {len(records)} points, levels {list(arrays['budgets'])} "
+                f"in {time.perf_counter() - start:.2f}s")
+    return pyramid_path(bin_path)
+
+def _pyramid_is_current(bin_path):
+    path = pyramid_path(bin_path)
+    if not os.path.isfile(path):
+        return False
+    stat = os.stat(bin_path)
+    with np.load(path) as data:
+        return int(data['source_size']) == stat.st_size and int(data['source_mtime_ns']) == stat.st_mtime_ns
+
+# The largest stored level within `budget`, rebuilding the pyramid when the bin file changed.
+# Trajectories already within budget come back whole.
+def load_level(bin_path, budget=DEFAULT_BUDGET):
+    if not _pyramid_is_current(bin_path):
+        build_pyramid(bin_path)
+    with np.load(pyramid_path(bin_path)) as data:
+        point_count = int(data['point_count'])
+        fitting = [int(b) for b in data['budgets'] if b <= budget]
+        if fitting and point_count > budget:
+            level = max(fitting)
+            result = {name: data[f'{level}:{name}'] for name in ('index', 'xyz', 'vector', 'quadrant', 'magnitude')}
+            result['point_count'] = point_count
+            return result
+
+    # No stored level fits: decimate the full trajectory directly
+    records = file_handler.read_trajectory_bin(bin_path)
+    indices = decimate(records, budget) if budget < len(records) else np.arange(len(records))
+    result = _level(records, positions(records), indices)
+    result['point_count'] = len(records)
+    return result
+
+
+if __name__ == "__main__":
+    # Usage: python -m python.trajectory_lod <trajectory_data.bin> [budget]
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(name)s: %(message)s")
+    bin_path = sys.argv[1]
+    budget = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_BUDGET
+    build_pyramid(bin_path)
+    start = time.perf_counter()
+    level = load_level(bin_path, budget)
+    print(f"{len(level['index'])} of {level['point_count']} points in {(time.perf_counter() - start) * 1000:.1f} ms")
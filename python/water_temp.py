@@ -0,0 +1,182 @@
+import os
+import json
+import math
+import numpy as np
+import pandas as pd
+
+
+WATER_STATE_PATH = os.path.join('AI', 'targetFile', 'cache', 'water_temp_state.json')
+
+# Lag of the water column behind its equilibrium temperature, shortened by wind mixing
+TAU_BASE_HOURS = 36.0
+WIND_MIXING = 0.1
+# Peak clear-sky solar gain and evaporative / rain cooling (°F)
+SOLAR_GAIN_F = 6.0
+CLOUD_SHADING = 0.75
+EVAP_COEF = 0.02
+RAIN_PULL_PER_IN = 4.0
+# Same high-elevation offset as my_math.estimate_water_temp
+HIGH_ELEVATION_FT = 5000
+HIGH_ELEVATION_OFFSET_F = 5.0
+# Longest gap bridged by a single step before the state is treated as reset
+MAX_STEP_HOURS = 24.0 * 14
+# Estimates kept per station so re-pulled observations get the same value again
+TAIL_HOURS = 24.0 * 7
+
+# METAR cloud amounts to sky fraction; numeric values are taken as percent cover
+CLOUD_FRACTION = {'SKC': 0.0, 'CLR': 0.0, 'FEW': 0.19, 'SCT': 0.44, 'BKN': 0.75, 'OVC': 1.0, 'VV': 1.0}
+UNKNOWN_CLOUD = 0.5
+
+
+def cloud_fraction(cloud_cover):
+    values = pd.Series(cloud_cover, dtype='object')
+    mapped = values.map(lambda v: CLOUD_FRACTION.get(v) if isinstance(v, str) else None)
+    numeric = pd.to_numeric(values, errors='coerce') / 100.0
+    return mapped.astype('float64').fillna(numeric).fillna(UNKNOWN_CLOUD).clip(0.0, 1.0).to_numpy()
+
+# Daytime weighting of solar gain; without an hour use the daily mean of the curve
+def solar_factor(hour):
+    if hour is None:
+        return np.full(1, 1.0 / math.pi)
+    hour = np.asarray(hour, dtype=np.float64)
+    factor = np.clip(np.sin(np.pi * (hour - 6.0) / 12.0), 0.0, None)
+    return np.where(np.isnan(hour), 1.0 / math.pi, factor)
+
+# Temperature the water would settle at if these conditions held
+def equilibrium_temp(air_temp, wind, dew_point, cloud, precip, elevation_ft, hour=None):
+    air_temp = np.nan_to_num(np.asarray(air_temp, dtype=np.float64), nan=60.0)
+    wind = np.nan_to_num(np.asarray(wind, dtype=np.float64), nan=0.0)
+    dew_point = np.asarray(dew_point, dtype=np.float64)
+    dew_point = np.where(np.isnan(dew_point), air_temp, dew_point)
+    precip = np.nan_to_num(np.asarray(precip, dtype=np.float64), nan=0.0)
+    elevation_ft = np.nan_to_num(np.asarray(elevation_ft, dtype=np.float64), nan=0.0)
+
+    solar = SOLAR_GAIN_F * (1.0 - CLOUD_SHADING * cloud) * solar_factor(hour)
+    evaporation = EVAP_COEF * wind * np.maximum(air_temp - dew_point, 0.0)
+    target = air_temp + solar - evaporation
+    # Rain arrives near the dew point and drags the surface toward it
+    rain_weight = np.clip(precip * RAIN_PULL_PER_IN, 0.0, 1.0)
+    target = target + rain_weight * (dew_point - target)
+    return target - np.where(elevation_ft > HIGH_ELEVATION_FT, HIGH_ELEVATION_OFFSET_F, 0.0)
+
+def response_factor(dt_hours, wind):
+    wind = np.nan_to_num(np.asarray(wind, dtype=np.float64), nan=0.0)
+    tau = TAU_BASE_HOURS / (1.0 + WIND_MIXING * np.maximum(wind, 0.0))
+    dt_hours = np.clip(np.asarray(dt_hours, dtype=np.float64), 0.0, MAX_STEP_HOURS)
+    return np.exp(-dt_hours / tau)
+
+
+# Exponential lag over a whole history: w[i] = a[i] * w[i-1] + (1 - a[i]) * target[i].
+# Solved blockwise with cumulative products; only the block carries loop in Python.
+def lagged_response(targets, factors, initial, block=32):
+    targets = np.asarray(targets, dtype=np.float64)
+    n = len(targets)
+    if n == 0:
+        return targets.copy()
+
+    # log(a) floored so exp(-cumsum) stays finite inside a block; a < 2e-9 is a reset anyway
+    log_a = np.maximum(np.log(np.clip(factors, 1e-300, 1.0)), -20.0)
+    pad = (-n) % block
+    log_a = np.pad(log_a, (0, pad)).reshape(-1, block)
+    drive = np.pad((1.0 - np.exp(log_a.ravel()[:n])) * targets, (0, pad)).reshape(-1, block)
+
+    cum = np.cumsum(log_a, axis=1)
+    # Response of each block from a zero start, then the decay of the carried-in state
+    zero_start = np.exp(cum) * np.cumsum(drive * np.exp(-cum), axis=1)
+    decay = np.exp(cum)
+
+    out = np.empty_like(zero_start)
+    carry = initial
+    for i in range(len(out)):
+        out[i] = zero_start[i] + decay[i] * carry
+        carry = out[i, -1]
+    return out.ravel()[:n]
+
+# Vectorized backfill for one station's observations sorted by epoch (seconds)
+def backfill(epochs, air_temp, wind, dew_point, cloud_cover, precip, elevation_ft,
+             hour=None, initial_temp=None, initial_epoch=None):
+    epochs = np.asarray(epochs, dtype=np.float64)
+    if len(epochs) == 0:
+        return np.empty(0)
+    targets = equilibrium_temp(air_temp, wind, dew_point, cloud_fraction(cloud_cover), precip, elevation_ft, hour)
+    targets = np.broadcast_to(targets, epochs.shape)
+
+    if initial_temp is None:
+        # No history: start the water at its first equilibrium
+        initial_temp, initial_epoch = float(targets[0]), epochs[0]
+    previous = np.concatenate(([initial_epoch if initial_epoch is not None else epochs[0]], epochs[:-1]))
+    factors = response_factor((epochs - previous) / 3600.0, wind)
+    return lagged_response(targets, factors, initial_temp)
+
+
+def load_state(path=WATER_STATE_PATH):
+    if not os.path.isfile(path):
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"[WARN] Could not read water temperature state: {e}")
+        return {}
+
+def save_state(state, path=WATER_STATE_PATH):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+# (epoch, water_temp) pairs kept in a station's state, newest last, trimmed to TAIL_HOURS
+def _with_tail(current, epochs, temps):
+    tail = dict((float(e), float(t)) for e, t in (current or {}).get('tail', []))
+    tail.update(zip(map(float, epochs), map(float, temps)))
+    newest = max(tail)
+    return [[e, tail[e]] for e in sorted(tail) if e >= newest - TAIL_HOURS * 3600.0]
+
+# O(1) step for one new observation; older or repeated observations leave the state alone
+def update_station(state, station, epoch, air_temp, wind, dew_point, cloud_cover, precip, elevation_ft, hour=None):
+    target = float(equilibrium_temp(air_temp, wind, dew_point, cloud_fraction([cloud_cover]), precip, elevation_ft, hour)[0])
+    current = state.get(station)
+    if current is None:
+        water = target
+    elif epoch <= current['epoch']:
+        return current['water_temp']
+    else:
+        a = float(response_factor((epoch - current['epoch']) / 3600.0, wind))
+        water = a * current['water_temp'] + (1.0 - a) * target
+    state[station] = {'water_temp': water, 'epoch': epoch, 'tail': _with_tail(current, [epoch], [water])}
+    return water
+
+# Water temperatures for a pull of observations. Rows seen before reuse their stored estimate,
+# new rows continue from the persisted state; only rows older than the stored tail are replayed
+# from a cold start (approximate).
+def estimate_for_station(state, station, frame):
+    order = np.argsort(frame['epoch'].to_numpy(), kind='stable')
+    rows = frame.iloc[order]
+    epochs = rows['epoch'].to_numpy(dtype=np.float64)
+    current = state.get(station)
+    last_epoch = current['epoch'] if current else -np.inf
+    is_new = epochs > last_epoch
+    tail = dict((float(e), float(t)) for e, t in current.get('tail', [])) if current else {}
+    stored = np.array([tail.get(float(e), np.nan) for e in epochs])
+    replay = ~is_new & np.isnan(stored)
+
+    def run(subset, **seed):
+        return backfill(
+            subset['epoch'], subset['temperature (F)'], subset['wind_speed (m/s)'],
+            subset['dew_point (F)'], subset['cloud_cover'], subset['precipitation_last_hour (in)'],
+            subset['station_elevation (ft)'], hour=subset.get('hour'), **seed
+        )
+
+    result = np.where(is_new, np.nan, stored)
+    if replay.any():
+        result[replay] = run(rows[replay])
+    if is_new.any():
+        seed = {'initial_temp': current['water_temp'], 'initial_epoch': current['epoch']} if current else {}
+        result[is_new] = run(rows[is_new], **seed)
+        state[station] = {'water_temp': float(result[is_new][-1]), 'epoch': float(epochs[is_new][-1]),
+                          'tail': _with_tail(current, epochs[is_new], result[is_new])}
+
+    estimates = np.empty(len(rows))
+    estimates[order] = np.round(result, 1)
+    return estimates
@@ -1,3 +1,5 @@
+import numpy as np
+
 # Define quadrant coordinates for each condition
 base_tags = {
     'a': {
@@ -87,3 +89,34 @@ def classify_conditions(temp, humidity, pressure, wind):
 
     # Default: average, neutral
     return 'x'
+
+
+
+# Vectorized classify_conditions: same rules in the same order, one label per row
+def classify_conditions_array(temp, humidity, pressure, wind):
+    temp, humidity, pressure, wind = (np.asarray(v, dtype=np.float64) for v in (temp, humidity, pressure, wind))
+    temp, humidity, pressure, wind = np.broadcast_arrays(temp, humidity, pressure, wind)
+    missing = np.isnan(temp) | np.isnan(humidity) | np.isnan(pressure) | np.isnan(wind)
+
+    with np.errstate(invalid='ignore'):
+        rules = [
+            missing,
+            (60 <= temp) & (temp <= 75) & (40 <= humidity) & (humidity <= 65) & (1012 <= pressure) & (pressure <= 1018) & (3 <= wind) & (wind <= 12),
+            (pressure <= 1008) & (wind <= 8) & (temp <= 60),
+            (pressure >= 1010) & (60 <= temp) & (temp <= 70) & (8 <= wind) & (wind <= 15),
+            (temp >= 85) | (temp <= 40) | (wind >= 20) | (pressure <= 1000),
+            (humidity >= 70) & (wind < 6) & (pressure >= 1005) & (pressure <= 1010),
+            (wind <= 2) & (pressure >= 1018) & (humidity <= 40),
+            (50 <= temp) & (temp <= 65) & (30 <= humidity) & (humidity <= 60) & (5 <= wind) & (wind <= 10) & (1008 <= pressure) & (pressure <= 1015),
+            (pressure >= 1016) & (humidity <= 50) & (wind <= 8),
+        ]
+    labels = ['x', 'b', 'f', 'g', 'd', 'c', 'a', 'e', 'h']
+    return np.select(rules, labels, default='x')
+
+# Quadrant points for an array of zone labels
+def zone_points(zones):
+    zones = np.asarray(zones)
+    points = np.zeros(zones.shape + (2,), dtype=np.float64)
+    for key, info in base_tags.items():
+        points[zones == key] = info['point']
+    return points
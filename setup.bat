@@ -35,7 +35,7 @@ echo Installing required libraries...
 python -m pip install --upgrade ^
     pytz ^
     requests ^
-    geocoder ^
+    numpy ^
     pandas ^
     matplotlib ^
     pillow ^